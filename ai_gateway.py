@@ -0,0 +1,583 @@
+# -*- coding: utf-8 -*-
+"""
+🧠 AI gateway: response cache, request merging and admission control in front of Ollama
+
+Every browser sends its own AI requests. ``AIProxy`` sits between the
+frontend (``VITE_OLLAMA_URL``) and one shared Ollama:
+
+- ``/api/generate`` move prompts are cached by the position they describe
+  (``canonicalize_generate``), in memory or in SQLite
+- identical requests already on their way to Ollama wait for that one call
+- model calls go through a ``FairQueue``: a fixed number at once, waiting
+  requests served round-robin per game and refused with 429/503 and
+  ``Retry-After`` beyond its limits
+
+``setup_automation.py ai-proxy`` runs it; ``setup_automation.py --ai-proxy``
+starts it in the background after Ollama.
+"""
+
+import asyncio
+import contextlib
+import functools
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+AI_PROXY_PORT = 11435
+AI_CACHE_MAX_ENTRIES = 10000
+AI_CACHE_TTL = 24 * 3600
+AI_CACHE_DB = Path(".chaupar_ai_cache.sqlite")
+# Model calls in flight at once, and requests allowed to wait for one (in total and per game).
+# The queue timeout stays below aiService.js's 30s fetch timeout so players get the gateway's error.
+AI_GATEWAY_CONCURRENCY = 2
+AI_GATEWAY_MAX_QUEUE = 64
+AI_GATEWAY_MAX_QUEUE_PER_GAME = 4
+AI_GATEWAY_QUEUE_TIMEOUT = 20.0
+
+# Longest request line or header the gateway reads in one piece
+_STREAM_LIMIT = 1 << 20
+# Time limit for one upstream call; a cold model load can take minutes
+UPSTREAM_TIMEOUT = 120
+
+_sessions = threading.local()
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))]
+
+
+def _send(url: str, method: str, body: Optional[bytes], headers: Dict[str, str]):
+    """One blocking upstream call on this thread's requests session; returns (status, content type, body)"""
+    import requests
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    try:
+        response = session.request(method, url, data=body, headers=headers, timeout=UPSTREAM_TIMEOUT)
+    except requests.Timeout as e:
+        raise asyncio.TimeoutError(str(e)) from e
+    return response.status_code, response.headers.get("content-type", "application/json"), response.content
+
+
+async def _upstream(url: str, method: str = "GET", body: Optional[bytes] = None,
+                    headers: Optional[Dict[str, str]] = None):
+    """Call Ollama from the executor; raises OSError or asyncio.TimeoutError when it can't be reached"""
+    loop = asyncio.get_running_loop()
+    call = loop.run_in_executor(None, functools.partial(_send, url, method, body, headers or {}))
+    return await asyncio.wait_for(call, UPSTREAM_TIMEOUT)
+
+
+# The parts of aiService.js's buildGamePrompt that describe the position
+_PROMPT_DICE = re.compile(r"^- Dice Roll: (\d+)\s*$", re.M)
+_PROMPT_PIECES = re.compile(r"^- Your Pieces: (.*)$", re.M)
+_PROMPT_PIECE = re.compile(r"Piece (\d+): (Not started|Finished|Position (\d+))")
+_PROMPT_SKILL = re.compile(r"^Skill Level: (\S+)\s*$", re.M)
+# What parseAIResponse reads from a reply: "piece N", else the first number
+_REPLY_PIECE = re.compile(r"piece (\d+)", re.I)
+_REPLY_NUMBER = re.compile(r"\d+")
+# Request fields that make a generation depend on more than the prompt text
+_UNCACHEABLE_FIELDS = ("images", "context", "raw")
+# Sort key for finished pieces, past every board square
+FINISHED_SORT_KEY = 69
+
+
+def canonicalize_generate(request: Dict):
+    """Cache key for an Ollama /api/generate request, or None if it must not be cached
+    
+    Chaupar move prompts are reduced to the position they describe: the
+    model and options, skill level, dice value and the piece positions in
+    sorted order, since the four pieces are interchangeable. Returns
+    ``(key, order)`` where ``order[i]`` is the original index of canonical
+    piece ``i``; other prompts are cached by their exact text with ``order``
+    None.
+    """
+    if not request.get("model") or not isinstance(request.get("prompt"), str):
+        return None
+    if any(request.get(field) for field in _UNCACHEABLE_FIELDS):
+        return None
+    prompt = request["prompt"]
+    base = {"model": request["model"], "options": request.get("options") or {},
+            "format": request.get("format"), "system": request.get("system"), "template": request.get("template")}
+    
+    dice, pieces_line, skill = _PROMPT_DICE.search(prompt), _PROMPT_PIECES.search(prompt), _PROMPT_SKILL.search(prompt)
+    pieces = _PROMPT_PIECE.findall(pieces_line.group(1)) if pieces_line else []
+    if dice and skill and pieces and [int(number) for number, _, _ in pieces] == list(range(1, len(pieces) + 1)):
+        # Not started sorts first, finished last
+        positions = [0 if state == "Not started" else FINISHED_SORT_KEY if state == "Finished" else int(square)
+                     for _, state, square in pieces]
+        order = sorted(range(len(positions)), key=lambda index: positions[index])
+        canonical = dict(base, kind="chaupar-move", skill=skill.group(1), dice=int(dice.group(1)),
+                         pieces=[positions[index] for index in order])
+    else:
+        order = None
+        canonical = dict(base, kind="exact", prompt=prompt)
+    key = hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+    return key, order
+
+
+def renumber_reply(text: str, mapping: Dict[int, int]) -> str:
+    """Rewrite the piece number parseAIResponse would read from ``text`` through ``mapping``"""
+    match, group = _REPLY_PIECE.search(text), 1
+    if not match:
+        lowered = text.lower()
+        if "pass" in lowered or "no move" in lowered:
+            return text
+        match, group = _REPLY_NUMBER.search(text), 0
+    if not match or int(match.group(group)) not in mapping:
+        return text
+    return text[:match.start(group)] + str(mapping[int(match.group(group))]) + text[match.end(group):]
+
+
+class MemoryResponseCache:
+    """LRU response cache with a time to live, kept in memory"""
+    
+    kind = "memory"
+    
+    def __init__(self, max_entries: int = AI_CACHE_MAX_ENTRIES, ttl: float = AI_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        
+    def get(self, key: str):
+        """Return ``(response, upstream_seconds)`` or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, cost, created = entry
+        if time.time() - created > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response, cost
+        
+    def put(self, key: str, response: Dict, cost: float) -> None:
+        self._entries[key] = (response, cost, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            
+    def __len__(self) -> int:
+        return len(self._entries)
+        
+    def close(self) -> None:
+        pass
+
+
+class SQLiteResponseCache:
+    """LRU response cache with a time to live, persisted in SQLite so it survives restarts
+    
+    Lookups are single-row primary key queries on a local file, cheap enough
+    to run directly on the event loop.
+    """
+    
+    kind = "sqlite"
+    
+    def __init__(self, path: Path = AI_CACHE_DB, max_entries: int = AI_CACHE_MAX_ENTRIES, ttl: float = AI_CACHE_TTL):
+        import sqlite3
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db = sqlite3.connect(str(self.path), isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                        "cost REAL NOT NULL, created REAL NOT NULL, used REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses (used)")
+        self.db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        
+    def get(self, key: str):
+        """Return ``(response, upstream_seconds)`` or None"""
+        row = self.db.execute("SELECT response, cost, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[2] > self.ttl:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+        self.db.execute("UPDATE responses SET used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), row[1]
+        
+    def put(self, key: str, response: Dict, cost: float) -> None:
+        now = time.time()
+        self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                        (key, json.dumps(response), cost, now, now))
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self.db.execute("DELETE FROM responses WHERE key IN "
+                            "(SELECT key FROM responses ORDER BY used LIMIT ?)", (excess,))
+            
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        
+    def close(self) -> None:
+        self.db.close()
+
+
+class GatewayBusy(Exception):
+    """A request the AI gateway refused instead of queueing; ``status`` is the HTTP status to send"""
+    
+    def __init__(self, status: int, message: str, retry_after: float):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class FairQueue:
+    """Concurrency limit for model calls with round-robin queueing across games
+    
+    Up to ``limit`` calls run at once. Callers beyond that wait in one queue
+    per game and freed slots are handed to the games in turn, so a game that
+    fires many requests can't starve the others. Requests are refused with
+    ``GatewayBusy`` when the queue or the game's share of it is full, or
+    when no slot frees up within ``timeout`` seconds.
+    """
+    
+    def __init__(self, limit: int = AI_GATEWAY_CONCURRENCY, max_queue: int = AI_GATEWAY_MAX_QUEUE,
+                 max_per_game: int = AI_GATEWAY_MAX_QUEUE_PER_GAME, timeout: float = AI_GATEWAY_QUEUE_TIMEOUT,
+                 window: int = 1000):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_per_game = max_per_game
+        self.timeout = timeout
+        self.active = 0
+        self.queued = 0
+        self.max_depth = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_times = deque(maxlen=window)
+        self._waiting: "OrderedDict[str, deque]" = OrderedDict()
+        
+    @contextlib.asynccontextmanager
+    async def slot(self, game: str):
+        await self.acquire(game)
+        try:
+            yield
+        finally:
+            self.release()
+            
+    async def acquire(self, game: str) -> None:
+        started = time.perf_counter()
+        if self.active < self.limit:
+            self.active += 1
+            self._admit(0.0)
+            return
+        waiting = self._waiting.get(game)
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise GatewayBusy(503, f"AI gateway is overloaded: {self.queued} requests already waiting for "
+                                   f"{self.limit} model slots", self._retry_after())
+        if waiting and len(waiting) >= self.max_per_game:
+            self.rejected += 1
+            raise GatewayBusy(429, f"Game {game} already has {len(waiting)} AI requests waiting", self._retry_after())
+            
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(game, deque()).append(future)
+        self.queued += 1
+        self.max_depth = max(self.max_depth, self.queued)
+        try:
+            done, _ = await asyncio.wait((future,), timeout=self.timeout)
+        except asyncio.CancelledError:
+            self._abandon(game, future)
+            raise
+        if not done:
+            self._abandon(game, future)
+            self.timed_out += 1
+            raise GatewayBusy(503, f"No model slot freed up within {self.timeout:g}s "
+                                   f"({self.queued} requests waiting)", self._retry_after())
+        self._admit(time.perf_counter() - started)
+        
+    def release(self) -> None:
+        """Hand the slot to the next game in turn, or free it"""
+        if not self._waiting:
+            self.active -= 1
+            return
+        game, waiting = next(iter(self._waiting.items()))
+        future = waiting.popleft()
+        self.queued -= 1
+        if waiting:
+            self._waiting.move_to_end(game)
+        else:
+            del self._waiting[game]
+        future.set_result(None)
+        
+    def _abandon(self, game: str, future: asyncio.Future) -> None:
+        if future.done():
+            # Handed a slot just as the caller gave up: pass it on
+            self.release()
+            return
+        future.cancel()
+        waiting = self._waiting[game]
+        waiting.remove(future)
+        self.queued -= 1
+        if not waiting:
+            del self._waiting[game]
+            
+    def _admit(self, waited: float) -> None:
+        self.admitted += 1
+        self.wait_times.append(waited)
+        
+    def _retry_after(self) -> float:
+        """Rough time until a queued request would get a slot, from recent waits"""
+        return max(1.0, _percentile(list(self.wait_times), 50) * max(1, self.queued) / self.limit)
+        
+    def summary(self) -> Dict:
+        waits = list(self.wait_times)
+        return {
+            "concurrency": self.limit,
+            "active": self.active,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_depth,
+            "games_waiting": len(self._waiting),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queue_wait": {"p50_ms": _percentile(waits, 50) * 1000, "p95_ms": _percentile(waits, 95) * 1000,
+                           "max_ms": max(waits, default=0.0) * 1000},
+        }
+
+
+class AIProxyStats:
+    """Hit/miss counters and latency for the stats endpoint"""
+    
+    def __init__(self, window: int = 1000):
+        self.started = time.time()
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.saved_seconds = 0.0
+        self.hit_latency = deque(maxlen=window)
+        self.miss_latency = deque(maxlen=window)
+        
+    def hit(self, upstream_seconds: float, seconds: float) -> None:
+        self.hits += 1
+        self.saved_seconds += max(0.0, upstream_seconds - seconds)
+        self.hit_latency.append(seconds)
+        
+    def miss(self, seconds: float) -> None:
+        self.misses += 1
+        self.miss_latency.append(seconds)
+        
+    def summary(self) -> Dict:
+        cacheable = self.hits + self.misses
+        
+        def latency(samples) -> Dict:
+            samples = list(samples)
+            return {"p50_ms": _percentile(samples, 50) * 1000, "p95_ms": _percentile(samples, 95) * 1000,
+                    "max_ms": max(samples, default=0.0) * 1000}
+            
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "requests": self.requests,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": self.hits / cacheable if cacheable else 0.0,
+            "miss_rate": self.misses / cacheable if cacheable else 0.0,
+            "latency_saved_seconds": self.saved_seconds,
+            "hit_latency": latency(self.hit_latency),
+            "miss_latency": latency(self.miss_latency),
+        }
+
+
+# Ollama endpoints that run the model and so go through the gateway's queue
+_MODEL_PATHS = ("/api/generate", "/api/chat", "/api/embed", "/api/embeddings")
+
+
+class AIProxy:
+    """HTTP gateway in front of a shared Ollama: response cache, request merging and admission control
+    
+    ``POST /api/generate`` is served from ``cache`` when the canonical
+    position was seen before, and identical requests already on their way to
+    Ollama wait for that one call instead of making their own. Model calls
+    go through ``queue`` (a ``FairQueue``), keyed by the ``game`` query
+    parameter aiService.js sends, else by client address; refused requests
+    get a 429/503 with ``Retry-After``. Everything else is passed through.
+    The browser talks to the gateway directly, so it answers CORS
+    preflights itself. ``GET /_proxy/stats`` reports hit/miss rates, latency
+    saved, queue depth and queue wait.
+    """
+    
+    def __init__(self, upstream: str, cache, allow_origin: str = "*", queue: Optional[FairQueue] = None):
+        self.upstream = upstream.rstrip("/")
+        self.cache = cache
+        self.allow_origin = allow_origin
+        self.queue = queue or FairQueue()
+        self.stats = AIProxyStats()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+    async def serve(self, host: str = "127.0.0.1", port: int = AI_PROXY_PORT):
+        return await asyncio.start_server(self.handle, host, port, limit=_STREAM_LIMIT)
+        
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                return
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+            peer = writer.get_extra_info("peername")
+            headers.setdefault("x-game-id", peer[0] if peer else "unknown")
+            status, payload, content_type, extra = await self.dispatch(method, path, headers, body)
+            self._respond(writer, status, payload, content_type, extra)
+            await writer.drain()
+        except (ValueError, asyncio.IncompleteReadError):
+            self._respond(writer, 400, b'{"error": "malformed request"}', "application/json")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            
+    def _respond(self, writer, status: int, payload: bytes, content_type: str, extra: Optional[Dict] = None):
+        reason = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+                  502: "Bad Gateway", 503: "Service Unavailable"}.get(status, "Status")
+        headers = {"Content-Type": content_type, "Content-Length": str(len(payload)), "Connection": "close",
+                   "Access-Control-Allow-Origin": self.allow_origin}
+        headers.update(extra or {})
+        head = f"HTTP/1.1 {status} {reason}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + payload)
+        
+    async def dispatch(self, method: str, path: str, headers: Dict[str, str], body: bytes):
+        """Route one request; returns (status, body, content type, extra headers)"""
+        url = urlsplit(path)
+        query = [(name, value) for name, value in parse_qsl(url.query) if name != "game"]
+        game = dict(parse_qsl(url.query)).get("game") or headers["x-game-id"]
+        path = url.path + (f"?{urlencode(query)}" if query else "")
+        if method == "OPTIONS":
+            return 204, b"", "text/plain", {
+                "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+                "Access-Control-Allow-Headers": headers.get("access-control-request-headers", "Content-Type"),
+                "Access-Control-Max-Age": "86400",
+            }
+        if path == "/_proxy/health":
+            return 200, b'{"status": "ok"}', "application/json", None
+        if path == "/_proxy/stats":
+            stats = dict(self.stats.summary(), cache={"kind": self.cache.kind, "entries": len(self.cache),
+                                                      "max_entries": self.cache.max_entries, "ttl": self.cache.ttl},
+                         gateway=dict(self.queue.summary(), inflight=len(self._inflight)))
+            return 200, json.dumps(stats, indent=2).encode(), "application/json", None
+            
+        self.stats.requests += 1
+        try:
+            if method == "POST" and path == "/api/generate":
+                try:
+                    request = json.loads(body or b"{}")
+                except ValueError:
+                    request = None
+                canonical = canonicalize_generate(request) if isinstance(request, dict) else None
+                if canonical:
+                    return await self.generate(request, *canonical, game)
+            self.stats.bypassed += 1
+            if url.path in _MODEL_PATHS:
+                async with self.queue.slot(game):
+                    return await self.forward(method, path, headers, body)
+            return await self.forward(method, path, headers, body)
+        except GatewayBusy as e:
+            return e.status, json.dumps({"error": str(e)}).encode(), "application/json", {
+                "Retry-After": str(int(e.retry_after + 0.5))}
+            
+    async def forward(self, method: str, path: str, headers: Dict[str, str], body: bytes):
+        forward_headers = {"Content-Type": headers["content-type"]} if "content-type" in headers else {}
+        try:
+            status, content_type, payload = await _upstream(self.upstream + path, method,
+                                                            body if method != "GET" else None, forward_headers)
+        except (OSError, asyncio.TimeoutError) as e:
+            self.stats.errors += 1
+            return 502, json.dumps({"error": f"Ollama unreachable: {e}"}).encode(), "application/json", None
+        return status, payload, content_type, None
+        
+    async def generate(self, request: Dict, key: str, order: Optional[List[int]], game: str):
+        started = time.perf_counter()
+        # Ollama streams unless told otherwise; cached answers go out as a single final chunk
+        stream = request.get("stream", True)
+        to_original = {canonical + 1: original + 1 for canonical, original in enumerate(order)} if order else None
+        entry = self.cache.get(key)
+        if entry is not None:
+            response, upstream_seconds = entry
+            if to_original:
+                response = dict(response, response=renumber_reply(response.get("response", ""), to_original))
+            self.stats.hit(upstream_seconds, time.perf_counter() - started)
+            return self._generate_reply(response, stream, "HIT")
+            
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = self._inflight[key] = asyncio.ensure_future(self._generate_upstream(request, key, order, game))
+            cache_status = "MISS"
+        else:
+            self.stats.coalesced += 1
+            cache_status = "MERGED"
+        # Shielded: a client hanging up mustn't cancel the call other clients are waiting for
+        outcome = await asyncio.shield(pending)
+        if not isinstance(outcome[0], dict):
+            return outcome
+        response, stored = outcome
+        if cache_status == "MERGED":
+            response = dict(stored, response=renumber_reply(stored.get("response", ""), to_original)) \
+                if to_original else stored
+        return self._generate_reply(response, stream, cache_status)
+        
+    async def _generate_upstream(self, request: Dict, key: str, order: Optional[List[int]], game: str):
+        """One model call for every request waiting on ``key``
+        
+        Returns ``(response, stored)`` with the stored copy in canonical
+        piece order, or an error reply tuple.
+        """
+        try:
+            async with self.queue.slot(game):
+                started = time.perf_counter()
+                try:
+                    status, content_type, payload = await _upstream(
+                        f"{self.upstream}/api/generate", "POST", json.dumps(dict(request, stream=False)).encode(),
+                        {"Content-Type": "application/json"})
+                except (OSError, asyncio.TimeoutError) as e:
+                    self.stats.errors += 1
+                    return 502, json.dumps({"error": f"Ollama unreachable: {e}"}).encode(), "application/json", None
+                elapsed = time.perf_counter() - started
+            if status != 200:
+                self.stats.errors += 1
+                return status, payload, content_type, None
+            response = json.loads(payload)
+            # The token context encodes this exact prompt, so it is not reusable for other games
+            stored = {k: v for k, v in response.items() if k != "context"}
+            if order:
+                stored["response"] = renumber_reply(stored.get("response", ""),
+                                                    {original + 1: canonical + 1 for canonical, original in enumerate(order)})
+            self.cache.put(key, stored, elapsed)
+            self.stats.miss(elapsed)
+            return response, stored
+        finally:
+            del self._inflight[key]
+        
+    @staticmethod
+    def _generate_reply(response: Dict, stream: bool, cache_status: str):
+        if stream:
+            return 200, (json.dumps(response) + "\n").encode(), "application/x-ndjson", {"X-Cache": cache_status}
+        return 200, json.dumps(response).encode(), "application/json", {"X-Cache": cache_status}
+
+
+def make_response_cache(kind: str, path: Optional[str] = None, max_entries: int = AI_CACHE_MAX_ENTRIES,
+                        ttl: float = AI_CACHE_TTL):
+    if kind == "sqlite":
+        return SQLiteResponseCache(Path(path) if path else AI_CACHE_DB, max_entries, ttl)
+    return MemoryResponseCache(max_entries, ttl)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎲 Self-Play Throughput Check
+Measures games per second per core of the chaupar_sim self-play runner
+
+Plays advanced-vs-advanced matches once on a single worker and once on every
+core, reports games/s, games/s per core and how well the process pool
+scales, and exits non-zero when the per-core rate falls below the target, so
+slowdowns in the simulator or the policies show up as a failed check.
+
+Usage:
+    python benchmarks/bench_selfplay.py
+    python benchmarks/bench_selfplay.py --games 2000000 --target 10000 --json selfplay-bench.json
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chaupar_sim import NUMPY_AVAILABLE  # noqa: E402
+
+
+def measure(workers: int, games: int, chunk_games: int, seed: int) -> dict:
+    from chaupar_sim.selfplay import SelfPlay
+
+    with SelfPlay(workers=workers, chunk_games=chunk_games, seed=seed) as runner:
+        # Warm the pool up so process start-up isn't counted
+        runner.matches([("advanced", "advanced")], min(games, chunk_games) // 10 or 1)
+        runner.games_played, runner.cpu_seconds, runner.wall_seconds = 0, 0.0, 0.0
+        runner.matches([("advanced", "advanced")], games)
+    return {"workers": workers, "games": runner.games_played, "wall_seconds": runner.wall_seconds,
+            "games_per_second": runner.games_per_second,
+            "games_per_second_per_core": runner.games_per_second_per_core}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🎲 Check chaupar_sim self-play throughput")
+    parser.add_argument("--games", "-n", type=int, default=400_000, help="Games per measurement on all cores")
+    parser.add_argument("--chunk-games", type=int, default=50_000, help="Games per worker task")
+    parser.add_argument("--workers", "-j", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--target", type=float, default=8000.0,
+                        help="Fail when games/s per core on all workers drops below this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="Write the measurements as JSON")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("⚠️ NumPy not available. Install with: pip install numpy")
+        sys.exit(1)
+
+    single = measure(1, max(args.chunk_games, args.games // args.workers), args.chunk_games, args.seed)
+    print(f"1 worker:   {single['games_per_second']:10,.0f} games/s")
+    full = single
+    if args.workers > 1:
+        full = measure(args.workers, args.games, args.chunk_games, args.seed)
+        print(f"{args.workers} workers: {full['games_per_second']:10,.0f} games/s")
+    per_core = full["games_per_second"] / args.workers
+    scaling = per_core / single["games_per_second"] if single["games_per_second"] else 0.0
+    print(f"Per core:   {per_core:10,.0f} games/s ({scaling:.0%} of the single-worker rate)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"single": single, "all": full, "games_per_second_per_core": per_core,
+                       "scaling": scaling, "target": args.target}, f, indent=2)
+
+    if per_core < args.target:
+        print(f"\n❌ {per_core:,.0f} games/s per core is below the {args.target:,.0f} target")
+        sys.exit(1)
+    print(f"\n✅ Above the {args.target:,.0f} games/s per core target")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Setup Pipeline Benchmark
+Runs ChauparSetupAutomation end to end against fake CLIs and reports latency
+
+Fake ``node``, ``npm``, ``firebase`` and ``ollama`` executables are put first
+on PATH; each one sleeps for a configurable latency, prints some output and
+exits with a configurable code. Local HTTP stubs stand in for the Ollama API
+(including a streamed ``/api/generate`` for the model warm-up) and the Vite
+dev server. Nothing touches the network, so the suite runs offline on a
+plain Linux box.
+
+Scenarios:
+- cold:    fresh project directory every iteration (no cache, no node_modules)
+- warm:    rerun in a directory primed by a previous successful run
+- failure: build and deploys fail, exercising the error paths
+
+Usage:
+    python benchmarks/bench_setup.py --iterations 10
+    python benchmarks/bench_setup.py --scenario warm --latency "npm install=3" --json bench.json
+"""
+
+import os
+import sys
+import asyncio
+import json
+import shutil
+import argparse
+import tempfile
+import threading
+import contextlib
+import io
+import time
+from pathlib import Path
+from typing import Dict, List
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+# Default latency (seconds), exit code and output line count per fake command.
+# Keys are "<tool> <first argument>"; the most specific match wins.
+DEFAULT_FAKES = {
+    "node --version": {"latency": 0.05, "stdout": "v20.11.0"},
+    "npm --version": {"latency": 0.2, "stdout": "10.2.4"},
+    "npm install": {"latency": 1.5, "lines": 2000},
+    "npm run": {"latency": 1.0, "lines": 40},
+    "firebase --version": {"latency": 0.4, "stdout": "13.0.0"},
+    "firebase login:list": {"latency": 0.4},
+    "firebase apps:list": {"latency": 0.8},
+    "firebase apps:sdkconfig": {"latency": 0.8},
+    "firebase apps:create": {"latency": 1.5},
+    "firebase auth:import": {"latency": 0.8},
+    "firebase deploy": {"latency": 2.0, "lines": 30},
+    "ollama --version": {"latency": 0.05, "stdout": "ollama version 0.3.0"},
+}
+
+FAILURE_OVERRIDES = {
+    "npm run": {"exit": 1, "latency": 0.5, "lines": 200},
+    "firebase deploy": {"exit": 1, "latency": 0.5},
+}
+
+FAKE_TOOL = r'''#!{python}
+import json, os, sys, time
+tool = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+with open(os.environ["CHAUPAR_BENCH_FAKES"]) as f:
+    fakes = json.load(f)
+spec = fakes.get(" ".join([tool] + args[:1]), fakes.get(tool, {{}}))
+time.sleep(spec.get("latency", 0.0))
+code = spec.get("exit", 0)
+for i in range(spec.get("lines", 0)):
+    print(f"{{tool}} {{args[0] if args else ''}}: progress line {{i}}")
+
+def emit(result):
+    print(json.dumps({{"status": "success", "result": result}}))
+
+if code == 0:
+    if "stdout" in spec:
+        print(spec["stdout"])
+    elif tool == "npm" and args[:1] == ["install"]:
+        os.makedirs("node_modules", exist_ok=True)
+    elif tool == "npm" and args[:2] == ["run", "build"]:
+        os.makedirs("dist/assets", exist_ok=True)
+        with open("dist/index.html", "w") as f:
+            f.write("<!doctype html><script src=/assets/index-3f2a1b.js></script>")
+        with open("dist/assets/index-3f2a1b.js", "w") as f:
+            f.write("console.log('chaupar');" * 2000)
+    elif tool == "npm" and args[:2] == ["run", "dev"]:
+        from http.server import HTTPServer, SimpleHTTPRequestHandler
+        port = int(os.environ["CHAUPAR_BENCH_DEV_PORT"])
+        HTTPServer(("127.0.0.1", port), SimpleHTTPRequestHandler).serve_forever()
+    elif tool == "firebase" and "--json" in args:
+        if args[0] == "login:list":
+            emit([{{"user": {{"email": "bench@example.com"}}}}])
+        elif args[0] == "apps:list":
+            emit([{{"appId": "1:1234:web:abcd", "platform": "WEB", "displayName": "Chaupar"}}])
+        elif args[0] == "apps:sdkconfig":
+            emit({{"sdkConfig": {{"apiKey": "AIzaBenchmarkKey000000000000000000000",
+                                  "appId": "1:1234:web:abcd", "messagingSenderId": "1234"}}}})
+    elif tool == "firebase" and args[:1] == ["deploy"]:
+        print("Hosting URL: https://bench.web.app")
+else:
+    print(f"{{tool}}: simulated failure", file=sys.stderr)
+sys.exit(code)
+'''
+
+PROJECT_FILES = {
+    "package.json": '{"name": "chaupar-bench", "private": true}\n',
+    "package-lock.json": '{"name": "chaupar-bench", "lockfileVersion": 3}\n',
+    "index.html": "<!doctype html><div id=root></div>\n",
+    "vite.config.js": "export default {}\n",
+    "src/main.jsx": "console.log('chaupar')\n",
+    "src/utils/chauparRules.js": "export const BOARD_SIZE = 68\n",
+    "firestore.rules": "rules_version = '2';\n",
+    "firestore.indexes.json": '{"indexes": [], "fieldOverrides": []}\n',
+}
+
+
+class _OllamaStub(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Ollama API: model list, model loading and streamed generation"""
+
+    protocol_version = "HTTP/1.1"
+    # Seconds to "load" the model, until the first token, and per further token
+    load_latency = 0.2
+    first_token_latency = 0.05
+    token_latency = 0.01
+    reply = ["Piece", " ", "2"]
+
+    def send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_json(200 if self.path == "/api/tags" else 404, {"models": [{"name": "qwen2.5:latest"}]})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path != "/api/generate":
+            self.send_json(404, {"error": "not found"})
+        elif not request.get("prompt"):
+            time.sleep(self.load_latency)
+            self.send_json(200, {"model": request.get("model"), "response": "", "done": True})
+        elif not request.get("stream", True):
+            time.sleep(self.first_token_latency + self.token_latency * (len(self.reply) - 1))
+            self.send_json(200, {"model": request.get("model"), "response": "".join(self.reply), "done": True})
+        else:
+            # NDJSON over chunked encoding, one token per chunk, like Ollama
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            time.sleep(self.first_token_latency)
+            for index, token in enumerate(self.reply):
+                if index:
+                    time.sleep(self.token_latency)
+                self.send_chunk({"response": token, "done": False})
+            self.send_chunk({"response": "", "done": True, "eval_count": len(self.reply),
+                             "eval_duration": int(self.token_latency * len(self.reply) * 1e9)})
+            self.wfile.write(b"0\r\n\r\n")
+
+    def send_chunk(self, payload: Dict):
+        line = json.dumps(payload).encode() + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_stub(handler) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port() -> int:
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def make_project(path: Path):
+    for name, content in PROJECT_FILES.items():
+        target = path / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+
+
+def install_fakes(bin_dir: Path, fakes: Dict) -> Path:
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    script = FAKE_TOOL.format(python=sys.executable)
+    for tool in ("node", "npm", "firebase", "ollama"):
+        path = bin_dir / tool
+        path.write_text(script)
+        path.chmod(0o755)
+    config = bin_dir / "fakes.json"
+    config.write_text(json.dumps(fakes))
+    return config
+
+
+def run_once(workdir: Path, ollama_url: str, dev_url: str, jobs: int, dev_server: bool) -> Dict:
+    """Run a full setup in ``workdir`` and return the timings from its trace"""
+    import setup_automation
+
+    async def setup(automation) -> bool:
+        success = await automation.run_complete_setup()
+        if dev_server:
+            record = automation.trace.begin_step("Dev Server Test")
+            ok = await automation.test_dev_server()
+            automation.trace.end_step(record, "success" if ok else "failed")
+        return success
+
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        automation = setup_automation.ChauparSetupAutomation(
+            project_id="chaupar-bench", jobs=jobs, trace_file=None)
+        automation.OLLAMA_URL = ollama_url
+        automation.DEV_SERVER_URL = dev_url
+        # A per-directory artifact store keeps cold runs cold and ~/.cache untouched
+        automation.build_cache = setup_automation.BuildCache(workdir / ".build-cache")
+        with contextlib.redirect_stdout(io.StringIO()):
+            success = asyncio.run(setup(automation))
+    finally:
+        os.chdir(previous)
+
+    steps = {step["name"]: step["wall"] for step in automation.trace.steps}
+    return {"success": success, "total": automation.trace.wall_time, "steps": steps,
+            "status": dict(automation.step_status), "ollama": automation.ollama_benchmark}
+
+
+def run_scenario(name: str, iterations: int, root: Path, fakes: Dict, args) -> List[Dict]:
+    config = install_fakes(root / f"bin-{name}", fakes)
+    os.environ["CHAUPAR_BENCH_FAKES"] = str(config)
+    os.environ["PATH"] = f"{config.parent}{os.pathsep}{os.environ['PATH']}"
+
+    ollama = start_http_stub(_OllamaStub)
+    dev_port = free_port()
+    os.environ["CHAUPAR_BENCH_DEV_PORT"] = str(dev_port)
+    ollama_url = f"http://127.0.0.1:{ollama.server_port}"
+    dev_url = f"http://127.0.0.1:{dev_port}"
+
+    runs = []
+    try:
+        warm_dir = root / f"{name}-warm"
+        if name == "warm":
+            make_project(warm_dir)
+            run_once(warm_dir, ollama_url, dev_url, args.jobs, dev_server=False)
+        for i in range(iterations):
+            if name == "warm":
+                workdir = warm_dir
+            else:
+                workdir = root / f"{name}-{i}"
+                make_project(workdir)
+            runs.append(run_once(workdir, ollama_url, dev_url, args.jobs, args.dev_server))
+            print(f"  {name} #{i + 1}: {runs[-1]['total']:.2f}s", file=sys.stderr)
+    finally:
+        ollama.shutdown()
+        os.environ["PATH"] = os.environ["PATH"].split(os.pathsep, 1)[1]
+    return runs
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    step_names = []
+    for run in runs:
+        for step in run["steps"]:
+            if step not in step_names:
+                step_names.append(step)
+
+    def stats(values):
+        return {"p50": percentile(values, 50), "p90": percentile(values, 90),
+                "p99": percentile(values, 99), "max": max(values) if values else 0.0}
+
+    return {
+        "runs": len(runs),
+        "successful_runs": sum(1 for run in runs if run["success"]),
+        "total": stats([run["total"] for run in runs]),
+        "steps": {name: stats([run["steps"][name] for run in runs if name in run["steps"]])
+                  for name in step_names},
+    }
+
+
+def print_summary(name: str, summary: Dict):
+    print(f"\n{name} ({summary['runs']} runs, {summary['successful_runs']} successful)")
+    print(f"{'step':<32} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    rows = list(summary["steps"].items()) + [("TOTAL", summary["total"])]
+    for step, stats in rows:
+        print(f"{step:<32} {stats['p50']:>7.2f}s {stats['p90']:>7.2f}s {stats['p99']:>7.2f}s {stats['max']:>7.2f}s")
+
+
+def parse_latency_overrides(values: List[str]) -> Dict:
+    overrides = {}
+    for value in values:
+        key, _, seconds = value.rpartition("=")
+        if not key:
+            raise argparse.ArgumentTypeError(f"Expected '<command>=<seconds>', got {value!r}")
+        overrides[key] = float(seconds)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ Benchmark the Chaupar setup pipeline against fake CLIs")
+    parser.add_argument("--scenario", choices=["cold", "warm", "failure", "all"], default="all")
+    parser.add_argument("--iterations", "-n", type=int, default=5)
+    parser.add_argument("--jobs", "-j", type=int, default=4, help="Worker pool size passed to the setup")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every fake latency")
+    parser.add_argument("--latency", action="append", default=[], metavar="CMD=SECONDS",
+                        help="Override one fake's latency, e.g. 'npm install=3' (repeatable)")
+    parser.add_argument("--dev-server", action="store_true", help="Also time test_dev_server")
+    parser.add_argument("--json", metavar="PATH", help="Write the summary as JSON")
+    args = parser.parse_args()
+
+    base = json.loads(json.dumps(DEFAULT_FAKES))
+    for key, seconds in parse_latency_overrides(args.latency).items():
+        base.setdefault(key, {})["latency"] = seconds
+    for spec in base.values():
+        spec["latency"] = spec.get("latency", 0.0) * args.scale
+    for name in ("load_latency", "first_token_latency", "token_latency"):
+        setattr(_OllamaStub, name, getattr(_OllamaStub, name) * args.scale)
+
+    scenarios = ["cold", "warm", "failure"] if args.scenario == "all" else [args.scenario]
+    results = {}
+    root = Path(tempfile.mkdtemp(prefix="chaupar-bench-"))
+    try:
+        for name in scenarios:
+            fakes = json.loads(json.dumps(base))
+            if name == "failure":
+                for key, spec in FAILURE_OVERRIDES.items():
+                    fakes.setdefault(key, {}).update(spec)
+            print(f"Running {name} scenario...", file=sys.stderr)
+            results[name] = summarize(run_scenario(name, args.iterations, root, fakes, args))
+            print_summary(name, results[name])
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"jobs": args.jobs, "scale": args.scale, "scenarios": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
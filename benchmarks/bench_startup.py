@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Startup Time Check
+Measures how long ``setup_automation`` takes to import, using ``python -X importtime``
+
+The Google Cloud, Firebase Admin and OpenAI SDKs drag in grpc and protobuf,
+so ``setup_automation.py`` must only import them inside the steps that need
+them. This script imports the module in a fresh interpreter, reports the
+slowest imports and exits non-zero when one of the heavy SDKs is loaded at
+startup or when the import takes longer than the budget, so it can run as a
+regression check in CI.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 150 --runs 10 --top 15
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Top-level packages that must never be imported just by loading setup_automation
+HEAVY_PACKAGES = ("firebase_admin", "google.cloud", "google.oauth2", "google.protobuf", "grpc", "openai")
+
+
+def import_profile() -> List[Dict]:
+    """Import setup_automation in a fresh interpreter and parse its -X importtime report"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import setup_automation"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({"module": name.strip(), "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return modules
+
+
+def heavy_imports(modules: List[Dict]) -> List[str]:
+    return [m["module"] for m in modules
+            if any(m["module"] == pkg or m["module"].startswith(pkg + ".") for pkg in HEAVY_PACKAGES)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ Check setup_automation import time")
+    parser.add_argument("--runs", "-n", type=int, default=5, help="Fresh interpreters to average over")
+    parser.add_argument("--budget-ms", type=float, default=300.0,
+                        help="Fail when the median import of setup_automation exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--json", metavar="PATH", help="Write the measurements as JSON")
+    args = parser.parse_args()
+
+    profiles = [import_profile() for _ in range(max(1, args.runs))]
+    totals = [next(m["cumulative_us"] for m in p if m["module"] == "setup_automation") / 1000 for p in profiles]
+    median = statistics.median(totals)
+    heavy = sorted(set(heavy_imports(profiles[0])))
+
+    print(f"setup_automation import: median {median:.1f} ms, "
+          f"min {min(totals):.1f} ms, max {max(totals):.1f} ms ({len(totals)} runs)")
+    print("\nSlowest imports (self time, run 1):")
+    for m in sorted(profiles[0], key=lambda m: m["self_us"], reverse=True)[:args.top]:
+        print(f"  {m['self_us'] / 1000:8.1f} ms  {m['module']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"median_ms": median, "runs_ms": totals, "heavy_imports": heavy,
+                       "modules": profiles[0]}, f, indent=2)
+
+    failed = False
+    if heavy:
+        print(f"\n❌ Heavy SDKs imported at startup: {', '.join(heavy)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"\n❌ Import time {median:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print(f"\n✅ No heavy SDK imports; within the {args.budget_ms:.0f} ms budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+🎲 Chaupar simulator: the game rules from src/utils as array-backed Python
+
+Plays large numbers of games offline, in NumPy batches, to measure game
+length, balance and AI win rates, and checks that the Python rules still
+match the JavaScript ones.
+
+Usage:
+    python -m chaupar_sim play --games 1000000 --policies advanced basic
+    python -m chaupar_sim parity
+"""
+
+from .rules import (BOARD_SIZE, COWRIE_SCORES, FINISH_SQUARE, HIGH_THROWS, PIECES_PER_PLAYER, SAFE_SQUARES,
+                    SPECIAL_MOVES, START_SQUARE, Rules)
+
+try:
+    import numpy  # noqa: F401
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+if NUMPY_AVAILABLE:
+    from .engine import SimulationResult, Simulator, apply_moves, legal_moves
+    from .policies import HeuristicPolicy, IntermediatePolicy, Policy, RandomPolicy, make_policy
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+🎲 Chaupar simulator command line
+
+Usage:
+    python -m chaupar_sim play --games 1000000 --policies advanced basic
+    python -m chaupar_sim play --games 200000 --players 4 --special-moves --json results.json
+    python -m chaupar_sim parity --cases 5000
+    python -m chaupar_sim selfplay --games 1000000 --tune 10 --out selfplay-results
+    python -m chaupar_sim tables [--check]
+    python -m chaupar_sim replay chaupar-moves.npz --json analytics.json
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from . import NUMPY_AVAILABLE
+from .rules import PLAYERS
+
+
+def play(args) -> int:
+    from .engine import Simulator
+    from .rules import Rules
+
+    policies = args.policies or ["advanced"] * args.players
+    if len(policies) != args.players:
+        print(f"❌ --policies needs one skill level per player ({args.players}), got {len(policies)}")
+        return 2
+    try:
+        simulator = Simulator(Rules(players=args.players, special_moves=args.special_moves,
+                                    max_turns=args.max_turns), policies, seed=args.seed)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    print(f"🎲 Playing {args.games:,} games: {' vs '.join(policies)}")
+    result = simulator.play(args.games, batch_size=args.batch_size)
+    summary = result.summary()
+
+    print(f"✅ {summary['games']:,} games in {summary['elapsed']:.2f}s "
+          f"({summary['games_per_second']:,.0f} games/s)")
+    for seat, (name, rate) in enumerate(zip(summary["policies"], summary["win_rates"])):
+        print(f"  🏆 Player {seat + 1} ({name}): {rate:.1%}")
+    throws = summary["throws"]
+    print(f"  🐚 Throws per game: mean {throws['mean']:.1f}, p50 {throws['p50']:.0f}, "
+          f"p90 {throws['p90']:.0f}, p99 {throws['p99']:.0f}, max {throws['max']}")
+    print(f"  ⚔️  Captures per game: {summary['captures_per_game']:.2f}")
+    print(f"  🔥 Burned turns per game: {summary['burned_turns_per_game']:.2f}")
+    if summary["unfinished"]:
+        print(f"  ⚠️  {summary['unfinished']:,} games hit the {args.max_turns} throw limit")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(dict(summary, players=args.players, special_moves=args.special_moves, seed=args.seed),
+                      f, indent=2)
+        print(f"📄 Results written to {args.json}")
+    return 0
+
+
+def parity(args) -> int:
+    from .parity import check_behaviour, check_constants
+
+    problems = check_constants()
+    if problems:
+        print("❌ Constants differ from the JavaScript rules:")
+        for problem in problems:
+            print(f"  - {problem}")
+    else:
+        print("✅ Constants match chauparRules.js and gameLogic.js")
+
+    try:
+        mismatches = check_behaviour(args.cases, seed=args.seed)
+    except FileNotFoundError as e:
+        print(f"⚠️ Skipping behaviour check: {e}")
+        return 1 if problems else 0
+    if mismatches:
+        print(f"❌ {len(mismatches)} behaviour differences in {args.cases} cases:")
+        for mismatch in mismatches[:20]:
+            print(f"  - {mismatch}")
+    else:
+        print(f"✅ {args.cases} random positions play out the same in ChauparGameState and the simulator")
+    return 1 if problems or mismatches else 0
+
+
+def selfplay(args) -> int:
+    from .selfplay import SelfPlay, default_skill, markdown_table, skill_policies, timestamp
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    base = None
+    if args.weights:
+        with open(args.weights) as f:
+            base = json.load(f)["weights"]
+
+    with SelfPlay(workers=args.workers, chunk_games=args.chunk_games, players=args.players,
+                  special_moves=args.special_moves, seed=args.seed) as runner:
+        print(f"🎲 Self-play on {runner.workers} worker processes")
+        tuned, history = None, []
+        if args.tune:
+            print(f"🔧 Tuning the advanced heuristic: {args.tune} rounds, {args.tune_games:,} games per candidate")
+            tuned, history = runner.tune(base, rounds=args.tune, games=args.tune_games)
+        elif base:
+            tuned = base
+
+        print(f"🏆 Round robin: {args.games:,} games per pairing")
+        report = runner.round_robin(skill_policies(tuned), args.games)
+
+    skill = default_skill(args.env_file)
+    report.update({
+        "generated_at": timestamp(),
+        "games_per_match": args.games,
+        "players": args.players,
+        "special_moves": args.special_moves,
+        "seed": args.seed,
+        "default_skill": skill,
+        "games_per_second": runner.games_per_second,
+        "games_per_second_per_core": runner.games_per_second_per_core,
+    })
+    with open(out / "win_rates.json", "w") as f:
+        json.dump(report, f, indent=2)
+    table = markdown_table(report)
+    with open(out / "win_rates.md", "w") as f:
+        f.write(f"# AI skill win rates\n\n{args.games:,} games per pairing, {args.players} players, "
+                f"seats alternated. Generated {report['generated_at']}.\n\n{table}")
+    print()
+    print(table)
+    if skill:
+        print(f"ℹ️  VITE_DEFAULT_AI_SKILL={skill} ({args.env_file}) wins "
+              f"{report['overall'].get(skill, 0.0):.1%} of its games on average")
+
+    if tuned:
+        with open(out / "ai_weights.json", "w") as f:
+            json.dump({"generated_at": report["generated_at"], "weights": tuned,
+                       "baseline": "advanced", "win_rate_vs_advanced": report["table"]["tuned"]["advanced"],
+                       "history": history}, f, indent=2)
+        print(f"🔧 Tuned weights: {json.dumps(tuned)}")
+
+    print(f"⚡ {runner.games_played:,} games, {runner.games_per_second:,.0f} games/s, "
+          f"{runner.games_per_second_per_core:,.0f} games/s per core")
+    print(f"📄 Results written to {out}/")
+    return 0
+
+
+def tables(args) -> int:
+    from .tables import stale_files, write_tables
+
+    if args.check:
+        stale = stale_files()
+        for path in stale:
+            print(f"❌ {path} is out of date with chaupar_sim/rules.py")
+        if stale:
+            print("   Run: python -m chaupar_sim tables")
+            return 1
+        print("✅ Move tables are up to date")
+        return 0
+    changed = write_tables()
+    for path in changed:
+        print(f"📄 Wrote {path}")
+    if not changed:
+        print("✅ Move tables are already up to date")
+    return 0
+
+
+def replay(args) -> int:
+    from .replay import MoveLog, analyze
+
+    try:
+        log = MoveLog.load(args.path)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"❌ Can't read {args.path}: {e}")
+        return 1
+    print(f"🔁 Replaying {len(log):,} games, {int(log.lengths.sum()):,} moves")
+    summary = analyze(log)
+
+    moves = summary["moves_per_game"]
+    print(f"✅ Replayed in {summary['replay_seconds']:.2f}s")
+    print(f"  🎮 {summary['games_with_moves']:,} games with moves, {summary['decided']:,} played to the finish")
+    print(f"  📏 Moves per game: mean {moves['mean']:.1f}, p50 {moves['p50']:.0f}, p90 {moves['p90']:.0f}, "
+          f"max {moves['max']:.0f}")
+    duration = summary["duration_seconds"]
+    if duration["max"]:
+        print(f"  ⏱️  Game length: mean {duration['mean'] / 60:.1f} min, p90 {duration['p90'] / 60:.1f} min")
+    shares = ", ".join(f"{value}: {share:.1%}" for value, share in summary["throw_shares"].items())
+    print(f"  🐚 Throws: {shares}")
+    print(f"  ⚔️  Captures per game: {summary['captures_per_game']:.2f}")
+    for seat, rate in summary["win_rate_by_seat"].items():
+        print(f"  🏆 Seat {seat + 1}: {rate:.1%} of decided games")
+    for skill, row in summary["ai_win_rates"].items():
+        print(f"  🤖 AI ({skill}): wins {row['win_rate']:.1%} of {row['games']:,} decided games")
+    if summary["inconsistent_moves"]:
+        print(f"  ⚠️  {summary['inconsistent_moves']:,} moves didn't match the rebuilt board and were skipped")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(dict(summary, source=str(args.path)), f, indent=2)
+        print(f"📄 Results written to {args.json}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m chaupar_sim", description="🎲 Chaupar batch simulator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play_parser = commands.add_parser("play", help="Play games in bulk and report win rates and game lengths")
+    play_parser.add_argument("--games", "-n", type=int, default=100_000, help="Games to play")
+    play_parser.add_argument("--batch-size", type=int, default=100_000, help="Games advanced together")
+    play_parser.add_argument("--players", type=int, default=PLAYERS, help="Players per game (2-4)")
+    play_parser.add_argument("--policies", nargs="+", metavar="SKILL",
+                             help="AI skill level per seat: basic, intermediate or advanced (default: advanced)")
+    play_parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    play_parser.add_argument("--special-moves", action="store_true",
+                             help="Move 8 for a 25 and 13 for a 30 (the frontend moves the full throw)")
+    play_parser.add_argument("--max-turns", type=int, default=5000, help="Throws before a game is abandoned")
+    play_parser.add_argument("--json", metavar="PATH", help="Write the summary as JSON")
+
+    parity_parser = commands.add_parser("parity", help="Check the Python rules against src/utils")
+    parity_parser.add_argument("--cases", type=int, default=2000, help="Random positions to compare")
+    parity_parser.add_argument("--seed", type=int, help="Random seed for the positions")
+
+    selfplay_parser = commands.add_parser("selfplay", help="Win-rate tables and heuristic tuning on all cores")
+    selfplay_parser.add_argument("--games", "-n", type=int, default=1_000_000, help="Games per pairing")
+    selfplay_parser.add_argument("--workers", "-j", type=int, help="Worker processes (default: all cores)")
+    selfplay_parser.add_argument("--chunk-games", type=int, default=50_000, help="Games per worker task")
+    selfplay_parser.add_argument("--players", type=int, default=PLAYERS, help="Players per game (2-4)")
+    selfplay_parser.add_argument("--special-moves", action="store_true", help="Move 8 for a 25 and 13 for a 30")
+    selfplay_parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    selfplay_parser.add_argument("--tune", type=int, default=0, metavar="ROUNDS",
+                                 help="Hill-climb the advanced heuristic for this many rounds first")
+    selfplay_parser.add_argument("--tune-games", type=int, default=200_000, help="Games per tuning candidate")
+    selfplay_parser.add_argument("--weights", metavar="PATH",
+                                 help="Start from (or, without --tune, evaluate) a previous ai_weights.json")
+    selfplay_parser.add_argument("--env-file", default=".env.local",
+                                 help="Env file to read VITE_DEFAULT_AI_SKILL from")
+    selfplay_parser.add_argument("--out", default="selfplay-results", help="Directory for the result files")
+
+    tables_parser = commands.add_parser("tables", help="Regenerate the precomputed move tables")
+    tables_parser.add_argument("--check", action="store_true", help="Only check that the committed tables are current")
+
+    replay_parser = commands.add_parser("replay", help="Rebuild exported games and report analytics")
+    replay_parser.add_argument("path", help="Move log written by: setup_automation.py maintain export")
+    replay_parser.add_argument("--json", metavar="PATH", help="Write the analytics as JSON")
+
+    args = parser.parse_args()
+    if args.command != "tables" and not NUMPY_AVAILABLE:
+        print("⚠️ NumPy not available. Install with: pip install numpy")
+        sys.exit(1)
+    commands = {"play": play, "parity": parity, "selfplay": selfplay, "tables": tables, "replay": replay}
+    sys.exit(commands[args.command](args))
+
+
+if __name__ == "__main__":
+    main()
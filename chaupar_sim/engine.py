@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Batch Chaupar simulator: many games advanced in lock step with NumPy
+
+Game state for a batch of ``n`` games with ``P`` players:
+
+- ``pieces``:   int8 (n, P, 4), 0 = home, 1..67 on the board, 68 = finished
+- ``current``:  int8 (n,), whose turn it is
+- ``streak``:   int8 (n,), consecutive high throws of the current player
+- ``captures``: int16 (n, P), pieces each player sent home (> 0 means "tohd")
+
+One step throws the cowries in every unfinished game, lets each game's
+policy pick a piece, applies the moves and captures, and passes the turn
+unless the throw was high. Finished games are dropped from the working
+arrays so long games don't slow the batch down.
+
+Turn flow, which the React hook leaves to its caller: a high throw (10, 25,
+30) earns another throw, three in a row burn the turn, anything else passes
+it to the next player. Everything else follows ``ChauparGameState``.
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from . import move_tables
+from .policies import CAPTURE_TABLE, Policy, make_policy
+from .rules import COWRIE_SCORES, FINISH_SQUARE, HIGH_THROWS, HOME, MAX_HIGH_THROWS, PIECES_PER_PLAYER, Rules
+
+# Shells facing up -> score
+SCORE_TABLE = np.array([COWRIE_SCORES[up] for up in range(8)], dtype=np.int16)
+HIGH_TABLE = np.zeros(max(COWRIE_SCORES.values()) + 1, dtype=bool)
+HIGH_TABLE[list(HIGH_THROWS)] = True
+
+
+def destination_table(rules: Rules) -> np.ndarray:
+    """(position, throw score) -> destination, -1 where the piece can't move
+
+    Expanded from the generated ``move_tables`` so a batch of moves is a
+    single fancy-indexing lookup.
+    """
+    destination, _ = move_tables.TABLES["special" if rules.special_moves else "standard"]
+    by_column = np.array(destination, dtype=np.int16).reshape(move_tables.POSITIONS, len(move_tables.THROWS))
+    table = np.full((move_tables.POSITIONS, len(HIGH_TABLE)), -1, dtype=np.int16)
+    for score, column in move_tables.THROW_COLUMNS.items():
+        table[:, score] = by_column[:, column]
+    return table
+
+
+def legal_moves(rules: Rules, mine: np.ndarray, score: np.ndarray, destinations: Optional[np.ndarray] = None):
+    """Which pieces may move and where they land, for (n, 4) positions and (n,) throw scores
+
+    Same decisions as ``canMovePiece``/``movePiece``: home pieces need a high
+    throw and enter on the start square, finished pieces stay put, and a move
+    may end on the finish square but not overshoot it. Targets are -1 where
+    the move isn't legal.
+    """
+    if destinations is None:
+        destinations = destination_table(rules)
+    target = destinations[mine, score[:, None]]
+    return target >= 0, target
+
+
+def apply_moves(pieces: np.ndarray, rows: np.ndarray, seats: np.ndarray, piece: np.ndarray,
+                target: np.ndarray) -> np.ndarray:
+    """Move one piece in each of ``rows`` and resolve captures in place
+
+    Returns the number of opposing pieces each move sent home.
+    """
+    pieces[rows, seats, piece] = target
+    captured = np.zeros(len(rows), dtype=np.int16)
+    can_capture = CAPTURE_TABLE[target]
+    if not can_capture.any():
+        return captured
+    hit_rows, hit_seats, hit_target = rows[can_capture], seats[can_capture], target[can_capture]
+    board = pieces[hit_rows]
+    hits = board == hit_target[:, None, None]
+    hits[np.arange(len(hit_rows)), hit_seats] = False
+    board[hits] = HOME
+    pieces[hit_rows] = board
+    captured[can_capture] = hits.sum(axis=(1, 2))
+    return captured
+
+
+class SimulationResult:
+    """Per-game outcomes of a simulation run"""
+
+    def __init__(self, winner: np.ndarray, throws: np.ndarray, turns: np.ndarray, captures: np.ndarray,
+                 burned: np.ndarray, policies: Sequence[Policy], elapsed: float):
+        self.winner = winner        # int8 (games,), -1 when the turn limit was hit
+        self.throws = throws        # int32 (games,)
+        self.turns = turns          # int32 (games,)
+        self.captures = captures    # int16 (games, players), pieces sent home by each player
+        self.burned = burned        # int16 (games,), turns lost to three high throws
+        self.policies = list(policies)
+        self.elapsed = elapsed
+
+    @property
+    def games(self) -> int:
+        return len(self.winner)
+
+    def win_rates(self) -> List[float]:
+        decided = max(1, int((self.winner >= 0).sum()))
+        return [float((self.winner == seat).sum()) / decided for seat in range(len(self.policies))]
+
+    def summary(self) -> Dict:
+        throws = self.throws
+        return {
+            "games": self.games,
+            "elapsed": self.elapsed,
+            "games_per_second": self.games / self.elapsed if self.elapsed else 0.0,
+            "policies": [policy.name for policy in self.policies],
+            "win_rates": self.win_rates(),
+            "unfinished": int((self.winner < 0).sum()),
+            "throws": {"mean": float(throws.mean()), "p50": float(np.percentile(throws, 50)),
+                       "p90": float(np.percentile(throws, 90)), "p99": float(np.percentile(throws, 99)),
+                       "max": int(throws.max())},
+            "turns_mean": float(self.turns.mean()),
+            "captures_per_game": float(self.captures.sum(axis=1).mean()),
+            "burned_turns_per_game": float(self.burned.mean()),
+        }
+
+
+class Simulator:
+    """Plays batches of games between one policy per seat
+
+    ``policies`` are skill level names (``basic``, ``intermediate``,
+    ``advanced``) or ``Policy`` objects; seat 0 moves first. Games still
+    running after ``rules.max_turns`` throws are recorded without a winner.
+    """
+
+    def __init__(self, rules: Optional[Rules] = None, policies: Sequence = ("advanced", "advanced"),
+                 seed: Optional[int] = None):
+        self.rules = rules or Rules(players=len(policies))
+        if len(policies) != self.rules.players:
+            raise ValueError(f"Need one policy per player ({self.rules.players}), got {len(policies)}")
+        self.policies = [make_policy(policy) for policy in policies]
+        self.rng = np.random.default_rng(seed)
+        self.destinations = destination_table(self.rules)
+
+    def play(self, games: int, batch_size: int = 100_000) -> SimulationResult:
+        start = time.perf_counter()
+        parts = []
+        for offset in range(0, games, batch_size):
+            parts.append(self._play_batch(min(batch_size, games - offset)))
+        merged = [np.concatenate(column) for column in zip(*parts)]
+        return SimulationResult(*merged, policies=self.policies, elapsed=time.perf_counter() - start)
+
+    def _play_batch(self, n: int):
+        players, rng = self.rules.players, self.rng
+        winner = np.full(n, -1, dtype=np.int8)
+        throws_out = np.zeros(n, dtype=np.int32)
+        turns_out = np.zeros(n, dtype=np.int32)
+        captures_out = np.zeros((n, players), dtype=np.int16)
+        burned_out = np.zeros(n, dtype=np.int16)
+
+        # Working state for the games still running; ``ids`` maps rows back to the batch
+        ids = np.arange(n)
+        pieces = np.zeros((n, players, PIECES_PER_PLAYER), dtype=np.int8)
+        current = np.zeros(n, dtype=np.int8)
+        streak = np.zeros(n, dtype=np.int8)
+        throws = np.zeros(n, dtype=np.int32)
+        turns = np.zeros(n, dtype=np.int32)
+        captures = np.zeros((n, players), dtype=np.int16)
+        burned_count = np.zeros(n, dtype=np.int16)
+
+        while len(ids):
+            m = len(ids)
+            rows = np.arange(m)
+            score = SCORE_TABLE[rng.integers(0, 8, m)]
+            high = HIGH_TABLE[score]
+            streak = np.where(high, streak + 1, 0).astype(np.int8)
+            burned = streak >= MAX_HIGH_THROWS
+            throws += 1
+            burned_count += burned
+
+            mine = pieces[rows, current]
+            legal, target = legal_moves(self.rules, mine, score, self.destinations)
+            legal &= ~burned[:, None]
+
+            choice = np.full(m, -1, dtype=np.int64)
+            for seat, policy in enumerate(self.policies):
+                mask = (current == seat) & legal.any(axis=1)
+                if mask.any():
+                    choice[mask] = policy.choose(rng, legal[mask], mine[mask].astype(np.int16), target[mask],
+                                                 pieces[mask], seat)
+
+            moved = np.flatnonzero(choice >= 0)
+            won = np.zeros(m, dtype=bool)
+            if len(moved):
+                seats = current[moved].astype(np.int64)
+                piece = choice[moved]
+                captured = apply_moves(pieces, moved, seats, piece, target[moved, piece])
+                captures[moved, seats] += captured
+                won[moved] = (pieces[moved, seats] == FINISH_SQUARE).all(axis=1)
+
+            # Anything but a (non-burned) high throw ends the turn
+            mover = current
+            passes = ~high | burned
+            streak[passes] = 0
+            turns += passes
+            current = np.where(passes, (current + 1) % players, current).astype(np.int8)
+
+            done = won | (throws >= self.rules.max_turns)
+            if done.any():
+                finished_ids = ids[done]
+                winner[finished_ids] = np.where(won[done], mover[done], -1)
+                throws_out[finished_ids] = throws[done]
+                turns_out[finished_ids] = turns[done]
+                captures_out[finished_ids] = captures[done]
+                burned_out[finished_ids] = burned_count[done]
+                keep = ~done
+                ids, pieces, current, streak = ids[keep], pieces[keep], current[keep], streak[keep]
+                throws, turns, captures, burned_count = throws[keep], turns[keep], captures[keep], burned_count[keep]
+
+        return winner, throws_out, turns_out, captures_out, burned_out
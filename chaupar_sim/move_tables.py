@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+# Generated by `python -m chaupar_sim tables` from chaupar_sim/rules.py - do not edit.
+"""
+Dense move tables for every (position, throw) pair, row-major by position
+
+Rows are positions 0 (home) .. 68 (finished), columns are throws by shells
+facing up (scores [7, 10, 2, 3, 4, 25, 30, 14]). Destinations are -1 where the piece can't move.
+"""
+
+from array import array
+
+FORMAT_VERSION = 1
+POSITIONS = 69
+THROWS = (7, 10, 2, 3, 4, 25, 30, 14)
+THROW_COLUMNS = {score: column for column, score in enumerate(THROWS)}
+
+LEGAL = 1
+SAFE = 2
+FINISHES = 4
+PASSES_HOME = 8
+CAPTURES = 16
+ENTERS = 32
+
+STANDARD_DESTINATION = array("b", [
+    -1,  1, -1, -1, -1,  1,  1, -1,  # 0
+     8, 11,  3,  4,  5, 26, 31, 15,  # 1
+     9, 12,  4,  5,  6, 27, 32, 16,  # 2
+    10, 13,  5,  6,  7, 28, 33, 17,  # 3
+    11, 14,  6,  7,  8, 29, 34, 18,  # 4
+    12, 15,  7,  8,  9, 30, 35, 19,  # 5
+    13, 16,  8,  9, 10, 31, 36, 20,  # 6
+    14, 17,  9, 10, 11, 32, 37, 21,  # 7
+    15, 18, 10, 11, 12, 33, 38, 22,  # 8
+    16, 19, 11, 12, 13, 34, 39, 23,  # 9
+    17, 20, 12, 13, 14, 35, 40, 24,  # 10
+    18, 21, 13, 14, 15, 36, 41, 25,  # 11
+    19, 22, 14, 15, 16, 37, 42, 26,  # 12
+    20, 23, 15, 16, 17, 38, 43, 27,  # 13
+    21, 24, 16, 17, 18, 39, 44, 28,  # 14
+    22, 25, 17, 18, 19, 40, 45, 29,  # 15
+    23, 26, 18, 19, 20, 41, 46, 30,  # 16
+    24, 27, 19, 20, 21, 42, 47, 31,  # 17
+    25, 28, 20, 21, 22, 43, 48, 32,  # 18
+    26, 29, 21, 22, 23, 44, 49, 33,  # 19
+    27, 30, 22, 23, 24, 45, 50, 34,  # 20
+    28, 31, 23, 24, 25, 46, 51, 35,  # 21
+    29, 32, 24, 25, 26, 47, 52, 36,  # 22
+    30, 33, 25, 26, 27, 48, 53, 37,  # 23
+    31, 34, 26, 27, 28, 49, 54, 38,  # 24
+    32, 35, 27, 28, 29, 50, 55, 39,  # 25
+    33, 36, 28, 29, 30, 51, 56, 40,  # 26
+    34, 37, 29, 30, 31, 52, 57, 41,  # 27
+    35, 38, 30, 31, 32, 53, 58, 42,  # 28
+    36, 39, 31, 32, 33, 54, 59, 43,  # 29
+    37, 40, 32, 33, 34, 55, 60, 44,  # 30
+    38, 41, 33, 34, 35, 56, 61, 45,  # 31
+    39, 42, 34, 35, 36, 57, 62, 46,  # 32
+    40, 43, 35, 36, 37, 58, 63, 47,  # 33
+    41, 44, 36, 37, 38, 59, 64, 48,  # 34
+    42, 45, 37, 38, 39, 60, 65, 49,  # 35
+    43, 46, 38, 39, 40, 61, 66, 50,  # 36
+    44, 47, 39, 40, 41, 62, 67, 51,  # 37
+    45, 48, 40, 41, 42, 63, 68, 52,  # 38
+    46, 49, 41, 42, 43, 64, -1, 53,  # 39
+    47, 50, 42, 43, 44, 65, -1, 54,  # 40
+    48, 51, 43, 44, 45, 66, -1, 55,  # 41
+    49, 52, 44, 45, 46, 67, -1, 56,  # 42
+    50, 53, 45, 46, 47, 68, -1, 57,  # 43
+    51, 54, 46, 47, 48, -1, -1, 58,  # 44
+    52, 55, 47, 48, 49, -1, -1, 59,  # 45
+    53, 56, 48, 49, 50, -1, -1, 60,  # 46
+    54, 57, 49, 50, 51, -1, -1, 61,  # 47
+    55, 58, 50, 51, 52, -1, -1, 62,  # 48
+    56, 59, 51, 52, 53, -1, -1, 63,  # 49
+    57, 60, 52, 53, 54, -1, -1, 64,  # 50
+    58, 61, 53, 54, 55, -1, -1, 65,  # 51
+    59, 62, 54, 55, 56, -1, -1, 66,  # 52
+    60, 63, 55, 56, 57, -1, -1, 67,  # 53
+    61, 64, 56, 57, 58, -1, -1, 68,  # 54
+    62, 65, 57, 58, 59, -1, -1, -1,  # 55
+    63, 66, 58, 59, 60, -1, -1, -1,  # 56
+    64, 67, 59, 60, 61, -1, -1, -1,  # 57
+    65, 68, 60, 61, 62, -1, -1, -1,  # 58
+    66, -1, 61, 62, 63, -1, -1, -1,  # 59
+    67, -1, 62, 63, 64, -1, -1, -1,  # 60
+    68, -1, 63, 64, 65, -1, -1, -1,  # 61
+    -1, -1, 64, 65, 66, -1, -1, -1,  # 62
+    -1, -1, 65, 66, 67, -1, -1, -1,  # 63
+    -1, -1, 66, 67, 68, -1, -1, -1,  # 64
+    -1, -1, 67, 68, -1, -1, -1, -1,  # 65
+    -1, -1, 68, -1, -1, -1, -1, -1,  # 66
+    -1, -1, -1, -1, -1, -1, -1, -1,  # 67
+    -1, -1, -1, -1, -1, -1, -1, -1,  # 68
+])
+STANDARD_FLAGS = array("B", [
+     0, 49,  0,  0,  0, 49, 49,  0,  # 0
+     3, 17, 17, 17, 17, 17, 17,  3,  # 1
+    17, 17, 17, 17, 17, 17, 17, 17,  # 2
+    17, 17, 17, 17, 17, 17, 17, 17,  # 3
+    17, 17, 17, 17,  3,  3, 17, 17,  # 4
+    17,  3, 17,  3, 17, 17, 17, 17,  # 5
+    17, 17,  3, 17, 17, 17,  3, 17,  # 6
+    17, 17, 17, 17, 17, 17, 17, 17,  # 7
+     3, 17, 17, 17, 17, 17, 17,  3,  # 8
+    17, 17, 17, 17, 17, 17, 17, 17,  # 9
+    17, 17, 17, 17, 17, 17, 17, 17,  # 10
+    17, 17, 17, 17,  3,  3, 17, 17,  # 11
+    17,  3, 17,  3, 17, 17, 17, 17,  # 12
+    17, 17,  3, 17, 17, 17,  3, 17,  # 13
+    17, 17, 17, 17, 17, 17, 17, 17,  # 14
+     3, 17, 17, 17, 17, 17, 17,  3,  # 15
+    17, 17, 17, 17, 17, 17, 17, 17,  # 16
+    17, 17, 17, 17, 17, 17, 17, 17,  # 17
+    17, 17, 17, 17,  3,  3, 17, 17,  # 18
+    17,  3, 17,  3, 17, 17, 17, 17,  # 19
+    17, 17,  3, 17, 17, 17,  3, 17,  # 20
+    17, 17, 17, 17, 17, 17, 17, 17,  # 21
+     3, 17, 17, 17, 17, 17, 17,  3,  # 22
+    17, 17, 17, 17, 17, 17, 17, 17,  # 23
+    17, 17, 17, 17, 17, 17, 17, 17,  # 24
+    17, 17, 17, 17,  3,  3, 17, 17,  # 25
+    17,  3, 17,  3, 17, 17, 17, 17,  # 26
+    17, 17,  3, 17, 17, 17,  3, 17,  # 27
+    17, 17, 17, 17, 17, 17, 17, 17,  # 28
+     3, 17, 17, 17, 17, 17, 17,  3,  # 29
+    17, 17, 17, 17, 17, 17, 17, 17,  # 30
+    17, 17, 17, 17, 17, 17, 17, 17,  # 31
+    17, 17, 17, 17,  3,  3, 17, 17,  # 32
+    17,  3, 17,  3, 17, 17, 17, 17,  # 33
+    17, 17,  3, 17, 17, 17,  3, 17,  # 34
+    17, 17, 17, 17, 17, 17, 17, 17,  # 35
+     3, 17, 17, 17, 17, 17, 17,  3,  # 36
+    17, 17, 17, 17, 17, 17, 17, 17,  # 37
+    17, 17, 17, 17, 17, 17,  5, 17,  # 38
+    17, 17, 17, 17,  3,  3,  8, 17,  # 39
+    17,  3, 17,  3, 17, 17,  8, 17,  # 40
+    17, 17,  3, 17, 17, 17,  8, 17,  # 41
+    17, 17, 17, 17, 17, 17,  8, 17,  # 42
+     3, 17, 17, 17, 17,  5,  8,  3,  # 43
+    17, 17, 17, 17, 17,  8,  8, 17,  # 44
+    17, 17, 17, 17, 17,  8,  8, 17,  # 45
+    17, 17, 17, 17,  3,  8,  8, 17,  # 46
+    17,  3, 17,  3, 17,  8,  8, 17,  # 47
+    17, 17,  3, 17, 17,  8,  8, 17,  # 48
+    17, 17, 17, 17, 17,  8,  8, 17,  # 49
+     3, 17, 17, 17, 17,  8,  8,  3,  # 50
+    17, 17, 17, 17, 17,  8,  8, 17,  # 51
+    17, 17, 17, 17, 17,  8,  8, 17,  # 52
+    17, 17, 17, 17,  3,  8,  8, 17,  # 53
+    17,  3, 17,  3, 17,  8,  8,  5,  # 54
+    17, 17,  3, 17, 17,  8,  8,  8,  # 55
+    17, 17, 17, 17, 17,  8,  8,  8,  # 56
+     3, 17, 17, 17, 17,  8,  8,  8,  # 57
+    17,  5, 17, 17, 17,  8,  8,  8,  # 58
+    17,  8, 17, 17, 17,  8,  8,  8,  # 59
+    17,  8, 17, 17,  3,  8,  8,  8,  # 60
+     5,  8, 17,  3, 17,  8,  8,  8,  # 61
+     8,  8,  3, 17, 17,  8,  8,  8,  # 62
+     8,  8, 17, 17, 17,  8,  8,  8,  # 63
+     8,  8, 17, 17,  5,  8,  8,  8,  # 64
+     8,  8, 17,  5,  8,  8,  8,  8,  # 65
+     8,  8,  5,  8,  8,  8,  8,  8,  # 66
+     8,  8,  8,  8,  8,  8,  8,  8,  # 67
+     0,  0,  0,  0,  0,  0,  0,  0,  # 68
+])
+
+SPECIAL_DESTINATION = array("b", [
+    -1,  1, -1, -1, -1,  1,  1, -1,  # 0
+     8, 11,  3,  4,  5,  9, 14, 15,  # 1
+     9, 12,  4,  5,  6, 10, 15, 16,  # 2
+    10, 13,  5,  6,  7, 11, 16, 17,  # 3
+    11, 14,  6,  7,  8, 12, 17, 18,  # 4
+    12, 15,  7,  8,  9, 13, 18, 19,  # 5
+    13, 16,  8,  9, 10, 14, 19, 20,  # 6
+    14, 17,  9, 10, 11, 15, 20, 21,  # 7
+    15, 18, 10, 11, 12, 16, 21, 22,  # 8
+    16, 19, 11, 12, 13, 17, 22, 23,  # 9
+    17, 20, 12, 13, 14, 18, 23, 24,  # 10
+    18, 21, 13, 14, 15, 19, 24, 25,  # 11
+    19, 22, 14, 15, 16, 20, 25, 26,  # 12
+    20, 23, 15, 16, 17, 21, 26, 27,  # 13
+    21, 24, 16, 17, 18, 22, 27, 28,  # 14
+    22, 25, 17, 18, 19, 23, 28, 29,  # 15
+    23, 26, 18, 19, 20, 24, 29, 30,  # 16
+    24, 27, 19, 20, 21, 25, 30, 31,  # 17
+    25, 28, 20, 21, 22, 26, 31, 32,  # 18
+    26, 29, 21, 22, 23, 27, 32, 33,  # 19
+    27, 30, 22, 23, 24, 28, 33, 34,  # 20
+    28, 31, 23, 24, 25, 29, 34, 35,  # 21
+    29, 32, 24, 25, 26, 30, 35, 36,  # 22
+    30, 33, 25, 26, 27, 31, 36, 37,  # 23
+    31, 34, 26, 27, 28, 32, 37, 38,  # 24
+    32, 35, 27, 28, 29, 33, 38, 39,  # 25
+    33, 36, 28, 29, 30, 34, 39, 40,  # 26
+    34, 37, 29, 30, 31, 35, 40, 41,  # 27
+    35, 38, 30, 31, 32, 36, 41, 42,  # 28
+    36, 39, 31, 32, 33, 37, 42, 43,  # 29
+    37, 40, 32, 33, 34, 38, 43, 44,  # 30
+    38, 41, 33, 34, 35, 39, 44, 45,  # 31
+    39, 42, 34, 35, 36, 40, 45, 46,  # 32
+    40, 43, 35, 36, 37, 41, 46, 47,  # 33
+    41, 44, 36, 37, 38, 42, 47, 48,  # 34
+    42, 45, 37, 38, 39, 43, 48, 49,  # 35
+    43, 46, 38, 39, 40, 44, 49, 50,  # 36
+    44, 47, 39, 40, 41, 45, 50, 51,  # 37
+    45, 48, 40, 41, 42, 46, 51, 52,  # 38
+    46, 49, 41, 42, 43, 47, 52, 53,  # 39
+    47, 50, 42, 43, 44, 48, 53, 54,  # 40
+    48, 51, 43, 44, 45, 49, 54, 55,  # 41
+    49, 52, 44, 45, 46, 50, 55, 56,  # 42
+    50, 53, 45, 46, 47, 51, 56, 57,  # 43
+    51, 54, 46, 47, 48, 52, 57, 58,  # 44
+    52, 55, 47, 48, 49, 53, 58, 59,  # 45
+    53, 56, 48, 49, 50, 54, 59, 60,  # 46
+    54, 57, 49, 50, 51, 55, 60, 61,  # 47
+    55, 58, 50, 51, 52, 56, 61, 62,  # 48
+    56, 59, 51, 52, 53, 57, 62, 63,  # 49
+    57, 60, 52, 53, 54, 58, 63, 64,  # 50
+    58, 61, 53, 54, 55, 59, 64, 65,  # 51
+    59, 62, 54, 55, 56, 60, 65, 66,  # 52
+    60, 63, 55, 56, 57, 61, 66, 67,  # 53
+    61, 64, 56, 57, 58, 62, 67, 68,  # 54
+    62, 65, 57, 58, 59, 63, 68, -1,  # 55
+    63, 66, 58, 59, 60, 64, -1, -1,  # 56
+    64, 67, 59, 60, 61, 65, -1, -1,  # 57
+    65, 68, 60, 61, 62, 66, -1, -1,  # 58
+    66, -1, 61, 62, 63, 67, -1, -1,  # 59
+    67, -1, 62, 63, 64, 68, -1, -1,  # 60
+    68, -1, 63, 64, 65, -1, -1, -1,  # 61
+    -1, -1, 64, 65, 66, -1, -1, -1,  # 62
+    -1, -1, 65, 66, 67, -1, -1, -1,  # 63
+    -1, -1, 66, 67, 68, -1, -1, -1,  # 64
+    -1, -1, 67, 68, -1, -1, -1, -1,  # 65
+    -1, -1, 68, -1, -1, -1, -1, -1,  # 66
+    -1, -1, -1, -1, -1, -1, -1, -1,  # 67
+    -1, -1, -1, -1, -1, -1, -1, -1,  # 68
+])
+SPECIAL_FLAGS = array("B", [
+     0, 49,  0,  0,  0, 49, 49,  0,  # 0
+     3, 17, 17, 17, 17, 17, 17,  3,  # 1
+    17, 17, 17, 17, 17, 17,  3, 17,  # 2
+    17, 17, 17, 17, 17, 17, 17, 17,  # 3
+    17, 17, 17, 17,  3, 17, 17, 17,  # 4
+    17,  3, 17,  3, 17, 17, 17, 17,  # 5
+    17, 17,  3, 17, 17, 17, 17, 17,  # 6
+    17, 17, 17, 17, 17,  3, 17, 17,  # 7
+     3, 17, 17, 17, 17, 17, 17,  3,  # 8
+    17, 17, 17, 17, 17, 17,  3, 17,  # 9
+    17, 17, 17, 17, 17, 17, 17, 17,  # 10
+    17, 17, 17, 17,  3, 17, 17, 17,  # 11
+    17,  3, 17,  3, 17, 17, 17, 17,  # 12
+    17, 17,  3, 17, 17, 17, 17, 17,  # 13
+    17, 17, 17, 17, 17,  3, 17, 17,  # 14
+     3, 17, 17, 17, 17, 17, 17,  3,  # 15
+    17, 17, 17, 17, 17, 17,  3, 17,  # 16
+    17, 17, 17, 17, 17, 17, 17, 17,  # 17
+    17, 17, 17, 17,  3, 17, 17, 17,  # 18
+    17,  3, 17,  3, 17, 17, 17, 17,  # 19
+    17, 17,  3, 17, 17, 17, 17, 17,  # 20
+    17, 17, 17, 17, 17,  3, 17, 17,  # 21
+     3, 17, 17, 17, 17, 17, 17,  3,  # 22
+    17, 17, 17, 17, 17, 17,  3, 17,  # 23
+    17, 17, 17, 17, 17, 17, 17, 17,  # 24
+    17, 17, 17, 17,  3, 17, 17, 17,  # 25
+    17,  3, 17,  3, 17, 17, 17, 17,  # 26
+    17, 17,  3, 17, 17, 17, 17, 17,  # 27
+    17, 17, 17, 17, 17,  3, 17, 17,  # 28
+     3, 17, 17, 17, 17, 17, 17,  3,  # 29
+    17, 17, 17, 17, 17, 17,  3, 17,  # 30
+    17, 17, 17, 17, 17, 17, 17, 17,  # 31
+    17, 17, 17, 17,  3, 17, 17, 17,  # 32
+    17,  3, 17,  3, 17, 17, 17, 17,  # 33
+    17, 17,  3, 17, 17, 17, 17, 17,  # 34
+    17, 17, 17, 17, 17,  3, 17, 17,  # 35
+     3, 17, 17, 17, 17, 17, 17,  3,  # 36
+    17, 17, 17, 17, 17, 17,  3, 17,  # 37
+    17, 17, 17, 17, 17, 17, 17, 17,  # 38
+    17, 17, 17, 17,  3, 17, 17, 17,  # 39
+    17,  3, 17,  3, 17, 17, 17, 17,  # 40
+    17, 17,  3, 17, 17, 17, 17, 17,  # 41
+    17, 17, 17, 17, 17,  3, 17, 17,  # 42
+     3, 17, 17, 17, 17, 17, 17,  3,  # 43
+    17, 17, 17, 17, 17, 17,  3, 17,  # 44
+    17, 17, 17, 17, 17, 17, 17, 17,  # 45
+    17, 17, 17, 17,  3, 17, 17, 17,  # 46
+    17,  3, 17,  3, 17, 17, 17, 17,  # 47
+    17, 17,  3, 17, 17, 17, 17, 17,  # 48
+    17, 17, 17, 17, 17,  3, 17, 17,  # 49
+     3, 17, 17, 17, 17, 17, 17,  3,  # 50
+    17, 17, 17, 17, 17, 17,  3, 17,  # 51
+    17, 17, 17, 17, 17, 17, 17, 17,  # 52
+    17, 17, 17, 17,  3, 17, 17, 17,  # 53
+    17,  3, 17,  3, 17, 17, 17,  5,  # 54
+    17, 17,  3, 17, 17, 17,  5,  8,  # 55
+    17, 17, 17, 17, 17,  3,  8,  8,  # 56
+     3, 17, 17, 17, 17, 17,  8,  8,  # 57
+    17,  5, 17, 17, 17, 17,  8,  8,  # 58
+    17,  8, 17, 17, 17, 17,  8,  8,  # 59
+    17,  8, 17, 17,  3,  5,  8,  8,  # 60
+     5,  8, 17,  3, 17,  8,  8,  8,  # 61
+     8,  8,  3, 17, 17,  8,  8,  8,  # 62
+     8,  8, 17, 17, 17,  8,  8,  8,  # 63
+     8,  8, 17, 17,  5,  8,  8,  8,  # 64
+     8,  8, 17,  5,  8,  8,  8,  8,  # 65
+     8,  8,  5,  8,  8,  8,  8,  8,  # 66
+     8,  8,  8,  8,  8,  8,  8,  8,  # 67
+     0,  0,  0,  0,  0,  0,  0,  0,  # 68
+])
+
+TABLES = {"standard": (STANDARD_DESTINATION, STANDARD_FLAGS), "special": (SPECIAL_DESTINATION, SPECIAL_FLAGS)}
+
+
+def lookup(position: int, score: int, variant: str = "standard"):
+    """(destination, flags) for a piece at ``position`` and a throw score"""
+    destination, flags = TABLES[variant]
+    index = position * len(THROWS) + THROW_COLUMNS[score]
+    return destination[index], flags[index]
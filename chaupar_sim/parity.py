@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Checks that the Python rules still match src/utils/chauparRules.js and gameLogic.js
+
+Two levels:
+
+- constants: BOARD_SIZE, COWRIE_SCORES, HIGH_THROWS, SAFE_SQUARES, ... are
+  read straight out of the JavaScript sources and compared (no Node needed)
+- behaviour: random positions are replayed through ``ChauparGameState`` and
+  the ``AI`` class under Node.js and through the batch engine, comparing
+  throw scores, available moves, the board after every move (captures
+  included) and the advanced AI's choice
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import rules
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RULES_JS = Path("src/utils/chauparRules.js")
+LOGIC_JS = Path("src/utils/gameLogic.js")
+
+# Replays the cases from stdin through the real frontend classes
+NODE_HARNESS = r"""
+import { readFileSync } from 'node:fs';
+import { pathToFileURL } from 'node:url';
+const [rulesPath, logicPath] = process.argv.slice(2);
+const { ChauparGameState } = await import(pathToFileURL(rulesPath).href);
+const { AI } = await import(pathToFileURL(logicPath).href);
+
+const input = JSON.parse(readFileSync(0, 'utf8'));
+const toPieces = (positions) => positions.map(position => ({
+  position, canMove: position > 0 && position < 68,
+  status: position === 0 ? 'home' : position === 68 ? 'finished' : 'playing'
+}));
+const load = (board) => {
+  const game = new ChauparGameState();
+  board.forEach((positions, id) => {
+    game.players[id] = { id, name: `P${id}`, pieces: toPieces(positions), hasThore: false };
+  });
+  return game;
+};
+
+const random = Math.random;
+const throws = [];
+for (let up = 0; up < 8; up++) {
+  Math.random = () => (up + 0.5) / 8;
+  const game = new ChauparGameState();
+  const results = [game.throwCowrieShells(), game.throwCowrieShells(), game.throwCowrieShells()];
+  throws.push({ up, score: results[0].score, high: results[0].isHighThrow, burned: !!results[2].burned });
+}
+Math.random = random;
+
+const ai = new AI('advanced');
+const cases = input.cases.map(({ board, player, score }) => {
+  const moves = load(board).getAvailableMoves(player, score);
+  const outcomes = moves.map(move => {
+    const game = load(board);
+    game.movePiece(player, move.pieceIndex, score);
+    return {
+      board: game.players.map(p => p.pieces.map(piece => piece.position)),
+      thore: game.players[player].hasThore,
+      over: game.checkGameOver()
+    };
+  });
+  const choice = ai.makeDecision(null, moves);
+  return { moves: moves.map(m => [m.pieceIndex, m.newPosition]), outcomes, advanced: choice ? choice.pieceIndex : -1 };
+});
+process.stdout.write(JSON.stringify({ throws, cases }));
+"""
+
+
+def _number_list(text: str) -> List[int]:
+    return [int(value) for value in re.findall(r"\d+", text)]
+
+
+def read_js_constants(repo_root: Path = REPO_ROOT) -> Dict[str, Dict]:
+    """Pull the rule constants out of chauparRules.js and gameLogic.js"""
+    rules_js = (repo_root / RULES_JS).read_text()
+    logic_js = (repo_root / LOGIC_JS).read_text()
+
+    def block(name: str) -> str:
+        match = re.search(name + r"\s*:\s*([\[{][^\]}]*[\]}])", rules_js)
+        if not match:
+            raise ValueError(f"{RULES_JS}: {name} not found")
+        return match.group(1)
+
+    def scalar(source: str, pattern: str, path: Path) -> int:
+        match = re.search(pattern, source)
+        if not match:
+            raise ValueError(f"{path}: {pattern} not found")
+        return int(match.group(1))
+
+    return {
+        "chauparRules.js": {
+            "BOARD_SIZE": scalar(rules_js, r"BOARD_SIZE\s*:\s*(\d+)", RULES_JS),
+            "PLAYERS": scalar(rules_js, r"PLAYERS\s*:\s*(\d+)", RULES_JS),
+            "PIECES_PER_PLAYER": scalar(rules_js, r"PIECES_PER_PLAYER\s*:\s*(\d+)", RULES_JS),
+            "COWRIE_SCORES": {int(up): int(score) for up, _, score in
+                              re.findall(r"'(\d)-(\d)'\s*:\s*(\d+)", block("COWRIE_SCORES"))},
+            "HIGH_THROWS": tuple(_number_list(block("HIGH_THROWS"))),
+            "SAFE_SQUARES": tuple(_number_list(block("SAFE_SQUARES"))),
+            "SPECIAL_MOVES": {int(score): int(squares) for score, squares in
+                              re.findall(r"'(\d+)'\s*:\s*(\d+)", block("SPECIAL_MOVES"))},
+        },
+        "gameLogic.js": {
+            "BOARD_SIZE": scalar(logic_js, r"const BOARD_SIZE\s*=\s*(\d+)", LOGIC_JS),
+            "SAFE_SQUARES": tuple(_number_list(re.search(r"const SAFE_SQUARES\s*=\s*(\[[^\]]*\])", logic_js).group(1))),
+            "START_SQUARE": scalar(logic_js, r"const START_SQUARE\s*=\s*(\d+)", LOGIC_JS),
+            "FINISH_SQUARE": scalar(logic_js, r"const FINISH_SQUARE\s*=\s*(\d+)", LOGIC_JS),
+        },
+    }
+
+
+def check_constants(repo_root: Path = REPO_ROOT) -> List[str]:
+    """Return one message per constant that differs between JavaScript and chaupar_sim.rules"""
+    problems = []
+    for source, constants in read_js_constants(repo_root).items():
+        for name, value in constants.items():
+            expected = getattr(rules, name)
+            if value != expected:
+                problems.append(f"{source} {name} = {value!r}, chaupar_sim.rules has {expected!r}")
+    return problems
+
+
+def random_cases(count: int, players: int = rules.PLAYERS, seed: Optional[int] = None) -> List[Dict]:
+    """Random boards and throws, biased towards crowded boards so captures and finishes show up"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    squares = np.concatenate([[0, 0, rules.FINISH_SQUARE], np.arange(1, rules.FINISH_SQUARE)])
+    hot = np.array([1, *rules.SAFE_SQUARES, 40, 41, 58, 60, 62, 63, 67])
+    cases = []
+    for _ in range(count):
+        board = np.where(rng.random((players, rules.PIECES_PER_PLAYER)) < 0.4,
+                         rng.choice(hot, (players, rules.PIECES_PER_PLAYER)),
+                         rng.choice(squares, (players, rules.PIECES_PER_PLAYER)))
+        cases.append({"board": board.tolist(), "player": int(rng.integers(players)),
+                      "score": int(rng.choice(list(rules.COWRIE_SCORES.values())))})
+    return cases
+
+
+def python_outcomes(cases: List[Dict]) -> List[Dict]:
+    """What the batch engine and the advanced policy make of each case"""
+    import numpy as np
+    from .engine import apply_moves, legal_moves
+    from .policies import HeuristicPolicy
+
+    game_rules = rules.Rules(players=len(cases[0]["board"]))
+    board = np.array([case["board"] for case in cases], dtype=np.int8)
+    player = np.array([case["player"] for case in cases], dtype=np.int64)
+    score = np.array([case["score"] for case in cases], dtype=np.int64)
+    rows = np.arange(len(cases))
+    mine = board[rows, player]
+    legal, target = legal_moves(game_rules, mine, score)
+    advanced = HeuristicPolicy().choose(None, legal, mine.astype(np.int16), target, board, 0)
+
+    results = []
+    for i in range(len(cases)):
+        moves, outcomes = [], []
+        for piece in np.flatnonzero(legal[i]):
+            moves.append([int(piece), int(target[i, piece])])
+            after = board[i:i + 1].copy()
+            captured = apply_moves(after, np.array([0]), player[i:i + 1], np.array([piece]), target[i:i + 1, piece])
+            finished = (after[0] == rules.FINISH_SQUARE).all(axis=1)
+            outcomes.append({"board": after[0].tolist(), "thore": bool(captured[0]),
+                             "over": {"gameOver": True, "winner": int(finished.argmax())} if finished.any()
+                             else {"gameOver": False}})
+        results.append({"moves": moves, "outcomes": outcomes, "advanced": int(advanced[i])})
+    return results
+
+
+def check_behaviour(cases: int = 2000, seed: Optional[int] = None, repo_root: Path = REPO_ROOT,
+                    node: str = "node") -> List[str]:
+    """Replay random cases through the JavaScript classes under Node and through the batch engine
+
+    Raises FileNotFoundError when Node.js isn't installed.
+    """
+    from .engine import HIGH_TABLE, SCORE_TABLE
+
+    if shutil.which(node) is None:
+        raise FileNotFoundError(f"{node} not found; behaviour parity needs Node.js")
+    generated = random_cases(cases, seed=seed)
+    with tempfile.TemporaryDirectory(prefix="chaupar-parity-") as tmp:
+        harness = Path(tmp) / "harness.mjs"
+        harness.write_text(NODE_HARNESS)
+        result = subprocess.run([node, str(harness), str(repo_root / RULES_JS), str(repo_root / LOGIC_JS)],
+                                input=json.dumps({"cases": generated}), capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(f"Node harness failed: {result.stderr.strip()[-2000:]}")
+    js = json.loads(result.stdout)
+
+    problems = []
+    for throw in js["throws"]:
+        up = throw["up"]
+        python = {"up": up, "score": int(SCORE_TABLE[up]), "high": bool(HIGH_TABLE[SCORE_TABLE[up]]),
+                  "burned": bool(HIGH_TABLE[SCORE_TABLE[up]])}
+        if throw != python:
+            problems.append(f"throw with {up} shells up: JS {throw}, Python {python}")
+    for case, expected, actual in zip(generated, js["cases"], python_outcomes(generated)):
+        for key in ("moves", "outcomes", "advanced"):
+            if expected[key] != actual[key]:
+                problems.append(f"{key} differ for {case}: JS {expected[key]}, Python {actual[key]}")
+    return problems
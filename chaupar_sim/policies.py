@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Move-choice policies for the batch simulator, after the ``AI`` class in src/utils/gameLogic.js
+
+Every policy picks one piece per game for a whole batch at once. Inputs for
+``n`` games where it is the policy's turn:
+
+- ``legal``:  bool (n, 4), which pieces may move with this throw
+- ``mine``:   int16 (n, 4), current positions of the mover's pieces
+- ``target``: int16 (n, 4), where each piece would land
+- ``board``:  int8 (n, players, 4), every piece on the board
+- ``seat``:   the mover's player index
+
+``choose`` returns the chosen piece index per game, or -1 when nothing can move.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .rules import FINISH_SQUARE, SAFE_SQUARES
+
+SAFE_TABLE = np.zeros(FINISH_SQUARE + 1, dtype=bool)
+SAFE_TABLE[list(SAFE_SQUARES)] = True
+# Landing here sends opposing pieces home (not home, not finished, not a safe square)
+CAPTURE_TABLE = ~SAFE_TABLE
+CAPTURE_TABLE[[0, FINISH_SQUARE]] = False
+
+
+def first_legal(mask: np.ndarray) -> np.ndarray:
+    """Lowest piece index allowed by ``mask`` per row, -1 for empty rows"""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), -1)
+
+
+def random_legal(rng: np.random.Generator, mask: np.ndarray) -> np.ndarray:
+    """Uniformly random piece index allowed by ``mask`` per row, -1 for empty rows"""
+    keys = rng.random(mask.shape)
+    keys[~mask] = -1.0
+    return np.where(mask.any(axis=1), keys.argmax(axis=1), -1)
+
+
+class Policy:
+    """Base class: pick a piece for every game in a batch"""
+
+    name = "policy"
+
+    def choose(self, rng: np.random.Generator, legal: np.ndarray, mine: np.ndarray, target: np.ndarray,
+               board: np.ndarray, seat: int) -> np.ndarray:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class RandomPolicy(Policy):
+    """``basicAI``: a random available move"""
+
+    name = "basic"
+
+    def choose(self, rng, legal, mine, target, board, seat):
+        return random_legal(rng, legal)
+
+
+class IntermediatePolicy(Policy):
+    """``intermediateAI``: finish a piece if possible, else move a random piece not near the finish"""
+
+    name = "intermediate"
+
+    def __init__(self, near_finish: int = 6):
+        self.near_finish = near_finish
+
+    def choose(self, rng, legal, mine, target, board, seat):
+        finishing = legal & (target == FINISH_SQUARE)
+        away = legal & (mine < FINISH_SQUARE - self.near_finish)
+        return np.where(finishing.any(axis=1), first_legal(finishing),
+                        np.where(away.any(axis=1), random_legal(rng, away), first_legal(legal)))
+
+
+class HeuristicPolicy(Policy):
+    """``advancedAI`` as a weighted score per move; the best score wins, ties go to the lowest piece
+
+    With the default weights it makes exactly the choices of ``advancedAI``.
+    ``capture`` and ``start`` are extra terms (zero in the frontend) for the
+    self-play tuner to explore.
+    """
+
+    name = "advanced"
+    DEFAULT_WEIGHTS = {
+        "finish": 100.0,               # landing on the finish square
+        "progress": 1.0,               # per square of the destination
+        "safe": 20.0,                  # landing on a safe square
+        "near_finish_penalty": 30.0,   # moving a piece already close to the finish without finishing
+        "near_finish": 6,              # how close counts as close
+        "capture": 0.0,                # landing on an opposing piece
+        "start": 0.0,                  # bringing a new piece onto the board
+    }
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, name: Optional[str] = None):
+        unknown = set(weights or {}) - set(self.DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown policy weights: {', '.join(sorted(unknown))}")
+        self.weights = dict(self.DEFAULT_WEIGHTS, **(weights or {}))
+        if name:
+            self.name = name
+
+    def score(self, legal, mine, target, board, seat) -> np.ndarray:
+        w = self.weights
+        finishing = target == FINISH_SQUARE
+        score = w["progress"] * target + w["finish"] * finishing + w["safe"] * SAFE_TABLE[np.clip(target, 0, FINISH_SQUARE)]
+        score -= w["near_finish_penalty"] * ((mine > FINISH_SQUARE - w["near_finish"]) & ~finishing)
+        if w["start"]:
+            score += w["start"] * (mine == 0)
+        if w["capture"]:
+            others = np.delete(board, seat, axis=1).reshape(len(board), -1)
+            hits = (target[:, :, None] == others[:, None, :]).any(axis=2)
+            score += w["capture"] * (hits & CAPTURE_TABLE[np.clip(target, 0, FINISH_SQUARE)])
+        return np.where(legal, score, -np.inf)
+
+    def choose(self, rng, legal, mine, target, board, seat):
+        return np.where(legal.any(axis=1), self.score(legal, mine, target, board, seat).argmax(axis=1), -1)
+
+
+SKILL_POLICIES = {
+    "basic": RandomPolicy,
+    "intermediate": IntermediatePolicy,
+    "advanced": HeuristicPolicy,
+}
+
+
+def make_policy(spec) -> Policy:
+    """Build a policy from a skill level name (``VITE_DEFAULT_AI_SKILL`` values) or pass one through"""
+    if isinstance(spec, Policy):
+        return spec
+    try:
+        return SKILL_POLICIES[spec]()
+    except KeyError:
+        raise ValueError(f"Unknown AI skill level '{spec}' (expected one of: {', '.join(SKILL_POLICIES)})")
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+Offline replay of exported games: columnar move logs and analytics
+
+``setup_automation.py maintain export`` streams the ``games`` and
+``gameMoves`` collections into one ``.npz`` file: move pages are appended
+to ``MoveColumns`` as they arrive, and ``MoveLog`` writes:
+
+- game columns, one row per game: ``game_id``, ``status``, ``mode``,
+  ``skill``, ``ai_seat`` (-1 for none), ``players``, ``created_at``
+  (Unix seconds, NaN if unknown) and ``offsets``
+- move columns, grouped by game and in play order: ``seat``, ``dice``,
+  ``from_position``, ``to_position`` and ``timestamp``
+
+The moves of game ``i`` are ``offsets[i]:offsets[i + 1]``, so one game's
+moves are a slice and per-game aggregates are ``np.add.reduceat`` calls.
+
+``replay`` rebuilds the boards of every game at once, one move index at a
+time like the ``Simulator``, and ``analyze`` turns the result into game
+lengths, throw distributions, capture counts and AI win rates.
+"""
+
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .engine import apply_moves
+from .rules import FINISH_SQUARE, HOME, PIECES_PER_PLAYER
+
+FORMAT_VERSION = 1
+# gameService.js allows up to four players per game
+MAX_SEATS = 4
+GAME_COLUMNS = ("game_id", "status", "mode", "skill", "ai_seat", "players", "created_at", "offsets")
+MOVE_COLUMNS = ("seat", "dice", "from_position", "to_position", "timestamp")
+
+
+def _seconds(value) -> float:
+    """Unix seconds from a Firestore timestamp, an ISO string or a number; NaN if unknown"""
+    if hasattr(value, "timestamp"):
+        return value.timestamp()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        from datetime import datetime
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return float("nan")
+
+
+def _int(value, default: int = -1) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def player_ids(game: Dict) -> List[str]:
+    """Player IDs of a game document in seat order
+
+    ``players`` is a list of ``{id, ...}`` objects in the app and a map of
+    uid -> ``{color, ...}`` in the load test; map entries are seated by color.
+    """
+    players = game.get("players")
+    if isinstance(players, dict):
+        return sorted(players, key=lambda uid: (_int((players[uid] or {}).get("color"), MAX_SEATS), uid))
+    if isinstance(players, list):
+        return [str(player.get("id", index)) if isinstance(player, dict) else str(player)
+                for index, player in enumerate(players)]
+    return []
+
+
+def ai_seat(game: Dict) -> int:
+    """Seat of the AI player: the one marked ``isAI``, else seat 1 in an AI-mode game"""
+    players = game.get("players")
+    entries = list(players.values()) if isinstance(players, dict) else players if isinstance(players, list) else []
+    for seat, player in enumerate(entries):
+        if isinstance(player, dict) and player.get("isAI"):
+            return seat
+    return 1 if game.get("mode") == "ai" else -1
+
+
+class MoveColumns:
+    """Move documents appended page by page to typed column buffers
+
+    Pages have to arrive ordered by ``gameId`` and then in play order, as
+    the export's cursor scan returns them, so each game's moves form one
+    run: ``game_ids[i]`` starts at row ``starts[i]``. Players are stored as
+    indexes into ``players[i]``, the game's player IDs in order of their
+    first move, and become seats once the game document is known.
+    """
+
+    DTYPES = {"player": np.int16, "dice": np.int16, "from_position": np.int16, "to_position": np.int16,
+              "timestamp": np.float64}
+
+    def __init__(self):
+        self.game_ids: List[str] = []
+        self.players: List[List[str]] = []
+        self.starts = array("q")
+        self.player = array("h")
+        self.dice = array("h")
+        self.from_position = array("h")
+        self.to_position = array("h")
+        self.timestamp = array("d")
+        self._numbers: Dict[str, int] = {}
+
+    def append(self, moves: Iterable[Dict]) -> None:
+        for move in moves:
+            game_id = str(move.get("gameId"))
+            if not self.game_ids or self.game_ids[-1] != game_id:
+                self.game_ids.append(game_id)
+                self.players.append([])
+                self.starts.append(len(self.dice))
+                self._numbers = {}
+            player_id = str(move.get("playerId"))
+            number = self._numbers.get(player_id)
+            if number is None:
+                number = self._numbers[player_id] = len(self.players[-1])
+                self.players[-1].append(player_id)
+            self.player.append(number)
+            self.dice.append(_int(move.get("diceValue"), 0))
+            self.from_position.append(_int(move.get("fromPosition")))
+            self.to_position.append(_int(move.get("toPosition")))
+            self.timestamp.append(_seconds(move.get("timestamp")))
+
+    def __len__(self) -> int:
+        return len(self.dice)
+
+
+class MoveLog:
+    """Exported games and their moves as flat columns, moves grouped by game"""
+
+    def __init__(self, games: Dict[str, np.ndarray], moves: Dict[str, np.ndarray], exported_at: float = 0.0):
+        self.games = games
+        self.moves = moves
+        self.exported_at = exported_at
+
+    @classmethod
+    def from_columns(cls, games: List[Dict], moves: "MoveColumns") -> "MoveLog":
+        """Build the log from game documents and the move columns of an export
+
+        Moves whose ``gameId`` has no game document get a row with status
+        ``missing``; players not listed in the game are seated after the
+        listed ones in order of their first move.
+        """
+        games = list(games)
+        runs = {game_id: run for run, game_id in enumerate(moves.game_ids)}
+        games += [{"id": game_id, "status": "missing"}
+                  for game_id in sorted(runs.keys() - {str(game.get("id")) for game in games})]
+        bounds = np.append(np.frombuffer(moves.starts, dtype=np.int64), len(moves))
+        players = np.frombuffer(moves.player, dtype=MoveColumns.DTYPES["player"])
+        game_cols = {name: [] for name in GAME_COLUMNS}
+        rows, seat_parts = [], []
+        offset = 0
+        for game in games:
+            seats = {uid: seat for seat, uid in enumerate(player_ids(game))}
+            run = runs.get(str(game.get("id")))
+            count = 0
+            if run is not None:
+                start, end = int(bounds[run]), int(bounds[run + 1])
+                count = end - start
+                # The run numbers its players by first move; map them onto seats
+                seat_of = np.array([seats.setdefault(uid, len(seats)) for uid in moves.players[run]], dtype=np.int16)
+                seat_of[seat_of >= MAX_SEATS] = -1
+                rows.append(np.arange(start, end))
+                seat_parts.append(seat_of[players[start:end]])
+            game_cols["game_id"].append(str(game.get("id")))
+            game_cols["status"].append(str(game.get("status") or ""))
+            game_cols["mode"].append(str(game.get("mode") or ""))
+            game_cols["skill"].append(str(game.get("skillLevel") or ""))
+            game_cols["ai_seat"].append(ai_seat(game))
+            game_cols["players"].append(min(len(seats), MAX_SEATS))
+            game_cols["created_at"].append(_seconds(game.get("createdAt")))
+            game_cols["offsets"].append(offset)
+            offset += count
+        game_cols["offsets"].append(offset)
+
+        order = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        move_cols = {"seat": np.concatenate(seat_parts).astype(np.int8) if seat_parts else np.zeros(0, dtype=np.int8)}
+        for name in MOVE_COLUMNS[1:]:
+            move_cols[name] = np.frombuffer(getattr(moves, name), dtype=MoveColumns.DTYPES[name])[order]
+        dtypes = {"ai_seat": np.int8, "players": np.int8, "created_at": np.float64, "offsets": np.int64}
+        return cls({name: np.array(values, dtype=dtypes.get(name, str)) for name, values in game_cols.items()},
+                   move_cols, exported_at=time.time())
+
+    @classmethod
+    def load(cls, path) -> "MoveLog":
+        with np.load(path) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"{path}: format version {int(data['format_version'])}, expected {FORMAT_VERSION}")
+            return cls({name: data[name] for name in GAME_COLUMNS}, {name: data[name] for name in MOVE_COLUMNS},
+                       exported_at=float(data["exported_at"]))
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        np.savez_compressed(path, format_version=FORMAT_VERSION, exported_at=self.exported_at,
+                            **self.games, **self.moves)
+        # savez appends .npz unless the name already ends with it
+        return path if path.suffix == ".npz" else path.with_name(path.name + ".npz")
+
+    def __len__(self) -> int:
+        return len(self.games["game_id"])
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Moves per game"""
+        return np.diff(self.games["offsets"])
+
+    def moves_of(self, game_id: str) -> Dict[str, np.ndarray]:
+        index = int(np.flatnonzero(self.games["game_id"] == game_id)[0])
+        start, end = self.games["offsets"][index], self.games["offsets"][index + 1]
+        return {name: column[start:end] for name, column in self.moves.items()}
+
+
+class ReplayResult:
+    """Per-game outcomes of replaying a move log"""
+
+    def __init__(self, winner: np.ndarray, finish_move: np.ndarray, captures: np.ndarray,
+                 inconsistent: np.ndarray, boards: np.ndarray, elapsed: float):
+        self.winner = winner              # int8 (games,), -1 while nobody has all pieces home
+        self.finish_move = finish_move    # int32 (games,), moves played when the winner finished, -1 if none
+        self.captures = captures          # int16 (games, seats), pieces sent home by each seat
+        self.inconsistent = inconsistent  # int32 (games,), moves with no piece on their from square
+        self.boards = boards              # int8 (games, seats, pieces), the final positions
+        self.elapsed = elapsed
+
+
+def replay(log: MoveLog) -> ReplayResult:
+    """Rebuild every game's board from its moves
+
+    All games advance together: step ``k`` applies the ``k``-th move of every
+    game that has one. A move takes a piece of the mover's from the square it
+    names (home for 0) to its target, and sends opposing pieces on an unsafe
+    target home, as ``apply_moves`` does in the simulator. Moves that don't
+    match the rebuilt board are counted as inconsistent and skipped.
+    """
+    start = time.perf_counter()
+    n = len(log)
+    offsets, lengths = log.games["offsets"], log.lengths
+    seat_column, from_column, to_column = log.moves["seat"], log.moves["from_position"], log.moves["to_position"]
+    boards = np.full((n, MAX_SEATS, PIECES_PER_PLAYER), HOME, dtype=np.int8)
+    winner = np.full(n, -1, dtype=np.int8)
+    finish_move = np.full(n, -1, dtype=np.int32)
+    captures = np.zeros((n, MAX_SEATS), dtype=np.int16)
+    inconsistent = np.zeros(n, dtype=np.int32)
+
+    # Games sorted by length so the ones still running at step k are a prefix
+    by_length = np.argsort(-lengths, kind="stable")
+    remaining = lengths[by_length]
+    for k in range(int(lengths.max(initial=0))):
+        rows = by_length[:np.searchsorted(-remaining, -k, side="left")]
+        index = offsets[rows] + k
+        seat, source, target = seat_column[index].astype(np.int64), from_column[index], to_column[index]
+        valid = (seat >= 0) & (target >= HOME) & (target <= FINISH_SQUARE)
+        mine = boards[rows, np.where(valid, seat, 0)]
+        match = mine == source[:, None]
+        valid &= match.any(axis=1)
+        inconsistent[rows[~valid]] += 1
+        rows, seat, target = rows[valid], seat[valid], target[valid]
+        if not len(rows):
+            continue
+        piece = match[valid].argmax(axis=1)
+        sent_home = apply_moves(boards, rows, seat, piece, target.astype(np.int8))
+        np.add.at(captures, (rows, seat), sent_home)
+
+        done = (winner[rows] < 0) & (boards[rows, seat] == FINISH_SQUARE).all(axis=1)
+        winner[rows[done]] = seat[done]
+        finish_move[rows[done]] = k + 1
+    return ReplayResult(winner, finish_move, captures, inconsistent, boards, time.perf_counter() - start)
+
+
+def _distribution(values: np.ndarray) -> Dict:
+    if not len(values):
+        return {"mean": 0.0, "p50": 0.0, "p90": 0.0, "max": 0.0}
+    return {"mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+            "p90": float(np.percentile(values, 90)), "max": float(values.max())}
+
+
+def analyze(log: MoveLog, result: Optional[ReplayResult] = None) -> Dict:
+    """Aggregates over every game in the log; replays it first unless ``result`` is given"""
+    result = result or replay(log)
+    lengths = log.lengths
+    played = lengths > 0
+    decided = result.winner >= 0
+
+    # Wall-clock length of each game: last move minus first move
+    timestamps = log.moves["timestamp"]
+    starts, ends = log.games["offsets"][:-1][played], log.games["offsets"][1:][played] - 1
+    durations = timestamps[ends] - timestamps[starts]
+    durations = durations[np.isfinite(durations)]
+
+    dice = log.moves["dice"]
+    values, counts = np.unique(dice, return_counts=True)
+
+    seats = log.games["players"].astype(np.int64)
+    win_rate_by_seat = {}
+    for seat in range(MAX_SEATS):
+        eligible = decided & (seats > seat)
+        if eligible.any():
+            win_rate_by_seat[seat] = float((result.winner[eligible] == seat).mean())
+
+    ai_seats = log.games["ai_seat"]
+    ai_games = decided & (ai_seats >= 0)
+    ai_win_rates = {}
+    for skill in np.unique(log.games["skill"][ai_games]):
+        rows = ai_games & (log.games["skill"] == skill)
+        ai_win_rates[str(skill) or "unknown"] = {"games": int(rows.sum()),
+                                                  "win_rate": float((result.winner[rows] == ai_seats[rows]).mean())}
+
+    statuses, status_counts = np.unique(log.games["status"], return_counts=True)
+    return {
+        "games": len(log),
+        "games_with_moves": int(played.sum()),
+        "moves": int(lengths.sum()),
+        "statuses": {str(status) or "unknown": int(count) for status, count in zip(statuses, status_counts)},
+        "decided": int(decided.sum()),
+        "moves_per_game": _distribution(lengths[played]),
+        "moves_to_finish": _distribution(result.finish_move[decided]),
+        "duration_seconds": _distribution(durations),
+        "throws": {int(value): int(count) for value, count in zip(values, counts)},
+        "throw_shares": {int(value): float(count / counts.sum()) for value, count in zip(values, counts)},
+        "captures_per_game": float(result.captures[played].sum(axis=1).mean()) if played.any() else 0.0,
+        "inconsistent_moves": int(result.inconsistent.sum()),
+        "win_rate_by_seat": win_rate_by_seat,
+        "ai_win_rates": ai_win_rates,
+        "replay_seconds": result.elapsed,
+    }
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Chaupar rules as plain Python data, mirroring src/utils/chauparRules.js
+
+The frontend keeps one game in ``ChauparGameState``; these constants are the
+same rules in a form the array-backed simulator (and anything else in the
+Python tooling) can use without a browser. ``parity.py`` checks them against
+the JavaScript sources.
+"""
+
+from typing import Dict, List, Optional
+
+# CHAUPAR_RULES in chauparRules.js
+BOARD_SIZE = 68
+PLAYERS = 2
+PIECES_PER_PLAYER = 4
+
+# Shells facing up -> score ("<up>-<down>" keys in COWRIE_SCORES)
+COWRIE_SCORES: Dict[int, int] = {0: 7, 1: 10, 2: 2, 3: 3, 4: 4, 5: 25, 6: 30, 7: 14}
+HIGH_THROWS = (10, 25, 30)
+SAFE_SQUARES = (8, 15, 22, 29, 36, 43, 50, 57, 64)
+SPECIAL_MOVES: Dict[int, int] = {25: 8, 30: 13}
+
+# gameLogic.js
+START_SQUARE = 1
+FINISH_SQUARE = 68
+
+# Three high throws in a row burn the turn ("beli jaye")
+MAX_HIGH_THROWS = 3
+
+# Piece positions: 0 is home, 1..67 on the board, FINISH_SQUARE finished
+HOME = 0
+
+
+class Rules:
+    """One rule variant for the simulator
+
+    The defaults reproduce ``ChauparGameState`` exactly, including its quirks:
+    every player enters on square 1, and ``movePiece`` looks SPECIAL_MOVES up
+    but still moves the full throw. ``special_moves=True`` applies the
+    traditional 25 -> 8 and 30 -> 13 translations instead, for balance
+    experiments.
+    """
+
+    def __init__(self, players: int = PLAYERS, special_moves: bool = False, max_turns: int = 5000):
+        if not 2 <= players <= 4:
+            raise ValueError("Chaupar is played by 2 to 4 players")
+        self.players = players
+        self.special_moves = special_moves
+        self.max_turns = max_turns
+
+    def distance(self, score: int) -> int:
+        """Squares a piece on the board moves for a throw"""
+        if self.special_moves:
+            return SPECIAL_MOVES.get(score, score)
+        return score
+
+    def destination(self, position: int, score: int) -> Optional[int]:
+        """Where a piece at ``position`` ends up for ``score``, or None if it can't move
+
+        Mirrors ``canMovePiece`` / ``movePiece``: pieces at home need a high
+        throw and enter on START_SQUARE, finished pieces never move, and a
+        move may end on FINISH_SQUARE but not overshoot it.
+        """
+        if position == FINISH_SQUARE:
+            return None
+        if position == HOME:
+            return START_SQUARE if score in HIGH_THROWS else None
+        target = position + self.distance(score)
+        return target if target <= BOARD_SIZE else None
+
+    @staticmethod
+    def captures(position: int) -> bool:
+        """Whether landing on ``position`` sends opposing pieces there home"""
+        return HOME < position < FINISH_SQUARE and position not in SAFE_SQUARES
+
+    def legal_moves(self, pieces: List[int], score: int) -> List[Dict]:
+        """Available moves for one player's pieces, shaped like ``getAvailableMoves``"""
+        moves = []
+        for index, position in enumerate(pieces):
+            target = self.destination(position, score)
+            if target is not None:
+                moves.append({"pieceIndex": index, "currentPosition": position, "newPosition": target,
+                              "type": "start" if position == HOME else "move"})
+        return moves
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Self-play across all cores: AI skill tables and heuristic tuning
+
+Every match is split into chunks of games that run in a
+``ProcessPoolExecutor``; each chunk is one ``Simulator.play`` call with its
+own seed spawned from the run's ``SeedSequence``, so results are
+reproducible for a given seed and worker count. Policies swap seats every
+other chunk so the first-move advantage cancels out.
+
+- ``round_robin`` plays every pair of policies and returns a win-rate table
+- ``tune`` hill-climbs the ``HeuristicPolicy`` weights: each round plays
+  one candidate per weight and direction against the current best and
+  keeps the strongest one that wins significantly more than half its games
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .engine import Simulator
+from .policies import SKILL_POLICIES, HeuristicPolicy, Policy, make_policy
+from .rules import Rules
+
+# Weights the tuner moves; ``progress`` stays at 1 as the unit the others are measured in
+TUNABLE_WEIGHTS = ("finish", "safe", "near_finish_penalty", "near_finish", "capture", "start")
+# Step for weights that start at zero, and the bounds for ``near_finish`` (squares)
+ZERO_STEP = 10.0
+NEAR_FINISH_RANGE = (1, 30)
+
+
+def _play_chunk(task) -> Dict:
+    """Worker: play one chunk of a match and return the counts (runs in a child process)"""
+    rules_kwargs, seats, games, seed = task
+    start = time.process_time()
+    result = Simulator(Rules(**rules_kwargs), seats, seed=seed).play(games)
+    return {
+        "wins": [int((result.winner == seat).sum()) for seat in range(len(seats))],
+        "games": result.games,
+        "throws": int(result.throws.sum()),
+        "seconds": time.process_time() - start,
+    }
+
+
+class MatchResult:
+    """Aggregated outcome of policy ``a`` against policy ``b``"""
+
+    def __init__(self, a: Policy, b: Policy):
+        self.a, self.b = a, b
+        self.games = 0
+        self.wins_a = 0
+        self.wins_b = 0
+        self.throws = 0
+        self.cpu_seconds = 0.0
+
+    @property
+    def unfinished(self) -> int:
+        return self.games - self.wins_a - self.wins_b
+
+    @property
+    def win_rate(self) -> float:
+        """Share of decided games won by ``a``"""
+        decided = self.wins_a + self.wins_b
+        return self.wins_a / decided if decided else 0.5
+
+    @property
+    def z_score(self) -> float:
+        """How many standard errors ``a``'s win rate is above 50%"""
+        decided = self.wins_a + self.wins_b
+        return (self.win_rate - 0.5) / (0.5 / decided ** 0.5) if decided else 0.0
+
+    def to_dict(self) -> Dict:
+        return {"a": self.a.name, "b": self.b.name, "games": self.games, "wins_a": self.wins_a,
+                "wins_b": self.wins_b, "unfinished": self.unfinished, "win_rate_a": self.win_rate,
+                "z_score": self.z_score}
+
+
+class SelfPlay:
+    """Runs matches between policies on a process pool; use as a context manager
+
+    ``players`` > 2 seats the two policies alternately (a, b, a, b).
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_games: int = 50_000, players: int = 2,
+                 special_moves: bool = False, max_turns: int = 5000, seed: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_games = chunk_games
+        self.rules_kwargs = {"players": players, "special_moves": special_moves, "max_turns": max_turns}
+        self.seeds = np.random.SeedSequence(seed)
+        self.games_played = 0
+        self.cpu_seconds = 0.0
+        self.wall_seconds = 0.0
+        self._executor = None
+
+    def __enter__(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *exc):
+        self._executor.shutdown()
+        self._executor = None
+
+    @property
+    def games_per_second_per_core(self) -> float:
+        """Simulation throughput of one worker, from the CPU time spent inside the chunks"""
+        return self.games_played / self.cpu_seconds if self.cpu_seconds else 0.0
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games_played / self.wall_seconds if self.wall_seconds else 0.0
+
+    def _seats(self, a: Policy, b: Policy, swapped: bool) -> List[Policy]:
+        first, second = (b, a) if swapped else (a, b)
+        return [first if seat % 2 == 0 else second for seat in range(self.rules_kwargs["players"])]
+
+    def matches(self, pairs: Sequence[Tuple], games: int) -> List[MatchResult]:
+        """Play ``games`` games for every (a, b) pair, all chunks of all pairs in one pool run"""
+        if self._executor is None:
+            raise RuntimeError("SelfPlay must be used as a context manager")
+        results = [MatchResult(make_policy(a), make_policy(b)) for a, b in pairs]
+        tasks, owners = [], []
+        for index, match in enumerate(results):
+            for chunk, offset in enumerate(range(0, games, self.chunk_games)):
+                swapped = chunk % 2 == 1
+                seed = self.seeds.spawn(1)[0]
+                tasks.append((self.rules_kwargs, self._seats(match.a, match.b, swapped),
+                              min(self.chunk_games, games - offset), seed))
+                owners.append((index, swapped))
+
+        start = time.perf_counter()
+        for (index, swapped), chunk in zip(owners, self._executor.map(_play_chunk, tasks)):
+            match = results[index]
+            wins_first = sum(chunk["wins"][0::2])
+            wins_second = sum(chunk["wins"][1::2])
+            match.wins_a += wins_second if swapped else wins_first
+            match.wins_b += wins_first if swapped else wins_second
+            match.games += chunk["games"]
+            match.throws += chunk["throws"]
+            match.cpu_seconds += chunk["seconds"]
+        self.wall_seconds += time.perf_counter() - start
+        self.games_played += sum(match.games for match in results)
+        self.cpu_seconds += sum(match.cpu_seconds for match in results)
+        return results
+
+    def round_robin(self, policies: Sequence, games: int) -> Dict:
+        """Win-rate table: ``table[row][col]`` is how often ``row`` beats ``col``"""
+        policies = [make_policy(policy) for policy in policies]
+        pairs = [(a, b) for i, a in enumerate(policies) for b in policies[i + 1:]]
+        table = {policy.name: {policy.name: 0.5} for policy in policies}
+        matches = self.matches(pairs, games)
+        for match in matches:
+            table[match.a.name][match.b.name] = match.win_rate
+            table[match.b.name][match.a.name] = 1.0 - match.win_rate
+        # Average win rate against every other policy
+        overall = {name: (sum(row.values()) - 0.5) / max(1, len(row) - 1) for name, row in table.items()}
+        return {"table": table, "overall": overall, "matches": [match.to_dict() for match in matches]}
+
+    def tune(self, base: Optional[Dict] = None, rounds: int = 10, games: int = 200_000, step: float = 0.5,
+             min_z: float = 3.0, log=print) -> Tuple[Dict, List[Dict]]:
+        """Hill-climb HeuristicPolicy weights, starting from ``base`` (the advanced AI by default)
+
+        ``step`` is the relative change tried per weight; it halves after a
+        round without a significant improvement. Returns the best weights
+        and one history entry per round.
+        """
+        best = dict(HeuristicPolicy.DEFAULT_WEIGHTS, **(base or {}))
+        history = []
+        for round_number in range(1, rounds + 1):
+            incumbent = HeuristicPolicy(best, name="incumbent")
+            candidates = [HeuristicPolicy(weights, name=f"{key}={weights[key]:g}")
+                          for key, weights in self._neighbours(best, step)]
+            results = self.matches([(candidate, incumbent) for candidate in candidates], games)
+            winner = max(results, key=lambda match: match.win_rate)
+            improved = winner.z_score >= min_z
+            history.append({"round": round_number, "step": step, "best": winner.a.name,
+                            "win_rate": winner.win_rate, "z_score": winner.z_score, "accepted": improved,
+                            "candidates": {match.a.name: match.win_rate for match in results}})
+            log(f"  Round {round_number}: {winner.a.name} wins {winner.win_rate:.2%} "
+                f"(z={winner.z_score:.1f}) {'✅ accepted' if improved else '— step halved'}")
+            if improved:
+                best = dict(winner.a.weights)
+            else:
+                step /= 2
+        return best, history
+
+    @staticmethod
+    def _neighbours(weights: Dict, step: float):
+        for key in TUNABLE_WEIGHTS:
+            value = weights[key]
+            if key == "near_finish":
+                delta = max(1, round(value * step))
+                options = [min(NEAR_FINISH_RANGE[1], value + delta), max(NEAR_FINISH_RANGE[0], value - delta)]
+            elif value:
+                options = [value * (1 + step), value * (1 - step)]
+            else:
+                options = [ZERO_STEP * step * 2, -ZERO_STEP * step * 2]
+            for option in dict.fromkeys(options):
+                if option != value:
+                    yield key, dict(weights, **{key: round(option, 3)})
+
+
+def default_skill(env_file: str = ".env.local") -> Optional[str]:
+    """``VITE_DEFAULT_AI_SKILL`` from the env file ``setup_environment_file`` writes, if set"""
+    try:
+        with open(env_file) as f:
+            for line in f:
+                if line.strip().startswith("VITE_DEFAULT_AI_SKILL="):
+                    return line.split("=", 1)[1].strip() or None
+    except OSError:
+        pass
+    return None
+
+
+def skill_policies(tuned: Optional[Dict] = None) -> List[Policy]:
+    """The frontend's skill levels, plus the tuned heuristic when given"""
+    policies = [make_policy(name) for name in SKILL_POLICIES]
+    if tuned:
+        policies.append(HeuristicPolicy(tuned, name="tuned"))
+    return policies
+
+
+def markdown_table(report: Dict) -> str:
+    """Render a round-robin report as a Markdown win-rate table"""
+    names = list(report["table"])
+    lines = ["| wins against → | " + " | ".join(names) + " | overall |",
+             "|---" * (len(names) + 2) + "|"]
+    for row in names:
+        cells = ["—" if row == col else f"{report['table'][row][col]:.1%}" for col in names]
+        lines.append(f"| **{row}** | " + " | ".join(cells) + f" | {report['overall'][row]:.1%} |")
+    return "\n".join(lines) + "\n"
+
+
+def timestamp() -> str:
+    return datetime.now().isoformat(timespec="seconds")
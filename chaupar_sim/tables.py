@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Build-time generator for the precomputed move tables
+
+For every position (0 = home .. 68 = finished) and every throw (indexed by
+shells facing up, 0..7) the tables hold where a piece lands and a bit set
+of what that move means, for both rule variants (``standard`` as played by
+``ChauparGameState``, ``special`` with the 25 -> 8 and 30 -> 13 moves).
+Move generation then becomes two lookups at ``position * 8 + throw``.
+
+Two files are generated from ``rules.py`` and committed:
+
+- ``src/utils/moveTables.js``: the tables as a JSON literal plus a lookup
+  helper, used by ``chauparRules.js``
+- ``chaupar_sim/move_tables.py``: the same data in ``array`` objects, used
+  by the simulator and any other Python tooling
+
+Regenerate with ``python -m chaupar_sim tables`` after changing the rules;
+``--check`` fails when the committed files are stale.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from .rules import BOARD_SIZE, COWRIE_SCORES, FINISH_SQUARE, HOME, SAFE_SQUARES, Rules
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+JS_MODULE = Path("src/utils/moveTables.js")
+PY_MODULE = Path("chaupar_sim/move_tables.py")
+FORMAT_VERSION = 1
+
+POSITIONS = FINISH_SQUARE + 1
+# Column order: shells facing up
+THROWS = [COWRIE_SCORES[up] for up in range(8)]
+
+# Flag bits
+LEGAL = 1          # the piece may move with this throw
+SAFE = 2           # lands on a safe square
+FINISHES = 4       # lands exactly on the finish square
+PASSES_HOME = 8    # would overshoot the finish square, so the move isn't allowed
+CAPTURES = 16      # lands where opposing pieces are sent home
+ENTERS = 32        # brings a piece from home onto the board
+FLAGS = {"LEGAL": LEGAL, "SAFE": SAFE, "FINISHES": FINISHES, "PASSES_HOME": PASSES_HOME,
+         "CAPTURES": CAPTURES, "ENTERS": ENTERS}
+
+VARIANTS = {"standard": Rules(special_moves=False), "special": Rules(special_moves=True)}
+
+
+def build_variant(rules: Rules) -> Dict[str, List[int]]:
+    """Dense destination (-1 when the piece can't move) and flag tables, row-major by position"""
+    destination, flags = [], []
+    for position in range(POSITIONS):
+        for score in THROWS:
+            target = rules.destination(position, score)
+            bits = 0
+            if target is None:
+                if HOME < position < FINISH_SQUARE:
+                    bits |= PASSES_HOME
+                target = -1
+            else:
+                bits |= LEGAL
+                if position == HOME:
+                    bits |= ENTERS
+                if target in SAFE_SQUARES:
+                    bits |= SAFE
+                if target == FINISH_SQUARE:
+                    bits |= FINISHES
+                if rules.captures(target):
+                    bits |= CAPTURES
+            destination.append(target)
+            flags.append(bits)
+    return {"destination": destination, "flags": flags}
+
+
+def build_tables() -> Dict:
+    return {
+        "version": FORMAT_VERSION,
+        "boardSize": BOARD_SIZE,
+        "positions": POSITIONS,
+        "throws": THROWS,
+        "flags": FLAGS,
+        "variants": {name: build_variant(rules) for name, rules in VARIANTS.items()},
+    }
+
+
+JS_TEMPLATE = """// Generated by `python -m chaupar_sim tables` from chaupar_sim/rules.py - do not edit.
+// Dense move tables for every (position, throw) pair; index = position * throws.length + column.
+
+export const MOVE_TABLES = %(payload)s;
+
+export const MOVE_FLAGS = MOVE_TABLES.flags;
+
+const THROW_COLUMNS = Object.fromEntries(MOVE_TABLES.throws.map((score, column) => [score, column]));
+
+// Destination (-1 if the piece can't move) and flag bits for a piece at `position` and a throw score
+export const lookupMove = (position, throwScore, variant = 'standard') => {
+  const column = THROW_COLUMNS[throwScore];
+  const { destination, flags } = MOVE_TABLES.variants[variant];
+  if (column === undefined || position < 0 || position >= MOVE_TABLES.positions) {
+    return { destination: -1, flags: 0 };
+  }
+  const index = position * MOVE_TABLES.throws.length + column;
+  return { destination: destination[index], flags: flags[index] };
+};
+"""
+
+
+def render_js(tables: Dict) -> str:
+    return JS_TEMPLATE % {"payload": json.dumps(tables, separators=(",", ":"))}
+
+
+def _array_literal(typecode: str, values: List[int], width: int) -> str:
+    rows = [", ".join(f"{value:>{width}}" for value in values[i:i + len(THROWS)])
+            for i in range(0, len(values), len(THROWS))]
+    body = "".join(f"    {row},  # {position}\n" for position, row in enumerate(rows))
+    return f"array(\"{typecode}\", [\n{body}])"
+
+
+def render_python(tables: Dict) -> str:
+    variants = "".join(
+        f"{name.upper()}_DESTINATION = {_array_literal('b', variant['destination'], 2)}\n"
+        f"{name.upper()}_FLAGS = {_array_literal('B', variant['flags'], 2)}\n\n"
+        for name, variant in tables["variants"].items()
+    )
+    flags = "\n".join(f"{name} = {bit}" for name, bit in tables["flags"].items())
+    tables_dict = ", ".join(f"\"{name}\": ({name.upper()}_DESTINATION, {name.upper()}_FLAGS)"
+                            for name in tables["variants"])
+    return f'''# -*- coding: utf-8 -*-
+# Generated by `python -m chaupar_sim tables` from chaupar_sim/rules.py - do not edit.
+"""
+Dense move tables for every (position, throw) pair, row-major by position
+
+Rows are positions 0 (home) .. {tables["positions"] - 1} (finished), columns are throws by shells
+facing up (scores {tables["throws"]}). Destinations are -1 where the piece can't move.
+"""
+
+from array import array
+
+FORMAT_VERSION = {tables["version"]}
+POSITIONS = {tables["positions"]}
+THROWS = {tuple(tables["throws"])}
+THROW_COLUMNS = {{score: column for column, score in enumerate(THROWS)}}
+
+{flags}
+
+{variants}TABLES = {{{tables_dict}}}
+
+
+def lookup(position: int, score: int, variant: str = "standard"):
+    """(destination, flags) for a piece at ``position`` and a throw score"""
+    destination, flags = TABLES[variant]
+    index = position * len(THROWS) + THROW_COLUMNS[score]
+    return destination[index], flags[index]
+'''
+
+
+def generate() -> Dict[Path, str]:
+    """Rendered contents of every generated file, keyed by path relative to the repo"""
+    tables = build_tables()
+    return {JS_MODULE: render_js(tables), PY_MODULE: render_python(tables)}
+
+
+def stale_files(repo_root: Path = REPO_ROOT) -> List[Path]:
+    """Generated files that are missing or differ from what the current rules produce"""
+    stale = []
+    for path, content in generate().items():
+        target = repo_root / path
+        if not target.exists() or target.read_text() != content:
+            stale.append(path)
+    return stale
+
+
+def write_tables(repo_root: Path = REPO_ROOT) -> List[Path]:
+    """Write the generated files and return the ones that changed"""
+    changed = stale_files(repo_root)
+    for path, content in generate().items():
+        if path in changed:
+            (repo_root / path).write_text(content)
+    return changed
+
@@ -18,49 +18,1068 @@ import os
 import sys
 import json
 import argparse
+import base64
 import subprocess
-import requests
+import asyncio
+import contextlib
+import contextvars
+import functools
+import importlib.util
 from pathlib import Path
 from typing import Dict, List, Optional
+from urllib.parse import quote, urlsplit
 import time
 import re
 import random
 import logging
+import hashlib
+import threading
+import shutil
+import socket
+import errno
+import fnmatch
+import gzip
+import signal
+from collections import deque
+from datetime import datetime, timedelta, timezone
 
-try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore, auth, initialize_app
-    from google.cloud import firestore as google_firestore
-    from google.oauth2 import service_account
-    from google.cloud import resourcemanager_v3
-    from google.cloud import billing_v1
-    FIREBASE_AVAILABLE = True
-except ImportError:
-    FIREBASE_AVAILABLE = False
+from ai_gateway import (AI_CACHE_DB, AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL, AI_GATEWAY_CONCURRENCY, AI_GATEWAY_MAX_QUEUE,
+                        AI_GATEWAY_MAX_QUEUE_PER_GAME, AI_GATEWAY_QUEUE_TIMEOUT, AI_PROXY_PORT)
+
+# The Google and OpenAI SDKs pull in grpc and protobuf, which takes from hundreds of
+# milliseconds to seconds; they are only located at startup and imported by the steps
+# that use them, so --help and cached reruns don't pay for them.
+FIREBASE_MODULES = ("firebase_admin", "google.cloud.firestore", "google.oauth2.service_account",
+                    "google.cloud.resourcemanager_v3", "google.cloud.billing_v1")
+OPENAI_MODULES = ("openai",)
+
+def _installed(modules: tuple) -> bool:
+    """Check that modules are importable without importing them (only parent packages load)"""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in modules)
+    except (ImportError, ValueError):
+        return False
+
+@functools.lru_cache(maxsize=None)
+def firebase_available() -> bool:
+    """Whether the Firebase Admin SDK is installed; checked once, on first use"""
+    if _installed(FIREBASE_MODULES):
+        return True
     print("⚠️  Firebase Admin SDK not available. Install with: pip install firebase-admin google-cloud-firestore")
+    return False
 
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+@functools.lru_cache(maxsize=None)
+def openai_available() -> bool:
+    """Whether the OpenAI SDK is installed; checked once, on first use"""
+    if _installed(OPENAI_MODULES):
+        return True
     print("⚠️  OpenAI SDK not available. Install with: pip install openai")
+    return False
+
+def __getattr__(name: str):
+    # FIREBASE_AVAILABLE / OPENAI_AVAILABLE stay importable, resolved on first access
+    if name == "FIREBASE_AVAILABLE":
+        return firebase_available()
+    if name == "OPENAI_AVAILABLE":
+        return openai_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _load_firebase_admin():
+    """Import the Admin SDK modules used by the setup (slow; call through ``_to_thread``)"""
+    import firebase_admin
+    from firebase_admin import auth, credentials, firestore
+    return firebase_admin, auth, credentials, firestore
+
+DEFAULT_JOBS = 4
+DEFAULT_FLEET_PARALLEL = 2
+
+# Hosting deploy timeout: a fixed allowance for the CLI plus the upload at a slow-link rate
+HOSTING_DEPLOY_BASE_TIMEOUT = 90
+HOSTING_MIN_UPLOAD_RATE = 128 * 1024  # bytes/s
+
+# Bundle budget: per-chunk limits (committed) and the sizes of the last accepted build
+BUNDLE_BUDGET_FILE = Path("bundle-budget.json")
+BUNDLE_BASELINE = Path(".chaupar_bundle_sizes.json")
+BUNDLE_MAX_GROWTH = 0.1
+BUNDLE_NOISE_BYTES = 1024
+# Text files worth precompressing; images and fonts are compressed already
+COMPRESSIBLE_SUFFIXES = (".js", ".mjs", ".css", ".html", ".svg", ".json", ".webmanifest", ".txt", ".xml")
+PRECOMPRESSED_SUFFIXES = (".gz", ".br")
+# Vite writes fingerprinted files to assets/ as <name>-<8 character content hash>.<ext>
+VITE_ASSETS_DIR = "assets"
+_HASHED_ASSET = re.compile(r"-[A-Za-z0-9_-]{8}(?=\.[A-Za-z0-9]+$)")
+VITE_MANIFEST = Path(".vite") / "manifest.json"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+# Requests answered with HTML: the root, .html files and the app routes rewritten to index.html
+HTML_ROUTES = ("/", "**/*.html", "**/!(*.*)")
+HOSTING_DEFAULTS = {
+    "public": "dist",
+    "ignore": ["firebase.json", "**/.*", "**/node_modules/**", "**/*.@(gz|br)"],
+    "rewrites": [{"source": "**", "destination": "/index.html"}],
+}
+# Header rules of older setups that cached every script and stylesheet for a year, hashed or not
+_LEGACY_HEADER_SOURCES = ("**/*.@(js|css)",)
+
+# Steps that don't depend on the Firebase project; fleet runs do them once for everyone
+SHARED_STEPS = ("Prerequisites Check", "Firebase Hosting Setup", "Dependencies Installation", "Ollama Setup",
+                "Ollama Warm-up")
+
+# Ollama warm-up: how long the loaded model stays resident, and time limits for loading and one move
+OLLAMA_KEEP_ALIVE = "30m"
+OLLAMA_LOAD_TIMEOUT = 300
+OLLAMA_GENERATE_TIMEOUT = 120
+# Representative AI turns for the warm-up: (AI pieces as aiService.js sees them, dice value, skill level)
+# 0 = not started, -1 = finished
+OLLAMA_BENCH_POSITIONS = (
+    ([0, 0, 0, 0], 25, "intermediate"),   # opening: a high throw brings a piece in
+    ([12, 29, 0, 0], 10, "advanced"),     # midgame: enter a piece or move one off a safe square
+    ([41, 64, -1, 0], 3, "basic"),        # endgame: only short moves fit
+)
+
+# All automation instances in a process (e.g. a fleet run) share .chaupar_cache.json
+_CACHE_LOCK = threading.Lock()
+
+# Longest output line read in one piece; npm occasionally prints huge JSON blobs
+_STREAM_LIMIT = 1 << 20
+
+# Everything that ends up in the Vite bundle, besides the VITE_* values of the env file
+BUILD_INPUTS = ("src/**/*", "public/**/*", "index.html", "vite.config.js", "package-lock.json")
+BUILD_CACHE_DIR = Path(os.environ.get("CHAUPAR_BUILD_CACHE")
+                       or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "chaupar" / "builds")
+
+async def _to_thread(func, *args):
+    """Run blocking work (SDK calls, hashing) in the default executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+_http_sessions = threading.local()
+
+def _http_session():
+    """A requests session per executor thread, so calls to one host reuse their connections
+    
+    requests is imported on first use: it costs more at startup than the
+    rest of the CLI put together.
+    """
+    session = getattr(_http_sessions, "session", None)
+    if session is None:
+        import requests
+        session = _http_sessions.session = requests.Session()
+    return session
+
+def _send_http(url: str, method: str, body: Optional[bytes], headers: Optional[Dict[str, str]], timeout: float,
+               stream: bool = False):
+    import requests
+    try:
+        return _http_session().request(method, url, data=body, headers=headers, timeout=timeout, stream=stream)
+    except requests.Timeout as e:
+        raise asyncio.TimeoutError(str(e)) from e
+
+class HTTPResponse:
+    """Response returned by ``http_request``"""
+    
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+class HTTPStream:
+    """Streaming response yielded by ``http_stream``"""
+    
+    def __init__(self, response, deadline: float):
+        self.status = response.status_code
+        self.headers = {name.lower(): value for name, value in response.headers.items()}
+        self._response = response
+        self._deadline = deadline
+        
+    async def chunks(self):
+        """Body pieces as they arrive; raises asyncio.TimeoutError once the deadline passes"""
+        # chunk_size=None hands out each chunk of a chunked response as soon as it is read
+        body = self._response.iter_content(chunk_size=None)
+        while True:
+            chunk = await asyncio.wait_for(_to_thread(next, body, None), max(0.0, self._deadline - time.monotonic()))
+            if chunk is None:
+                return
+            yield chunk
+            
+    async def lines(self):
+        """Newline-delimited body lines (e.g. NDJSON), each yielded as soon as it is complete"""
+        pending = b""
+        async for chunk in self.chunks():
+            pending += chunk
+            *complete, pending = pending.split(b"\n")
+            for line in complete:
+                yield line
+        if pending:
+            yield pending
+
+@contextlib.asynccontextmanager
+async def http_stream(url: str, method: str = "GET", body: Optional[bytes] = None,
+                      headers: Optional[Dict[str, str]] = None, timeout: float = 60.0):
+    """Like ``http_request``, but the body is read incrementally through the yielded ``HTTPStream``
+    
+    ``timeout`` covers the whole exchange, including reading the body.
+    """
+    deadline = time.monotonic() + timeout
+    response = await asyncio.wait_for(_to_thread(_send_http, url, method, body, headers, timeout, True), timeout)
+    try:
+        yield HTTPStream(response, deadline)
+    finally:
+        response.close()
+
+async def http_request(url: str, method: str = "GET", body: Optional[bytes] = None,
+                       headers: Optional[Dict[str, str]] = None, timeout: float = 10.0) -> HTTPResponse:
+    """Async HTTP request for the local endpoints setup talks to (Ollama, Vite, the emulators)
+    
+    Runs ``requests`` in the executor. Raises OSError on connection problems
+    and asyncio.TimeoutError once ``timeout`` seconds pass for the whole
+    exchange.
+    """
+    response = await asyncio.wait_for(_to_thread(_send_http, url, method, body, headers, timeout), timeout)
+    return HTTPResponse(response.status_code, {name.lower(): value for name, value in response.headers.items()},
+                        response.content)
+
+async def wait_until(probe, timeout: float = 60.0, initial_delay: float = 0.1, max_delay: float = 2.0,
+                     backoff: float = 2.0, jitter: float = 0.25, abort=None):
+    """Await ``probe()`` until it returns a truthy value or ``timeout`` seconds pass
+    
+    The delay between attempts grows exponentially from ``initial_delay`` up to
+    ``max_delay``, randomized by +/- ``jitter`` so concurrent waiters don't poll
+    in lockstep, and is clipped to the overall deadline. ``abort()`` is checked
+    before every attempt (e.g. "the server process exited") to give up early.
+    Returns the probe's last result: truthy on success, falsy on timeout/abort.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        if abort is not None and abort():
+            return None
+        try:
+            result = await probe()
+        except Exception:
+            result = None
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return result
+        sleep_for = delay * random.uniform(1 - jitter, 1 + jitter)
+        await asyncio.sleep(max(0.0, min(sleep_for, remaining)))
+        delay = min(delay * backoff, max_delay)
+        
+def http_probe(url: str, timeout: float = 2.0, expect_status: tuple = (200,)):
+    """Readiness probe that succeeds once ``url`` answers with an expected status"""
+    async def probe():
+        try:
+            return (await http_request(url, timeout=timeout)).status in expect_status
+        except (OSError, asyncio.TimeoutError, ValueError):
+            return False
+    return probe
+    
+def tcp_probe(host: str, port: int, timeout: float = 1.0):
+    """Readiness probe that succeeds once ``host:port`` accepts a TCP connection"""
+    async def probe():
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+    return probe
+    
+class SetupStep:
+    """A node in the setup step graph
+
+    ``needs`` lists steps that must succeed before this one runs; if any of
+    them fails the step is skipped and counted as failed. ``after`` lists
+    steps that only have to finish first (ordering without requiring success).
+    Optional steps are reported but not counted towards the success rate.
+    """
+    
+    def __init__(self, name: str, func, needs: tuple = (), after: tuple = (), optional: bool = False,
+                 inputs: tuple = (), outputs: tuple = (), per_project: bool = False):
+        self.name = name
+        self.func = func
+        self.needs = tuple(needs)
+        self.after = tuple(after)
+        self.optional = optional
+        # Fingerprint cache: glob patterns hashed to decide whether the step can be
+        # skipped, paths that must still exist for a cached result to be trusted,
+        # and whether the result is only valid for the current project ID
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.per_project = per_project
+        
+    @property
+    def depends_on(self) -> tuple:
+        return self.needs + self.after
+
+class LiveProgress:
+    """Single status line showing every running command's step, elapsed time and last output line
+    
+    Only drawn on a TTY; elsewhere a heartbeat line is printed every
+    ``heartbeat`` seconds so CI logs show the run is still alive.
+    """
+    
+    def __init__(self, enabled: Optional[bool] = None, heartbeat: float = 30.0, min_interval: float = 0.2):
+        self.enabled = sys.stdout.isatty() if enabled is None else enabled
+        self.heartbeat = heartbeat
+        self.min_interval = min_interval
+        self.lock = threading.RLock()
+        self._tasks: Dict[str, list] = {}
+        self._last_draw = 0.0
+        self._last_heartbeat: Dict[str, float] = {}
+        self._drawn = False
+        
+    def update(self, label: str, started: float, last_line: str = None):
+        with self.lock:
+            task = self._tasks.setdefault(label, [started, ""])
+            if last_line:
+                task[1] = last_line
+            now = time.perf_counter()
+            if self.enabled:
+                if now - self._last_draw >= self.min_interval:
+                    self._draw(now)
+            elif now - self._last_heartbeat.get(label, started) >= self.heartbeat:
+                self._last_heartbeat[label] = now
+                print(f"⏳ {label}: {now - started:.0f}s | {task[1][:100]}")
+                
+    def finish(self, label: str):
+        with self.lock:
+            self._tasks.pop(label, None)
+            self._last_heartbeat.pop(label, None)
+            if self.enabled:
+                self.clear()
+                if self._tasks:
+                    self._draw(time.perf_counter())
+                    
+    def clear(self):
+        """Erase the status line so a regular log line can be printed"""
+        with self.lock:
+            if self._drawn:
+                sys.stdout.write("\r\033[K")
+                sys.stdout.flush()
+                self._drawn = False
+                
+    def _draw(self, now: float):
+        width = shutil.get_terminal_size((100, 20)).columns - 1
+        parts = [f"{label} {now - started:.0f}s: {line}" for label, (started, line) in self._tasks.items()]
+        text = ("⏳ " + " | ".join(parts))[:width]
+        sys.stdout.write("\r\033[K" + text)
+        sys.stdout.flush()
+        self._last_draw = now
+        self._drawn = True
+
+class CommandResult:
+    """Outcome of a command run through ``run_command``"""
+    
+    def __init__(self, command: List[str], returncode: int, tail: List[str], stderr_tail: List[str],
+                 output_bytes: int, elapsed: float, cpu_user: float = 0.0, cpu_system: float = 0.0,
+                 timed_out: bool = False):
+        self.command = command
+        self.returncode = returncode
+        self.tail = tail
+        self.stderr_tail = stderr_tail
+        self.output_bytes = output_bytes
+        self.elapsed = elapsed
+        self.cpu_user = cpu_user
+        self.cpu_system = cpu_system
+        self.timed_out = timed_out
+        
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+        
+    @property
+    def output(self) -> str:
+        return "\n".join(self.tail)
+        
+    @property
+    def stderr(self) -> str:
+        return "\n".join(self.stderr_tail)
+
+class RunTrace:
+    """Per-step and per-command timings of one setup run
+    
+    Steps record wall time and the CPU time of the commands they started;
+    commands record wall time, user/system CPU of the child, exit code and
+    bytes of output. Concurrent steps are laid out on separate lanes so the
+    trace (plain JSON, or Chrome trace-event format for chrome://tracing,
+    Perfetto or speedscope) shows what overlapped.
+    """
+    
+    SCHEMA_VERSION = 2
+    
+    def __init__(self):
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._cpu_origin = time.process_time()
+        self.steps: List[Dict] = []
+        self.commands: List[Dict] = []
+        self.wall_time: Optional[float] = None
+        self.process_cpu: Optional[float] = None
+        self._lock = threading.Lock()
+        self._busy_lanes = set()
+        # The step a coroutine belongs to; inherited by the tasks it spawns
+        self._step = contextvars.ContextVar("setup_step", default=None)
+        
+    def _offset(self) -> float:
+        return time.perf_counter() - self._origin
+        
+    @property
+    def current_step(self) -> Optional[Dict]:
+        return self._step.get()
+        
+    def begin_step(self, name: str) -> Dict:
+        """Start timing a step in the current task; pass the result to ``end_step``"""
+        with self._lock:
+            lane = next(n for n in range(1, len(self._busy_lanes) + 2) if n not in self._busy_lanes)
+            self._busy_lanes.add(lane)
+        record = {"name": name, "start": self._offset(), "lane": lane}
+        record["_token"] = self._step.set(record)
+        return record
+        
+    def end_step(self, record: Dict, status: str) -> None:
+        record["wall"] = self._offset() - record["start"]
+        record["status"] = status
+        self._step.reset(record.pop("_token"))
+        with self._lock:
+            self._busy_lanes.discard(record["lane"])
+            children = [c for c in self.commands if c["step"] == record["name"]]
+            record["cpu"] = sum(c["cpu_user"] + c["cpu_system"] for c in children)
+            record["commands"] = len(children)
+            self.steps.append(record)
+            
+    def record_command(self, result: CommandResult, label: Optional[str], start: float) -> None:
+        step = self.current_step
+        with self._lock:
+            self.commands.append({
+                "command": " ".join(result.command),
+                "label": label,
+                "step": step["name"] if step else None,
+                "lane": step["lane"] if step else 0,
+                "start": start - self._origin,
+                "wall": result.elapsed,
+                "cpu_user": result.cpu_user,
+                "cpu_system": result.cpu_system,
+                "exit_code": result.returncode,
+                "output_bytes": result.output_bytes,
+                "timed_out": result.timed_out,
+            })
+            
+    def finish(self) -> None:
+        self.wall_time = self._offset()
+        self.process_cpu = time.process_time() - self._cpu_origin
+        
+    def to_json(self, metadata: Dict) -> Dict:
+        with self._lock:
+            return {
+                "schema_version": self.SCHEMA_VERSION,
+                "started_at": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+                "wall_time": self.wall_time,
+                "process_cpu": self.process_cpu,
+                "metadata": metadata,
+                "steps": sorted(self.steps, key=lambda s: s["start"]),
+                "commands": sorted(self.commands, key=lambda c: c["start"]),
+            }
+            
+    def to_chrome(self, metadata: Dict) -> Dict:
+        """Chrome trace-event format: one complete ("X") event per step and command"""
+        pid = os.getpid()
+        events = []
+        data = self.to_json(metadata)
+        for step in data["steps"]:
+            events.append({
+                "name": step["name"], "cat": "step", "ph": "X", "pid": pid, "tid": step["lane"],
+                "ts": step["start"] * 1e6, "dur": step["wall"] * 1e6,
+                "args": {k: step[k] for k in ("status", "cpu", "commands")},
+            })
+        for command in data["commands"]:
+            events.append({
+                "name": command["label"] or command["command"], "cat": "command", "ph": "X",
+                "pid": pid, "tid": command["lane"],
+                "ts": command["start"] * 1e6, "dur": command["wall"] * 1e6,
+                "args": {k: command[k] for k in ("command", "step", "cpu_user", "cpu_system",
+                                                 "exit_code", "output_bytes", "timed_out")},
+            })
+        for lane in sorted({event["tid"] for event in events}):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": lane,
+                           "args": {"name": f"lane {lane}" if lane else "setup"}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": metadata}
+        
+    def write(self, path: Path, metadata: Dict, fmt: str = "json") -> None:
+        data = self.to_chrome(metadata) if fmt == "chrome" else self.to_json(metadata)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+_RUSAGE_SUPPORTED = os.name == "posix" and hasattr(os, "wait4")
+
+class _WaitedProcess:
+    """A child reaped with ``os.wait4`` so its CPU time is known
+    
+    asyncio reaps the children it starts itself and never exposes their
+    rusage, so on POSIX ``run_command`` starts them with ``subprocess.Popen``,
+    reads the pipes through the event loop and waits in the executor. Offers
+    the part of ``asyncio.subprocess.Process`` that ``run_command`` uses.
+    """
+    
+    def __init__(self, popen: subprocess.Popen):
+        self._popen = popen
+        self.pid = popen.pid
+        self.stdout: Optional[asyncio.StreamReader] = None
+        self.stderr: Optional[asyncio.StreamReader] = None
+        self.returncode: Optional[int] = None
+        self.cpu = (0.0, 0.0)
+        self._transports = []
+        self._reaped: Optional[asyncio.Future] = None
+        
+    @classmethod
+    async def start(cls, argv: List[str], stdin, stderr, start_new_session: bool) -> "_WaitedProcess":
+        popen = subprocess.Popen(argv, stdin=stdin, stdout=subprocess.PIPE, stderr=stderr,
+                                 start_new_session=start_new_session)
+        process = cls(popen)
+        process.stdout = await process._connect(popen.stdout)
+        if popen.stderr is not None:
+            process.stderr = await process._connect(popen.stderr)
+        return process
+        
+    async def _connect(self, pipe) -> asyncio.StreamReader:
+        loop = asyncio.get_running_loop()
+        stream = asyncio.StreamReader(limit=_STREAM_LIMIT)
+        transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stream), pipe)
+        self._transports.append(transport)
+        return stream
+        
+    async def feed(self, data: bytes) -> None:
+        def write():
+            try:
+                self._popen.stdin.write(data)
+                self._popen.stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        await _to_thread(write)
+        
+    def kill(self) -> None:
+        if self.returncode is None:
+            self._popen.kill()
+            
+    async def wait(self) -> int:
+        if self._reaped is None:
+            self._reaped = asyncio.ensure_future(_to_thread(os.wait4, self.pid, 0))
+        _, status, usage = await asyncio.shield(self._reaped)
+        self.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        # Popen must not try to reap the pid again
+        self._popen.returncode = self.returncode
+        self.cpu = (usage.ru_utime, usage.ru_stime)
+        for transport in self._transports:
+            transport.close()
+        return self.returncode
+
+def _kill_process_tree(process, sig: int = 9):
+    """Signal a child started in its own session together with its descendants"""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, sig)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+async def run_command(command: List[str], label: Optional[str] = None, timeout: Optional[float] = None,
+                      input: Optional[str] = None, tail_lines: Optional[int] = 40, merge_stderr: bool = True,
+                      progress: Optional[LiveProgress] = None, trace: Optional[RunTrace] = None) -> CommandResult:
+    """Run a command, reading its output line by line
+    
+    With ``tail_lines`` set only the last lines are kept (in a ring buffer), so
+    a noisy ``npm install`` doesn't accumulate megabytes of log in memory;
+    ``None`` keeps everything, for short commands whose output gets parsed.
+    Progress is reported as lines arrive. On timeout or cancellation the child
+    is killed together with its process group. Raises FileNotFoundError if the
+    executable is not installed.
+    """
+    if shutil.which(command[0]) is None:
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), command[0])
+    label = label or os.path.basename(command[0])
+    start = time.perf_counter()
+    tail = deque(maxlen=tail_lines)
+    stderr_tail = deque(maxlen=tail_lines)
+    counters = {"bytes": 0}
+    
+    stdin = subprocess.PIPE if input is not None else subprocess.DEVNULL
+    stderr = subprocess.STDOUT if merge_stderr else subprocess.PIPE
+    # Own process group so a timeout also stops the children npm/firebase spawn
+    if _RUSAGE_SUPPORTED:
+        process = await _WaitedProcess.start(list(command), stdin, stderr, start_new_session=True)
+    else:
+        process = await asyncio.create_subprocess_exec(*command, stdin=stdin, stdout=subprocess.PIPE,
+                                                       stderr=stderr, limit=_STREAM_LIMIT)
+            
+    # Progress bars redraw with bare carriage returns: when only the tail is kept each
+    # frame is a line of its own, so it shows up as soon as it is drawn
+    separator = re.compile(rb"\r\n?|\n" if tail_lines is not None else rb"\n")
+    
+    def emit(raw: bytes, lines):
+        line = raw.decode("utf-8", errors="replace").rstrip("\r")
+        if tail_lines is not None:
+            line = line.strip()
+            if not line:
+                return
+        lines.append(line)
+        if progress:
+            progress.update(label, start, line)
+            
+    async def reader(stream, lines):
+        pending = b""
+        while True:
+            chunk = await stream.read(1 << 16)
+            counters["bytes"] += len(chunk)
+            if not chunk:
+                if pending:
+                    emit(pending, lines)
+                return
+            *complete, pending = separator.split(pending + chunk)
+            # A line longer than the stream limit is cut to its end
+            pending = pending[-_STREAM_LIMIT:]
+            for raw in complete:
+                emit(raw, lines)
+                
+    async def feed():
+        if isinstance(process, _WaitedProcess):
+            await process.feed(input.encode())
+            return
+        try:
+            process.stdin.write(input.encode())
+            await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+            
+    async def communicate():
+        work = [reader(process.stdout, tail)]
+        if not merge_stderr:
+            work.append(reader(process.stderr, stderr_tail))
+        if input is not None:
+            work.append(feed())
+        await asyncio.gather(*work)
+        await process.wait()
+        
+    async def tick():
+        while True:
+            await asyncio.sleep(0.5)
+            progress.update(label, start)
+            
+    ticker = asyncio.ensure_future(tick()) if progress else None
+    timed_out = False
+    try:
+        await asyncio.wait_for(communicate(), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+    finally:
+        if ticker:
+            ticker.cancel()
+        if process.returncode is None:
+            _kill_process_tree(process)
+            await process.wait()
+        if progress:
+            progress.finish(label)
+        usage = process.cpu if isinstance(process, _WaitedProcess) else (0.0, 0.0)
+        
+    result = CommandResult(list(command), process.returncode, list(tail), list(stderr_tail), counters["bytes"],
+                           time.perf_counter() - start, usage[0], usage[1], timed_out)
+    if trace is not None:
+        trace.record_command(result, label, start)
+    return result
+
+async def run_captured(command: List[str], timeout: Optional[float] = None, input: Optional[str] = None,
+                       trace: Optional[RunTrace] = None) -> subprocess.CompletedProcess:
+    """``subprocess.run(..., capture_output=True, text=True)`` equivalent that is traced"""
+    result = await run_command(command, timeout=timeout, input=input, tail_lines=None,
+                               merge_stderr=False, trace=trace)
+    if result.timed_out:
+        raise subprocess.TimeoutExpired(command, timeout, output=result.output, stderr=result.stderr)
+    return subprocess.CompletedProcess(command, result.returncode, result.output, result.stderr)
+
+class FirebaseCLI:
+    """Firebase CLI client shared by all steps of one setup run
+    
+    Every ``firebase`` invocation pays a Node.js startup, so the CLI is probed
+    once, its version and login state are cached, and read-only queries such as
+    the app list are requested with ``--json`` and memoized for the run.
+    Concurrent callers asking for the same thing share one in-flight call.
+    """
+    
+    def __init__(self, executable: str = "firebase", trace: Optional[RunTrace] = None):
+        self.executable = executable
+        self.trace = trace
+        self._memo: Dict[tuple, asyncio.Future] = {}
+        
+    async def run(self, args: List[str], timeout: Optional[float] = None,
+                  input: Optional[str] = None) -> subprocess.CompletedProcess:
+        """Run ``firebase <args>`` and capture its output"""
+        return await run_captured([self.executable] + list(args), timeout=timeout, input=input, trace=self.trace)
+        
+    async def run_json(self, args: List[str], timeout: Optional[float] = 30):
+        """Run a command with ``--json`` and return its ``result`` payload, or None on failure"""
+        try:
+            result = await self.run(list(args) + ["--json"], timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        try:
+            payload = json.loads(result.stdout)
+        except ValueError:
+            return None
+        if result.returncode != 0 or not isinstance(payload, dict) or payload.get("status") != "success":
+            return None
+        return payload.get("result")
+        
+    async def _memoized(self, key: tuple, fetch, remember_failure: bool = False):
+        """Await ``fetch()`` once per key; failures (None) are retried unless remembered"""
+        task = self._memo.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._memo[key] = task
+        # Shield the shared call so one cancelled caller doesn't cancel it for the rest
+        value = await asyncio.shield(task)
+        if value is None and not remember_failure and self._memo.get(key) is task:
+            del self._memo[key]
+        return value
+        
+    async def version(self) -> Optional[str]:
+        """Return the CLI version, probing ``firebase --version`` only once per run"""
+        async def probe():
+            try:
+                result = await self.run(["--version"], timeout=15)
+            except (OSError, subprocess.TimeoutExpired):
+                return None
+            return result.stdout.strip() if result.returncode == 0 else None
+            
+        return await self._memoized(("--version",), probe, remember_failure=True)
+        
+    async def available(self) -> bool:
+        return await self.version() is not None
+        
+    async def is_logged_in(self) -> bool:
+        """Check for a usable login, cached for the run"""
+        async def probe():
+            if not await self.available():
+                return False
+            if os.environ.get("FIREBASE_TOKEN") or os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+                # CI credentials don't show up in login:list
+                return True
+            return bool(await self.run_json(["login:list"], timeout=15))
+            
+        return await self._memoized(("login:list",), probe, remember_failure=True)
+        
+    def invalidate(self, name: str, project_id: Optional[str] = None) -> None:
+        """Forget memoized results for a query, e.g. after creating an app"""
+        for key in list(self._memo):
+            if key[0] == name and (project_id is None or key[1] == project_id):
+                del self._memo[key]
+                
+    async def apps_list(self, project_id: str, platform: str = "WEB") -> Optional[List[Dict]]:
+        """Return the project's apps for a platform (memoized)"""
+        return await self._memoized(
+            ("apps:list", project_id, platform),
+            lambda: self.run_json(["apps:list", platform, "--project", project_id])
+        )
+        
+    async def sdk_config(self, project_id: str, app_id: str, platform: str = "WEB") -> Optional[Dict]:
+        """Return the SDK configuration of an app (memoized)"""
+        async def fetch():
+            result = await self.run_json(["apps:sdkconfig", platform, app_id, "--project", project_id])
+            if not isinstance(result, dict):
+                return None
+            if isinstance(result.get("sdkConfig"), dict):
+                return result["sdkConfig"]
+            if "apiKey" in result:
+                return result
+            # Older CLIs only return the generated file contents
+            match = re.search(r"\{.*\}", result.get("fileContents", ""), re.DOTALL)
+            if match:
+                try:
+                    return json.loads(match.group(0))
+                except ValueError:
+                    return None
+            return None
+            
+        return await self._memoized(("apps:sdkconfig", project_id, app_id), fetch)
+
+class BuildCache:
+    """Content-addressed store of finished ``dist/`` trees, shared by every checkout on the machine
+    
+    Builds live under ``<root>/<key>`` where the key hashes everything that
+    goes into the bundle. Restoring hardlinks the stored files into place (or
+    copies them when the cache is on another filesystem), so a hit costs a few
+    milliseconds instead of a Vite build. Stored files are shared through those
+    links: tools must replace files in ``dist/`` rather than edit them in place,
+    which is what Vite's emptyOutDir does.
+    """
+    
+    STAMP = ".chaupar-build"
+    
+    def __init__(self, root: Path = BUILD_CACHE_DIR, max_entries: int = 20):
+        self.root = Path(root)
+        self.max_entries = max_entries
+        
+    def path(self, key: str) -> Path:
+        return self.root / key
+        
+    @staticmethod
+    def stamp_of(dist_dir: Path) -> Optional[str]:
+        """Return the key of the build currently in ``dist_dir``, if it came through the cache"""
+        try:
+            return (dist_dir / BuildCache.STAMP).read_text().strip() or None
+        except OSError:
+            return None
+            
+    @staticmethod
+    def _link_tree(source: Path, dest: Path) -> int:
+        """Recreate ``source`` at ``dest`` with hardlinks, falling back to copies; returns bytes"""
+        total = 0
+        link = True
+        for directory, _, files in os.walk(source):
+            target_dir = dest / Path(directory).relative_to(source)
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for name in files:
+                src_file, dst_file = Path(directory) / name, target_dir / name
+                if link:
+                    try:
+                        os.link(src_file, dst_file)
+                    except OSError:
+                        link = False
+                if not link:
+                    shutil.copy2(src_file, dst_file)
+                total += src_file.stat().st_size
+        return total
+        
+    def restore(self, key: str, dist_dir: Path) -> Optional[int]:
+        """Replace ``dist_dir`` with the stored build for ``key``; returns its size, or None on a miss"""
+        entry = self.path(key)
+        if not (entry / "index.html").is_file():
+            return None
+        staging = dist_dir.with_name(f".{dist_dir.name}.restore-{os.getpid()}")
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            size = self._link_tree(entry, staging)
+            if dist_dir.exists():
+                shutil.rmtree(dist_dir)
+            os.replace(staging, dist_dir)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        # Entries are pruned least recently used first
+        os.utime(entry)
+        return size
+        
+    def store(self, key: str, dist_dir: Path) -> bool:
+        """Copy a fresh build into the store under ``key`` and stamp it; False if already stored"""
+        (dist_dir / self.STAMP).write_text(key + "\n")
+        entry = self.path(key)
+        if entry.exists():
+            return False
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".{key}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            shutil.copytree(dist_dir, staging)
+            os.rename(staging, entry)
+        except OSError:
+            # Another run stored the same build first
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+        self.prune()
+        return True
+        
+    def prune(self) -> None:
+        """Drop the least recently used builds beyond ``max_entries``"""
+        try:
+            entries = [p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        except OSError:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in entries[self.max_entries:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+def chaupar_move_prompt(pieces: List[int], dice: int, skill: str) -> str:
+    """The prompt ``aiService.js`` (buildGamePrompt) sends for an AI turn"""
+    def describe(position: int) -> str:
+        return "Not started" if position == 0 else "Finished" if position == -1 else f"Position {position}"
+    
+    moves = []
+    for index, position in enumerate(pieces):
+        if position == 0 and dice >= 10:
+            moves.append(f"Piece {index + 1}: Start")
+        elif position > 0 and position + dice <= 68:
+            moves.append(f"Piece {index + 1}: Move from {position} to {position + dice}")
+    pieces_text = ", ".join(f"Piece {i + 1}: {describe(position)}" for i, position in enumerate(pieces))
+    return f"""You are playing Chaupar, an ancient Indian board game. You are the AI opponent (Player 2).
+
+Game State:
+- Current Player: 2
+- Dice Roll: {dice}
+- Your Pieces: {pieces_text}
+- Safe Zones: [8, 15, 22, 29, 36, 43, 50, 57, 64]
+
+Skill Level: {skill}
+
+Traditional Chaupar Rules:
+- You need a "high throw" (10, 25, or 30 points) to start pieces
+- Move clockwise around the outer perimeter
+- Safe squares (flower motifs) protect from capture
+- You must capture at least one opponent piece before going home
+- Use "peghedu" bonus points strategically
+- Count squares carefully: "aanth ghar pacchees" (8 for 25) and "tehr ghar trees" (13 for 30)
+
+Available moves: {', '.join(moves)}
+
+Based on your skill level ({skill}), make the best strategic move. Consider:
+- Capturing opponent pieces to get your "tohd"
+- Moving to safe squares when possible
+- Using bonus moves strategically
+- Positioning pieces for future captures
+
+Respond with only the piece number (1-4) to move, or "pass" if no valid moves."""
+
+def ollama_options(skill: str) -> Dict:
+    """Generation options ``aiService.js`` uses for a skill level"""
+    temperature = {"basic": 0.8, "advanced": 0.2}.get(skill, 0.5)
+    return {"temperature": temperature, "top_p": 0.9, "max_tokens": 100}
 
 class ChauparSetupAutomation:
     """Automates the complete Chaupar game setup process"""
     
-    def __init__(self, project_id: str = None, project_name: str = "Chaupar"):
+    OLLAMA_URL = "http://localhost:11434"
+    # The model aiService.js asks Ollama for
+    OLLAMA_MODEL = "qwen2.5:latest"
+    AI_PROXY_URL = f"http://localhost:{AI_PROXY_PORT}"
+    AI_PROXY_LOG = Path(".chaupar_ai_proxy.log")
+    DEV_SERVER_URL = "http://localhost:5173"
+    
+    def __init__(self, project_id: str = None, project_name: str = "Chaupar", jobs: int = DEFAULT_JOBS,
+                 use_cache: bool = True, trace_file: Optional[str] = "setup_trace.json",
+                 trace_format: str = "json"):
         self.project_id = project_id
         self.project_name = project_name
+        self.jobs = max(1, jobs)
+        self.use_cache = use_cache
+        self.trace_file = Path(trace_file) if trace_file else None
+        self.trace_format = trace_format
         self.setup_log = []
+        self.step_status: Dict[str, str] = {}
         self.cache_file = Path(".chaupar_cache.json")
+        self._log_lock = threading.Lock()
+        self.trace = RunTrace()
+        self.firebase = FirebaseCLI(trace=self.trace)
+        self.build_cache = BuildCache()
+        self.progress = LiveProgress()
+        
+        # Per-project file layout; a fleet run points these at project-specific paths
+        self.env_file = Path(".env.local")
+        self.dist_dir = Path("dist")
+        self.hosting_config = Path("firebase.json")
+        self.report_file = Path("setup_report.txt")
+        self.build_mode: Optional[str] = None
+        self.cache_key: Optional[str] = None
+        self.log_prefix = ""
+        self.print_report = True
+        # Results of steps already run on behalf of this project (fleet shared phase)
+        self.shared_results: Dict[str, bool] = {}
+        # Ollama warm-up: optional JSON file of prompts, and the latencies it measured
+        self.ollama_prompts_file: Optional[Path] = None
+        self.ollama_benchmark: Optional[Dict] = None
+        # Serve the frontend's AI calls through the caching proxy (opt-in; VITE_OLLAMA_URL
+        # points at it only once it is up)
+        self.ai_proxy = False
+        self.ai_proxy_running = False
+        self.ai_cache = "sqlite"
+        self.ai_concurrency = AI_GATEWAY_CONCURRENCY
+        self.fix_indexes = False
+        self.drop_unused_indexes = False
+        self.skip_rules_benchmark = False
+        
+    def use_fleet_layout(self, fleet_dir: Path, shared_results: Dict[str, bool], progress: LiveProgress):
+        """Give this project its own env file, build, cache entry, report and trace
+        
+        ``.env.<project>.local`` is what ``vite build --mode <project>`` loads, and
+        Firebase resolves paths in a config file relative to its directory, so the
+        per-project hosting config lives next to firebase.json.
+        """
+        project_dir = fleet_dir / self.project_id
+        project_dir.mkdir(parents=True, exist_ok=True)
+        self.env_file = Path(f".env.{self.project_id}.local")
+        self.dist_dir = project_dir / "dist"
+        self.hosting_config = Path(f"firebase.{self.project_id}.json")
+        self.report_file = project_dir / "setup_report.txt"
+        if self.trace_file:
+            self.trace_file = project_dir / self.trace_file.name
+        self.build_mode = self.project_id
+        self.cache_key = self.project_id
+        self.log_prefix = f"[{self.project_id}] "
+        self.print_report = False
+        self.shared_results = dict(shared_results)
+        self.progress = progress
+        
+    def apply_settings(self, settings: Dict) -> None:
+        """Apply command-line options (attribute -> value, from ``setup_settings``)"""
+        for name, value in settings.items():
+            if not hasattr(self, name):
+                raise AttributeError(f"Unknown setup setting: {name}")
+            setattr(self, name, value)
+            
+    @property
+    def ai_url(self) -> str:
+        """Where the frontend sends AI requests: the AI gateway if this run has it up, else Ollama"""
+        return self.AI_PROXY_URL if self.ai_proxy_running else self.OLLAMA_URL
         
     def log(self, message: str, level: str = "INFO"):
         """Log setup progress"""
         timestamp = time.strftime("%H:%M:%S")
         log_entry = f"[{timestamp}] {level}: {message}"
-        self.setup_log.append(log_entry)
-        print(log_entry)
+        with self._log_lock, self.progress.lock:
+            self.setup_log.append(log_entry)
+            self.progress.clear()
+            print(self.log_prefix + log_entry)
+        
+    def _read_cache(self) -> Dict:
+        """Read .chaupar_cache.json, returning an empty cache if it is missing or corrupt"""
+        if not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+            
+    def _cache_entry(self, cache: Dict) -> Dict:
+        """This project's part of the cache: the top level, or its entry under "projects" in fleet runs"""
+        if self.cache_key is None:
+            return cache
+        return cache.setdefault('projects', {}).setdefault(self.cache_key, {})
+        
+    def _update_cache(self, update) -> None:
+        """Apply ``update(entry)`` to this project's cache entry under a lock and write it atomically"""
+        with _CACHE_LOCK:
+            cache = self._read_cache()
+            update(self._cache_entry(cache))
+            temp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+            with open(temp_file, 'w') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(temp_file, self.cache_file)
+            
+    async def run_streaming(self, command: List[str], label: str, timeout: Optional[float] = None) -> CommandResult:
+        """Run a long command with live progress on this run's status line"""
+        return await run_command(command, self.log_prefix + label, timeout=timeout,
+                           progress=self.progress, trace=self.trace)
+        
+    def log_failure_tail(self, message: str, result: CommandResult):
+        """Log a failed command with the last lines of its output"""
+        reason = "timed out" if result.timed_out else f"exit code {result.returncode}"
+        self.log(f"{message} ({reason}, {result.elapsed:.1f}s)", "ERROR")
+        if result.tail:
+            self.log("Last output lines:\n    " + "\n    ".join(result.tail), "ERROR")
         
     def load_cached_project(self) -> bool:
         """Load cached project ID if available"""
@@ -80,22 +1099,112 @@ class ChauparSetupAutomation:
     def save_project_cache(self) -> bool:
         """Save project ID to cache for future reruns"""
         try:
-            cache_data = {
-                'project_id': self.project_id,
-                'project_name': self.project_name,
-                'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'last_updated': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
+            now = time.strftime('%Y-%m-%d %H:%M:%S')
             
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            def update(cache: Dict):
+                if cache.get('project_id') != self.project_id:
+                    cache['created_at'] = now
+                cache['project_id'] = self.project_id
+                cache['project_name'] = self.project_name
+                cache.setdefault('created_at', now)
+                cache['last_updated'] = now
                 
+            self._update_cache(update)
             self.log(f"💾 Project cached: {self.project_id}")
             return True
         except Exception as e:
             self.log(f"Failed to save cache: {e}", "WARNING")
             return False
             
+    def fingerprint_step(self, step: SetupStep) -> Optional[str]:
+        """Hash the files matching a step's input patterns
+        
+        Returns None when the step declares no inputs (never cached) or when
+        none of its inputs exist yet.
+        """
+        if not step.inputs:
+            return None
+            
+        files = set()
+        for pattern in step.inputs:
+            files.update(path for path in Path(".").glob(pattern) if path.is_file())
+        if not files:
+            return None
+            
+        digest = hashlib.sha256()
+        if step.per_project:
+            digest.update(f"project:{self.project_id}\0".encode())
+        for path in sorted(files):
+            digest.update(path.as_posix().encode() + b"\0")
+            if path.name.startswith(".env"):
+                # Env files carry a "Last Updated" timestamp; only VITE_* values reach the bundle
+                digest.update("".join(self._vite_env_lines(path)).encode())
+            else:
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+            digest.update(b"\0")
+        return digest.hexdigest()
+        
+    def build_cache_key(self) -> str:
+        """Content hash of the build inputs, the VITE_* values and the Vite mode
+        
+        Unlike the step fingerprint it doesn't include the env file's name, so
+        identical configurations in different checkouts share one artifact.
+        """
+        digest = hashlib.sha256(f"mode:{self.build_mode or 'production'}\0".encode())
+        files = set()
+        for pattern in BUILD_INPUTS:
+            files.update(path for path in Path(".").glob(pattern) if path.is_file())
+        for path in sorted(files):
+            digest.update(path.as_posix().encode() + b"\0")
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            digest.update(b"\0")
+        if self.env_file.exists():
+            digest.update("".join(self._vite_env_lines(self.env_file)).encode())
+        return digest.hexdigest()
+        
+    @staticmethod
+    def _vite_env_lines(env_file: Path) -> List[str]:
+        """Return the sorted VITE_* assignments from an env file"""
+        with open(env_file, 'r') as f:
+            return sorted(line.strip() + "\n" for line in f if line.strip().startswith("VITE_"))
+        
+    def is_step_cached(self, step: SetupStep) -> bool:
+        """Check whether a step's inputs match the fingerprint of its last successful run"""
+        if not self.use_cache or not step.inputs:
+            return False
+        if not all(Path(output).exists() for output in step.outputs):
+            return False
+        entry = self._cache_entry(self._read_cache()).get('steps', {}).get(step.name)
+        if not entry:
+            return False
+        return entry.get('fingerprint') == self.fingerprint_step(step)
+        
+    def record_step_fingerprint(self, step: SetupStep, ok: bool) -> None:
+        """Remember the inputs of a successful step, forget them after a failure"""
+        if not step.inputs:
+            return
+        # Fingerprint after the run: npm install may rewrite package-lock.json
+        fingerprint = self.fingerprint_step(step) if ok else None
+        
+        def update(cache: Dict):
+            steps = cache.setdefault('steps', {})
+            if fingerprint:
+                steps[step.name] = {
+                    'fingerprint': fingerprint,
+                    'updated_at': time.strftime('%Y-%m-%d %H:%M:%S')
+                }
+            else:
+                steps.pop(step.name, None)
+                
+        try:
+            self._update_cache(update)
+        except Exception as e:
+            self.log(f"Failed to update step cache: {e}", "WARNING")
+            
     def generate_project_id(self) -> str:
         """Generate a unique project ID based on project name"""
         base_name = re.sub(r'[^a-z0-9-]', '', self.project_name.lower())
@@ -103,7 +1212,7 @@ class ChauparSetupAutomation:
         random_suffix = ''.join(random.choices('abcdefghijklmnopqrstuvwxyz', k=3))
         return f"{base_name}-{timestamp}-{random_suffix}"
         
-    def check_prerequisites(self) -> bool:
+    async def check_prerequisites(self) -> bool:
         """Check if all prerequisites are met"""
         self.log("Checking prerequisites...")
         
@@ -114,7 +1223,7 @@ class ChauparSetupAutomation:
             
         # Check Node.js
         try:
-            result = subprocess.run(['node', '--version'], capture_output=True, text=True)
+            result = await run_captured(['node', '--version'], trace=self.trace)
             if result.returncode != 0:
                 self.log("Node.js not found", "ERROR")
                 return False
@@ -125,7 +1234,7 @@ class ChauparSetupAutomation:
             
         # Check npm
         try:
-            result = subprocess.run(['npm', '--version'], capture_output=True, text=True)
+            result = await run_captured(['npm', '--version'], trace=self.trace)
             if result.returncode != 0:
                 self.log("npm not found", "ERROR")
                 return False
@@ -135,19 +1244,16 @@ class ChauparSetupAutomation:
             return False
             
         # Check Firebase CLI
-        try:
-            result = subprocess.run(['firebase', '--version'], capture_output=True, text=True)
-            if result.returncode != 0:
-                self.log("Firebase CLI not found", "WARNING")
-                self.log("Install with: npm install -g firebase-tools", "INFO")
-            else:
-                self.log(f"Firebase CLI version: {result.stdout.strip()}")
-        except FileNotFoundError:
+        firebase_version = await self.firebase.version()
+        if firebase_version is None:
             self.log("Firebase CLI not found", "WARNING")
+            self.log("Install with: npm install -g firebase-tools", "INFO")
+        else:
+            self.log(f"Firebase CLI version: {firebase_version}")
             
         # Check Ollama
         try:
-            result = subprocess.run(['ollama', '--version'], capture_output=True, text=True)
+            result = await run_captured(['ollama', '--version'], trace=self.trace)
             if result.returncode != 0:
                 self.log("Ollama not found", "INFO")
                 self.log("Install from: https://ollama.ai", "INFO")
@@ -159,7 +1265,7 @@ class ChauparSetupAutomation:
         self.log("Prerequisites check completed")
         return True
         
-    def create_firebase_project(self) -> bool:
+    async def create_firebase_project(self) -> bool:
         """Create a new Firebase project if one doesn't exist"""
         try:
             if not self.project_id:
@@ -169,7 +1275,7 @@ class ChauparSetupAutomation:
                 
             self.log(f"Creating Firebase project: {self.project_id}")
             
-            if not FIREBASE_AVAILABLE:
+            if not firebase_available():
                 self.log("Firebase Admin SDK not available, skipping project creation", "WARNING")
                 self.log("Please create project manually in Firebase Console", "WARNING")
                 return False
@@ -193,32 +1299,35 @@ class ChauparSetupAutomation:
             self.log(f"Failed to create Firebase project: {e}", "ERROR")
             return False
             
-    def setup_firebase_services(self) -> bool:
+    async def setup_firebase_services(self) -> bool:
         """Set up Firebase services including hosting"""
         try:
             self.log("Setting up Firebase services...")
             
-            if not FIREBASE_AVAILABLE:
+            if not firebase_available():
                 self.log("Firebase Admin SDK not available, skipping service setup", "WARNING")
                 return False
                 
+            # Importing and calling the Admin SDK blocks, so both happen off the event loop
+            firebase_admin, auth, credentials, firestore = await _to_thread(_load_firebase_admin)
+            
             # Initialize Firebase app if not already done
             if not firebase_admin._apps:
-                cred = credentials.ApplicationDefault()
-                self.firebase_app = initialize_app(cred, {
+                cred = await _to_thread(credentials.ApplicationDefault)
+                self.firebase_app = await _to_thread(firebase_admin.initialize_app, cred, {
                     'projectId': self.project_id
                 })
                 
             # Set up Firestore
             try:
-                db = firestore.client()
+                db = await _to_thread(firestore.client)
                 self.log("✅ Firestore initialized")
             except Exception as e:
                 self.log(f"⚠️ Firestore setup warning: {e}", "WARNING")
                 
             # Set up Authentication
             try:
-                auth = auth.get_client()
+                auth_client = await _to_thread(auth.get_client)
                 self.log("✅ Authentication initialized")
             except Exception as e:
                 self.log(f"⚠️ Authentication setup warning: {e}", "WARNING")
@@ -237,63 +1346,30 @@ class ChauparSetupAutomation:
             self.log(f"Failed to setup Firebase services: {e}", "ERROR")
             return False
             
-    def setup_firebase_hosting(self) -> bool:
-        """Set up Firebase hosting for the game UI"""
+    async def setup_firebase_hosting(self) -> bool:
+        """Set up Firebase hosting for the game UI
+        
+        Merges into an existing firebase.json: missing hosting settings get
+        their defaults and the generated header rules are replaced, anything
+        else (Firestore, custom headers, redirects) is kept.
+        """
         try:
             self.log("Setting up Firebase hosting...")
             
-            # Check if firebase.json already exists
             firebase_config = Path("firebase.json")
-            hosting_config = Path("firebase.json")
-            
-            if firebase_config.exists():
-                self.log("Firebase configuration already exists")
-                # Check if hosting is configured
-                try:
-                    with open(firebase_config, 'r') as f:
-                        config_content = f.read()
-                        if '"hosting"' in config_content:
-                            self.log("✅ Firebase hosting already configured")
-                            return True
-                except Exception:
-                    pass
-                    
-            # Create firebase.json with hosting configuration
-            hosting_config_content = {
-                "hosting": {
-                    "public": "dist",
-                    "ignore": [
-                        "firebase.json",
-                        "**/.*",
-                        "**/node_modules/**"
-                    ],
-                    "rewrites": [
-                        {
-                            "source": "**",
-                            "destination": "/index.html"
-                        }
-                    ],
-                    "headers": [
-                        {
-                            "source": "**/*.@(js|css)",
-                            "headers": [
-                                {
-                                    "key": "Cache-Control",
-                                    "value": "max-age=31536000"
-                                }
-                            ]
-                        }
-                    ]
-                }
-            }
-            
-            with open(firebase_config, 'w') as f:
-                json.dump(hosting_config_content, f, indent=2)
+            existed = firebase_config.exists()
+            rules = await _to_thread(hosting_headers, self.dist_dir)
+            if not await _to_thread(update_hosting_config, rules, firebase_config):
+                self.log("✅ Firebase hosting already configured")
+                return True
                 
-            self.log("✅ Firebase hosting configuration created")
+            self.log(f"✅ Firebase hosting configuration {'updated' if existed else 'created'}")
             self.log("📁 Public directory: dist/")
             self.log("🔄 SPA routing configured for React Router")
-            self.log("⚡ Static asset caching enabled")
+            self.log("⚡ Fingerprinted assets cached as immutable, HTML revalidated")
+            preloads = [header for rule in rules for header in rule["headers"] if header["key"] == "Link"]
+            if preloads:
+                self.log(f"🔗 Entry chunks preloaded: {preloads[0]['value'].count('rel=')} files")
             
             return True
             
@@ -301,10 +1377,64 @@ class ChauparSetupAutomation:
             self.log(f"Failed to setup Firebase hosting: {e}", "ERROR")
             return False
             
-    def deploy_firestore_rules(self) -> bool:
-        """Deploy Firestore security rules"""
+    async def check_firestore_indexes(self) -> bool:
+        """Compare firestore.indexes.json with the queries in src/firebase and the tooling; fix it if asked"""
+        try:
+            advisor = IndexAdvisor.from_sources()
+            report = advisor.write(drop_unused=self.drop_unused_indexes) if self.fix_indexes else advisor.analyze()
+            print_index_report(dict(report, queries=[]),
+                               log=lambda message: self.log(message, "WARNING" if message.startswith("❌") else "INFO"))
+            self.log(f"Checked {len(advisor.queries)} queries against {len(advisor.declared)} composite indexes")
+            if report["unused"] and not self.drop_unused_indexes:
+                self.log(f"{len(report['unused'])} unused indexes kept; remove them with --drop-unused-indexes")
+            removed = len(report["unused"]) if self.drop_unused_indexes else 0
+            if self.fix_indexes and (report["missing"] or removed):
+                self.log(f"Rewrote {INDEXES_FILE}: {len(report['missing'])} added, {removed} removed")
+                return True
+            if report["missing"]:
+                self.log("Queries would fail without these indexes; rerun with --fix-indexes", "WARNING")
+                return False
+            return True
+        except (OSError, ValueError) as e:
+            self.log(f"Failed to check Firestore indexes: {e}", "ERROR")
+            return False
+            
+    async def benchmark_firestore_rules(self) -> bool:
+        """Time firestore.rules on the emulator and fail on a regression, which holds back the deploy"""
+        try:
+            if self.skip_rules_benchmark:
+                self.log("Skipping the rules benchmark (--skip-rules-benchmark)")
+                return True
+            baseline = load_rules_baseline()
+            if baseline and baseline.get("rules_sha256") == rules_digest():
+                self.log(f"firestore.rules unchanged since the last benchmark ({RULES_BASELINE})")
+                return True
+            
+            self.log("Benchmarking firestore.rules on the Firestore emulator...")
+            results = await run_rules_benchmark(os.environ.get("FIRESTORE_EMULATOR_HOST"), RULES_BENCH_PROJECT,
+                                                RULES_BENCH_ITERATIONS, RULES_BENCH_PORT, log=self.log)
+            if results is None:
+                self.log("Firestore emulator unavailable, rules not benchmarked", "WARNING")
+                return True
+            print_rules_results(results, log=self.log)
+            problems = rules_regressions(results, baseline)
+            for problem in problems:
+                self.log(problem, "ERROR")
+            if problems:
+                self.log("Rules regressed; fix them or accept with: python setup_automation.py rules-bench "
+                         "--update-baseline", "ERROR")
+                return False
+            save_rules_baseline(results)
+            self.log(f"Rules benchmark saved to {RULES_BASELINE}")
+            return True
+        except (OSError, FirestoreRESTError) as e:
+            self.log(f"Failed to benchmark Firestore rules: {e}", "ERROR")
+            return False
+            
+    async def deploy_firestore_rules(self) -> bool:
+        """Deploy Firestore security rules and indexes"""
         try:
-            self.log("Deploying Firestore security rules...")
+            self.log("Deploying Firestore security rules and indexes...")
             
             # Check if firestore.rules exists
             rules_file = Path("firestore.rules")
@@ -312,30 +1442,35 @@ class ChauparSetupAutomation:
                 self.log("firestore.rules not found", "ERROR")
                 return False
                 
-            # Deploy rules using Firebase CLI
-            result = subprocess.run([
-                'firebase', 'deploy', '--only', 'firestore:rules',
-                '--project', self.project_id
-            ], capture_output=True, text=True)
+            if not await self.firebase.available():
+                self.log("Firebase CLI not available for rules deployment", "WARNING")
+                return False
+                
+            # Deploy rules and indexes using Firebase CLI (indexes missing from the file are left in place)
+            result = await self.run_streaming(
+                [self.firebase.executable, 'deploy', '--only', 'firestore:rules,firestore:indexes',
+                 '--project', self.project_id],
+                "firestore rules deploy"
+            )
             
-            if result.returncode == 0:
-                self.log("Firestore security rules deployed successfully")
+            if result.ok:
+                self.log("Firestore security rules and indexes deployed successfully")
                 return True
             else:
-                self.log(f"Failed to deploy rules: {result.stderr}", "ERROR")
+                self.log_failure_tail("Failed to deploy rules", result)
                 return False
                 
         except Exception as e:
             self.log(f"Failed to deploy Firestore rules: {e}", "ERROR")
             return False
             
-    def setup_environment_file(self) -> bool:
+    async def setup_environment_file(self) -> bool:
         """Create and configure .env.local file"""
         try:
             self.log("Setting up environment configuration...")
             
             # Check if .env.local already exists
-            env_file = Path(".env.local")
+            env_file = self.env_file
             if env_file.exists():
                 # Check if this is a rerun with same project ID
                 with open(env_file, 'r') as f:
@@ -344,7 +1479,7 @@ class ChauparSetupAutomation:
                         self.log(".env.local already configured for this project, updating...")
                     else:
                         self.log(".env.local exists for different project, backing up...")
-                        backup_file = Path(f".env.local.backup.{int(time.time())}")
+                        backup_file = Path(f"{env_file}.backup.{int(time.time())}")
                         env_file.rename(backup_file)
                         self.log(f"Backup saved to {backup_file}")
             else:
@@ -364,7 +1499,7 @@ VITE_FIREBASE_MESSAGING_SENDER_ID=your_sender_id_here
 VITE_FIREBASE_APP_ID=your_app_id_here
 
 # AI Configuration
-VITE_OLLAMA_URL=http://localhost:11434
+VITE_OLLAMA_URL={self.ai_url}
 VITE_AI_PROVIDER=ollama
 
 # Game Defaults
@@ -391,47 +1526,49 @@ VITE_DEBUG_MODE=true
             self.log(f"Failed to create .env.local: {e}", "ERROR")
             return False
             
-    def install_dependencies(self) -> bool:
+    async def install_dependencies(self) -> bool:
         """Install npm dependencies"""
         try:
             self.log("Installing npm dependencies...")
             
-            result = subprocess.run(['npm', 'install', '--legacy-peer-deps'], capture_output=True, text=True)
+            result = await self.run_streaming(['npm', 'install', '--legacy-peer-deps'], "npm install")
             
-            if result.returncode == 0:
-                self.log("Dependencies installed successfully")
+            if result.ok:
+                self.log(f"Dependencies installed successfully ({result.elapsed:.1f}s)")
                 return True
             else:
-                self.log(f"Failed to install dependencies: {result.stderr}", "ERROR")
+                self.log_failure_tail("Failed to install dependencies", result)
                 return False
                 
         except Exception as e:
             self.log(f"Failed to install dependencies: {e}", "ERROR")
             return False
             
-    def setup_ollama(self) -> bool:
+    async def setup_ollama(self) -> bool:
         """Setup Ollama for local AI"""
         try:
             self.log("Setting up Ollama...")
             
             # Check if Ollama is running
-            try:
-                response = requests.get('http://localhost:11434/api/tags', timeout=5)
-                if response.status_code == 200:
-                    self.log("Ollama is already running")
-                    return True
-            except requests.RequestException:
-                pass
+            ollama_ready = http_probe(f"{self.OLLAMA_URL}/api/tags")
+            if await ollama_ready():
+                self.log("Ollama is already running")
+                return await self.start_ai_proxy() if self.ai_proxy else True
                 
-            # Try to start Ollama
+            # Try to start Ollama in the background and wait until its API answers
+            # (a plain Popen: the server has to outlive this run's event loop)
             try:
-                result = subprocess.run(['ollama', 'serve'], 
-                                      capture_output=True, text=True, timeout=10)
-                if result.returncode == 0:
-                    self.log("Ollama started successfully")
-                    return True
+                process = subprocess.Popen(['ollama', 'serve'],
+                                           stdout=subprocess.DEVNULL,
+                                           stderr=subprocess.DEVNULL,
+                                           start_new_session=True)
+                if await wait_until(ollama_ready, timeout=30, abort=lambda: process.poll() is not None):
+                    self.log(f"Ollama started successfully (PID: {process.pid})")
+                    return await self.start_ai_proxy() if self.ai_proxy else True
                 else:
                     self.log("Failed to start Ollama", "WARNING")
+                    if process.poll() is None:
+                        process.terminate()
                     return False
             except FileNotFoundError:
                 self.log("Ollama not installed", "INFO")
@@ -442,81 +1579,238 @@ VITE_DEBUG_MODE=true
             self.log(f"Failed to setup Ollama: {e}", "ERROR")
             return False
             
-    def test_build(self) -> bool:
+    async def start_ai_proxy(self) -> bool:
+        """Start the AI gateway (``ai-proxy`` subcommand) in front of Ollama unless one is running"""
+        proxy_ready = http_probe(f"{self.AI_PROXY_URL}/_proxy/health")
+        if await proxy_ready():
+            self.log(f"AI gateway is already running at {self.AI_PROXY_URL}")
+            self.ai_proxy_running = True
+            return True
+        command = [sys.executable, str(Path(__file__).resolve()), "ai-proxy",
+                   "--port", str(urlsplit(self.AI_PROXY_URL).port or AI_PROXY_PORT),
+                   "--upstream", self.OLLAMA_URL, "--cache", self.ai_cache,
+                   "--concurrency", str(self.ai_concurrency)]
+        # Like Ollama itself, the gateway has to outlive this run
+        with open(self.AI_PROXY_LOG, "ab") as log_file:
+            process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True)
+        if await wait_until(proxy_ready, timeout=15, abort=lambda: process.poll() is not None):
+            self.log(f"AI gateway started at {self.AI_PROXY_URL} ({self.ai_cache} cache, "
+                     f"{self.ai_concurrency} model calls at once, PID: {process.pid})")
+            self.ai_proxy_running = True
+            return True
+        self.log(f"AI gateway failed to start; see {self.AI_PROXY_LOG}", "WARNING")
+        if process.poll() is None:
+            process.terminate()
+        return False
+        
+    def load_ollama_prompts(self) -> List[Dict]:
+        """Prompts for the warm-up: ``ollama_prompts_file`` if set, else the built-in positions
+        
+        The file holds a JSON list of prompt strings or ``{"prompt": ..., "skill": ...}`` objects.
+        """
+        if self.ollama_prompts_file:
+            with open(self.ollama_prompts_file) as f:
+                entries = json.load(f)
+            prompts = [{"prompt": entry, "skill": "intermediate"} if isinstance(entry, str)
+                       else {"prompt": entry["prompt"], "skill": entry.get("skill", "intermediate")}
+                       for entry in entries]
+            if not prompts:
+                raise ValueError(f"{self.ollama_prompts_file} contains no prompts")
+            return prompts
+        return [{"prompt": chaupar_move_prompt(pieces, dice, skill), "skill": skill}
+                for pieces, dice, skill in OLLAMA_BENCH_POSITIONS]
+        
+    async def time_ollama_move(self, prompt: str, skill: str) -> Dict:
+        """Stream one /api/generate call and time it: first token, end to end, tokens per second"""
+        body = json.dumps({"model": self.OLLAMA_MODEL, "prompt": prompt, "stream": True,
+                           "keep_alive": OLLAMA_KEEP_ALIVE, "options": ollama_options(skill)}).encode()
+        started = time.perf_counter()
+        first_token = None
+        final: Dict = {}
+        pieces = []
+        async with http_stream(f"{self.OLLAMA_URL}/api/generate", "POST", body,
+                               {"Content-Type": "application/json"}, timeout=OLLAMA_GENERATE_TIMEOUT) as response:
+            if response.status != 200:
+                raise ConnectionError(f"/api/generate returned HTTP {response.status}")
+            async for line in response.lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise ConnectionError(data["error"])
+                if data.get("response"):
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    pieces.append(data["response"])
+                if data.get("done"):
+                    final = data
+                    break
+        total = time.perf_counter() - started
+        ttft = (first_token or time.perf_counter()) - started
+        # Ollama reports generated tokens and generation time (ns) in the final chunk
+        tokens = final.get("eval_count") or len(pieces)
+        generation = final.get("eval_duration", 0) / 1e9 or (total - ttft)
+        return {"skill": skill, "ttft": ttft, "total": total, "tokens": tokens,
+                "tokens_per_second": tokens / generation if generation > 0 else 0.0,
+                "reply": "".join(pieces).strip()[:80]}
+        
+    async def warm_up_ollama(self) -> bool:
+        """Preload the AI model and time representative move prompts like aiService.js sends them"""
+        try:
+            model = self.OLLAMA_MODEL
+            self.log(f"Warming up Ollama model {model}...")
+            tags = await http_request(f"{self.OLLAMA_URL}/api/tags", timeout=5)
+            installed = {entry.get("name") for entry in tags.json().get("models", [])}
+            if model not in installed:
+                self.log(f"Model {model} is not available in Ollama", "WARNING")
+                self.log(f"Pull it with: ollama pull {model}", "INFO")
+                return False
+            prompts = self.load_ollama_prompts()
+            
+            # A request without a prompt only loads the model; this is the cold start
+            # the first AI move after a deploy would otherwise pay
+            started = time.perf_counter()
+            response = await http_request(
+                f"{self.OLLAMA_URL}/api/generate", "POST",
+                json.dumps({"model": model, "keep_alive": OLLAMA_KEEP_ALIVE}).encode(),
+                {"Content-Type": "application/json"}, timeout=OLLAMA_LOAD_TIMEOUT)
+            load_time = time.perf_counter() - started
+            if response.status != 200:
+                self.log(f"Loading {model} failed: HTTP {response.status}", "WARNING")
+                return False
+            self.log(f"Model loaded in {load_time:.2f}s (kept resident for {OLLAMA_KEEP_ALIVE})")
+            
+            moves = []
+            for entry in prompts:
+                moves.append(await self.time_ollama_move(entry["prompt"], entry["skill"]))
+            ttfts = [move["ttft"] for move in moves]
+            totals = [move["total"] for move in moves]
+            self.ollama_benchmark = {
+                "model": model,
+                "url": self.OLLAMA_URL,
+                "load_seconds": load_time,
+                "prompts": len(moves),
+                "ttft_p50_ms": _percentile(ttfts, 50) * 1000,
+                "ttft_max_ms": max(ttfts) * 1000,
+                "total_p50_ms": _percentile(totals, 50) * 1000,
+                "total_p95_ms": _percentile(totals, 95) * 1000,
+                "total_max_ms": max(totals) * 1000,
+                "tokens_per_second": sum(move["tokens_per_second"] for move in moves) / len(moves),
+                "moves": moves,
+            }
+            bench = self.ollama_benchmark
+            self.log(f"AI move latency over {len(moves)} prompts: first token p50 {bench['ttft_p50_ms']:.0f} ms, "
+                     f"end to end p50 {bench['total_p50_ms']:.0f} ms / max {bench['total_max_ms']:.0f} ms, "
+                     f"{bench['tokens_per_second']:.1f} tokens/s")
+            return True
+            
+        except (OSError, asyncio.TimeoutError, ValueError, KeyError) as e:
+            self.log(f"Ollama warm-up failed: {e}", "WARNING")
+            return False
+            
+    async def test_build(self) -> bool:
         """Test if the application builds successfully"""
         try:
             self.log("Testing application build...")
             
-            result = subprocess.run(['npm', 'run', 'build'], capture_output=True, text=True)
+            key = await _to_thread(self.build_cache_key)
+            if self.use_cache:
+                size = await _to_thread(self.build_cache.restore, key, self.dist_dir)
+                if size is not None:
+                    self.log(f"♻️ Restored build {key[:12]} from artifact cache ({size / 1024:.0f} KiB)")
+                    return True
+                    
+            command = ['npm', 'run', 'build']
+            if self.build_mode:
+                # Fleet builds: load .env.<mode>.local and keep each project's output apart
+                command += ['--', '--mode', self.build_mode, '--outDir', str(self.dist_dir), '--emptyOutDir']
+            result = await self.run_streaming(command, "npm run build")
             
-            if result.returncode == 0:
-                self.log("Application builds successfully")
+            if result.ok:
+                self.log(f"Application builds successfully ({result.elapsed:.1f}s)")
+                try:
+                    if await _to_thread(self.build_cache.store, key, self.dist_dir):
+                        self.log(f"💾 Build {key[:12]} saved to {self.build_cache.root}")
+                except OSError as e:
+                    self.log(f"Failed to store build artifact: {e}", "WARNING")
                 return True
             else:
-                self.log(f"Build failed: {result.stderr}", "ERROR")
+                self.log_failure_tail("Build failed", result)
                 return False
                 
         except Exception as e:
             self.log(f"Build test failed: {e}", "ERROR")
             return False
             
-    def auto_populate_firebase_config(self) -> bool:
+    async def check_bundle_size(self) -> bool:
+        """Measure the build, precompress it, write its cache headers and fail on a budget regression"""
+        try:
+            analyzer = BundleAnalyzer(self.dist_dir)
+            chunks = await _to_thread(analyzer.measure)
+            if not analyzer.brotli:
+                self.log("brotli not available, measuring gzip only. Install with: pip install brotli", "WARNING")
+            print_bundle_sizes(chunks, log=self.log)
+            
+            # Fleet projects get theirs in their own hosting config at deploy time
+            if self.hosting_config == Path("firebase.json") and \
+                    await _to_thread(lambda: update_hosting_config(hosting_headers(self.dist_dir))):
+                self.log("📝 Cache and preload headers for this build merged into firebase.json")
+            problems = bundle_regressions(chunks, load_bundle_budget(), load_bundle_baseline())
+            for problem in problems:
+                self.log(problem, "ERROR")
+            if problems:
+                self.log("Bundle over budget; shrink it or accept with: python setup_automation.py bundle "
+                         "--update-baseline", "ERROR")
+                return False
+            save_bundle_baseline(chunks)
+            totals = bundle_totals(chunks)
+            self.log(f"Bundle within budget: {totals['gzip'] / 1024:.0f} KiB gzipped in {len(chunks)} chunks")
+            return True
+        except (OSError, ValueError) as e:
+            self.log(f"Bundle size check failed: {e}", "ERROR")
+            return False
+            
+    async def auto_populate_firebase_config(self) -> bool:
         """Auto-populate Firebase configuration from project"""
         try:
             self.log("🔍 Fetching Firebase configuration from project...")
             
             # Check if Firebase CLI is available
-            try:
-                result = subprocess.run(['firebase', '--version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode != 0:
-                    self.log("Firebase CLI not available for auto-configuration", "WARNING")
-                    return False
-            except FileNotFoundError:
+            if not await self.firebase.available():
                 self.log("Firebase CLI not available for auto-configuration", "WARNING")
                 return False
             
             # Check if user is logged in
-            result = subprocess.run(['firebase', 'projects:list'], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode != 0:
+            if not await self.firebase.is_logged_in():
                 self.log("Not logged into Firebase CLI for auto-configuration", "WARNING")
                 return False
             
             # Try to get web app list first
-            result = subprocess.run(['firebase', 'apps:list', '--project', self.project_id], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode != 0:
+            apps = await self.firebase.apps_list(self.project_id)
+            if apps is None:
                 self.log("Could not fetch app list", "WARNING")
                 return False
             
             # Check if web app exists
-            if "No apps found" in result.stdout or "WEB" not in result.stdout:
+            if not apps:
                 self.log("No web app found, creating one...")
-                if self.create_firebase_web_app():
+                if await self.create_firebase_web_app():
                     self.log("Web app created successfully")
-                    # Wait a moment for the app to be ready
-                    time.sleep(2)
                 else:
                     self.log("Failed to create web app", "WARNING")
                     return False
+                
+                # Poll until the new app shows up in the (freshly fetched) app list
+                async def new_app_listed():
+                    self.firebase.invalidate("apps:list", self.project_id)
+                    return await self.firebase.apps_list(self.project_id)
+                    
+                apps = await wait_until(new_app_listed, timeout=30, initial_delay=0.5, max_delay=5)
+                if not apps:
+                    self.log("Could not fetch updated app list", "WARNING")
+                    return False
             
-            # Get the app ID from the list (parse text output)
-            result = subprocess.run(['firebase', 'apps:list', '--project', self.project_id], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode != 0:
-                self.log("Could not fetch updated app list", "WARNING")
-                return False
-            
-            # Extract app ID from output
-            app_id = None
-            for line in result.stdout.split('\n'):
-                if 'WEB' in line:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        app_id = parts[1]  # App ID is typically in the second column
-                        break
-            
+            app_id = next((app.get('appId') for app in apps if app.get('appId')), None)
             if not app_id:
                 self.log("Could not find web app ID", "WARNING")
                 return False
@@ -524,55 +1818,48 @@ VITE_DEBUG_MODE=true
             self.log(f"Found web app: {app_id}")
             
             # Get SDK configuration using the app ID
-            result = subprocess.run(['firebase', 'apps:sdkconfig', 'WEB', app_id, '--project', self.project_id], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode != 0:
+            sdk_config = await self.firebase.sdk_config(self.project_id, app_id)
+            if sdk_config is None:
                 self.log("Could not fetch SDK configuration", "WARNING")
                 return False
             
-            # Parse SDK configuration JSON
-            try:
-                sdk_config = json.loads(result.stdout)
-                api_key = sdk_config.get('apiKey')
-                auth_domain = sdk_config.get('authDomain')
-                storage_bucket = sdk_config.get('storageBucket')
-                messaging_sender_id = sdk_config.get('messagingSenderId')
-                project_id = sdk_config.get('projectId')
-                actual_app_id = sdk_config.get('appId')
-                
-                # Validate required fields
-                if not api_key:
-                    self.log("Could not extract API key from configuration", "WARNING")
-                    return False
-                
-                if not actual_app_id:
-                    self.log("Could not extract App ID from configuration", "WARNING")
-                    return False
-                
-                # Use fallback values if not provided
-                auth_domain = auth_domain or f"{self.project_id}.firebaseapp.com"
-                storage_bucket = storage_bucket or f"{self.project_id}.appspot.com"
-                
-                self.log("Successfully extracted Firebase configuration:")
-                self.log(f"- API Key: {api_key[:20]}...")
-                self.log(f"- Auth Domain: {auth_domain}")
-                self.log(f"- Storage Bucket: {storage_bucket}")
-                self.log(f"- App ID: {actual_app_id}")
-                
-                # Update .env.local with actual values
-                self.update_env_file(api_key, actual_app_id, auth_domain, storage_bucket, messaging_sender_id)
-                self.log("Firebase configuration updated with actual values")
-                return True
-                
-            except json.JSONDecodeError as e:
-                self.log(f"Could not parse SDK configuration: {e}", "WARNING")
+            # Extract SDK configuration fields
+            api_key = sdk_config.get('apiKey')
+            auth_domain = sdk_config.get('authDomain')
+            storage_bucket = sdk_config.get('storageBucket')
+            messaging_sender_id = sdk_config.get('messagingSenderId')
+            project_id = sdk_config.get('projectId')
+            actual_app_id = sdk_config.get('appId')
+            
+            # Validate required fields
+            if not api_key:
+                self.log("Could not extract API key from configuration", "WARNING")
+                return False
+            
+            if not actual_app_id:
+                self.log("Could not extract App ID from configuration", "WARNING")
                 return False
             
+            # Use fallback values if not provided
+            auth_domain = auth_domain or f"{self.project_id}.firebaseapp.com"
+            storage_bucket = storage_bucket or f"{self.project_id}.appspot.com"
+            
+            self.log("Successfully extracted Firebase configuration:")
+            self.log(f"- API Key: {api_key[:20]}...")
+            self.log(f"- Auth Domain: {auth_domain}")
+            self.log(f"- Storage Bucket: {storage_bucket}")
+            self.log(f"- App ID: {actual_app_id}")
+            
+            # Update .env.local with actual values
+            self.update_env_file(api_key, actual_app_id, auth_domain, storage_bucket, messaging_sender_id)
+            self.log("Firebase configuration updated with actual values")
+            return True
+            
         except Exception as e:
             self.log(f"Auto-configuration failed: {e}", "ERROR")
             return False
     
-    def create_firebase_web_app(self) -> bool:
+    async def create_firebase_web_app(self) -> bool:
         """Create Firebase web app if none exists"""
         try:
             self.log("Creating Firebase web app...")
@@ -580,17 +1867,13 @@ VITE_DEBUG_MODE=true
             # Create a web app with project name
             app_name = self.project_name or "Chaupar"
             
-            # Use the interactive method that works more reliably
-            process = subprocess.Popen(['firebase', 'apps:create', 'web', '--project', self.project_id],
-                                     stdin=subprocess.PIPE, 
-                                     stdout=subprocess.PIPE, 
-                                     stderr=subprocess.PIPE,
-                                     text=True)
-            
-            # Provide the app name when prompted
-            stdout, stderr = process.communicate(input=f"{app_name}\n")
+            # Use the interactive method that works more reliably,
+            # providing the app name when prompted
+            result = await self.firebase.run(['apps:create', 'web', '--project', self.project_id],
+                                       input=f"{app_name}\n")
+            self.firebase.invalidate("apps:list", self.project_id)
             
-            if process.returncode == 0:
+            if result.returncode == 0:
                 self.log(f"Web app '{app_name}' created successfully")
                 return True
             else:
@@ -605,8 +1888,8 @@ VITE_DEBUG_MODE=true
     def update_env_file(self, api_key: str, app_id: str, auth_domain: str, storage_bucket: str, messaging_sender_id: str):
         """Update .env.local with actual Firebase configuration"""
         try:
-            env_file = ".env.local"
-            temp_file = ".env.local.tmp"
+            env_file = self.env_file
+            temp_file = f"{env_file}.tmp"
             
             # Create updated .env.local
             env_content = f"""# Chaupar Game Environment Configuration
@@ -622,7 +1905,7 @@ VITE_FIREBASE_MESSAGING_SENDER_ID={messaging_sender_id}
 VITE_FIREBASE_APP_ID={app_id}
 
 # AI Configuration
-VITE_OLLAMA_URL=http://localhost:11434
+VITE_OLLAMA_URL={self.ai_url}
 VITE_AI_PROVIDER=ollama
 
 # Game Defaults
@@ -647,26 +1930,20 @@ VITE_DEBUG_MODE=true
         except Exception as e:
             self.log(f"Failed to update environment file: {e}", "ERROR")
     
-    def setup_google_auth(self) -> bool:
+    async def setup_google_auth(self) -> bool:
         """Setup Google Authentication"""
         try:
             self.log("🔐 Setting up Google Authentication...")
             
             # Check if Firebase CLI is available
-            try:
-                result = subprocess.run(['firebase', '--version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode != 0:
-                    self.log("Firebase CLI not available for auth setup", "WARNING")
-                    return False
-            except FileNotFoundError:
+            if not await self.firebase.available():
                 self.log("Firebase CLI not available for auth setup", "WARNING")
                 return False
             
             # Try to enable Google Auth provider
             self.log("Enabling Google Authentication provider...")
-            result = subprocess.run(['firebase', 'auth:import', '--project', self.project_id, '--data', '{"users": []}'], 
-                                  capture_output=True, text=True, timeout=10)
+            result = await self.firebase.run(['auth:import', '--project', self.project_id, '--data', '{"users": []}'],
+                                       timeout=10)
             
             if result.returncode == 0:
                 self.log("Google Authentication enabled successfully")
@@ -681,47 +1958,49 @@ VITE_DEBUG_MODE=true
             self.log(f"Google Auth setup failed: {e}", "ERROR")
             return False
     
-    def test_dev_server(self) -> bool:
+    async def test_dev_server(self) -> bool:
         """Test development server"""
         try:
             self.log("🧪 Testing development server...")
             
-            # Start dev server in background
-            process = subprocess.Popen(['npm', 'run', 'dev'], 
-                                     stdout=subprocess.DEVNULL, 
-                                     stderr=subprocess.DEVNULL)
+            # Start dev server in background, in its own process group so npm's vite child stops with it
+            process = await asyncio.create_subprocess_exec('npm', 'run', 'dev',
+                                                           stdout=subprocess.DEVNULL,
+                                                           stderr=subprocess.DEVNULL,
+                                                           start_new_session=(os.name == "posix"))
             
             self.log(f"Development server started (PID: {process.pid})")
             
-            # Wait for server to start
-            time.sleep(10)
-            
-            # Test if server is responding
+            # Poll until Vite answers, giving up early if the server process dies
             try:
-                response = requests.get('http://localhost:5173', timeout=5)
-                if response.status_code == 200:
-                    self.log("Development server is responding on http://localhost:5173")
+                ready = await wait_until(http_probe(self.DEV_SERVER_URL), timeout=60,
+                                         abort=lambda: process.returncode is not None)
+            finally:
+                await stop_process(process, grace=5)
                     
-                    # Stop the server
-                    process.terminate()
-                    process.wait(timeout=5)
-                    
-                    return True
-                else:
-                    self.log("Development server not responding properly")
-                    process.terminate()
-                    process.wait(timeout=5)
-                    return False
-            except requests.RequestException:
-                self.log("Development server not responding")
-                process.terminate()
-                process.wait(timeout=5)
-                return False
+            if ready:
+                self.log(f"Development server is responding on {self.DEV_SERVER_URL}")
+                return True
+            self.log("Development server not responding")
+            return False
                 
         except Exception as e:
             self.log(f"Development server test failed: {e}", "ERROR")
             return False
             
+    def ollama_report(self) -> str:
+        """AI latency section of the setup report, empty when the warm-up didn't run"""
+        bench = self.ollama_benchmark
+        if not bench:
+            return ""
+        return f"""
+AI Latency (Ollama {bench['model']}, {bench['prompts']} move prompts):
+- Model load (cold start): {bench['load_seconds']:.2f}s
+- Time to first token: p50 {bench['ttft_p50_ms']:.0f} ms, max {bench['ttft_max_ms']:.0f} ms
+- End-to-end move: p50 {bench['total_p50_ms']:.0f} ms, p95 {bench['total_p95_ms']:.0f} ms, max {bench['total_max_ms']:.0f} ms
+- Generation speed: {bench['tokens_per_second']:.1f} tokens/s
+"""
+        
     def generate_setup_report(self) -> str:
         """Generate a comprehensive setup report"""
         report = f"""
@@ -733,6 +2012,9 @@ Project Information:
 - Project Name: {self.project_name}
 - Setup Date: {time.strftime('%Y-%m-%d %H:%M:%S')}
 
+Step Status:
+{chr(10).join(f"- {name}: {status}" for name, status in self.step_status.items())}
+{self.ollama_report()}
 Setup Log:
 {chr(10).join(self.setup_log)}
 
@@ -758,7 +2040,7 @@ Setup Status: {'✅ COMPLETE' if all(self.setup_log) else '⚠️ INCOMPLETE'}
         
     def detect_rerun(self) -> bool:
         """Detect if this is a rerun of setup for the same project"""
-        env_file = Path(".env.local")
+        env_file = self.env_file
         if not env_file.exists():
             return False
             
@@ -769,7 +2051,7 @@ Setup Status: {'✅ COMPLETE' if all(self.setup_log) else '⚠️ INCOMPLETE'}
         except Exception:
             return False
             
-    def run_complete_setup(self) -> bool:
+    async def run_complete_setup(self) -> bool:
         """Run the complete setup process"""
         self.log("🚀 Starting Chaupar Game Setup Automation")
         
@@ -789,52 +2071,13 @@ Setup Status: {'✅ COMPLETE' if all(self.setup_log) else '⚠️ INCOMPLETE'}
             self.log("🔄 Detected rerun for same project - updating configuration...")
             self.log("Existing configuration will be updated, not overwritten")
         
-        # Run setup steps
-        steps = [
-            ("Prerequisites Check", self.check_prerequisites),
-            ("Firebase Project Creation", self.create_firebase_project),
-            ("Firebase Services Setup", self.setup_firebase_services),
-            ("Firebase Hosting Setup", self.setup_firebase_hosting),
-            ("Environment Configuration", self.setup_environment_file),
-            ("Firebase Auto-Configuration", self.auto_populate_firebase_config),
-            ("Dependencies Installation", self.install_dependencies),
-            ("Ollama Setup", self.setup_ollama),
-            ("Build Test", self.test_build),
-            ("Google Authentication Setup", self.setup_google_auth),
-        ]
+        steps = self.build_step_graph()
+        results = await self.run_step_graph(steps)
         
-        success_count = 0
-        total_steps = len(steps)
+        required = [step for step in steps if not step.optional]
+        success_count = sum(1 for step in required if results.get(step.name))
+        total_steps = len(required)
         
-        for step_name, step_func in steps:
-            self.log(f"Step: {step_name}")
-            try:
-                if step_func():
-                    success_count += 1
-                    self.log(f"✅ {step_name} completed successfully")
-                else:
-                    self.log(f"❌ {step_name} failed")
-            except Exception as e:
-                self.log(f"❌ {step_name} failed with error: {e}", "ERROR")
-                
-        # Deploy Firestore rules (optional step)
-        try:
-            if self.deploy_firestore_rules():
-                self.log("✅ Firestore rules deployed")
-            else:
-                self.log("⚠️ Firestore rules deployment skipped")
-        except Exception as e:
-            self.log(f"⚠️ Firestore rules deployment failed: {e}", "WARNING")
-            
-        # Deploy to hosting (optional step)
-        try:
-            if self.deploy_to_hosting():
-                self.log("✅ Game deployed to Firebase hosting")
-            else:
-                self.log("⚠️ Hosting deployment skipped")
-        except Exception as e:
-            self.log(f"⚠️ Hosting deployment failed: {e}", "WARNING")
-            
         # Generate report
         success_rate = (success_count / total_steps) * 100
         self.log(f"Setup completed: {success_count}/{total_steps} steps successful ({success_rate:.1f}%)")
@@ -846,78 +2089,2318 @@ Setup Status: {'✅ COMPLETE' if all(self.setup_log) else '⚠️ INCOMPLETE'}
         else:
             self.log("⚠️ Setup completed with some issues", "WARNING")
             
+        self.trace.finish()
+        self.save_trace()
+        
         # Save report
         report = self.generate_setup_report()
-        with open("setup_report.txt", "w") as f:
+        with open(self.report_file, "w") as f:
             f.write(report)
             
-        self.log("Setup report saved to setup_report.txt")
-        print("\n" + report)
+        self.log(f"Setup report saved to {self.report_file}")
+        if self.print_report:
+            print("\n" + report)
         
         return success_rate >= 80
+        
+    def save_trace(self) -> None:
+        """Write the run's step and command timings to the trace file"""
+        if not self.trace_file:
+            return
+        metadata = {
+            "project_id": self.project_id,
+            "project_name": self.project_name,
+            "jobs": self.jobs,
+            "use_cache": self.use_cache,
+            "hostname": socket.gethostname(),
+            "platform": sys.platform,
+            "python": sys.version.split()[0],
+            "cpu_count": os.cpu_count(),
+        }
+        if self.ollama_benchmark:
+            metadata["ollama"] = self.ollama_benchmark
+        try:
+            self.trace.write(self.trace_file, metadata, self.trace_format)
+            self.log(f"⏱️ Run trace saved to {self.trace_file} ({self.trace_format} format)")
+        except Exception as e:
+            self.log(f"Failed to save run trace: {e}", "WARNING")
+        
+    async def run_shared_steps(self) -> Dict[str, bool]:
+        """Run only the project-independent steps, for reuse by every project of a fleet"""
+        self.log("🧰 Running shared setup steps")
+        steps = [step for step in self.build_step_graph() if step.name in SHARED_STEPS]
+        for step in steps:
+            # Ordering after per-project steps (hosting setup after the build) doesn't apply here:
+            # each project writes its own hosting config, with its own build's headers, at deploy time
+            step.after = tuple(dep for dep in step.after if dep in SHARED_STEPS)
+        results = await self.run_step_graph(steps)
+        self.trace.finish()
+        self.save_trace()
+        return results
+        
+    def build_step_graph(self) -> List[SetupStep]:
+        """Declare the setup steps and what each of them depends on"""
+        return [
+            SetupStep("Prerequisites Check", self.check_prerequisites),
+            SetupStep("Firebase Project Creation", self.create_firebase_project),
+            SetupStep("Firebase Services Setup", self.setup_firebase_services,
+                      after=("Firebase Project Creation",)),
+            # The header rules preload the entry chunks named in the build's manifest
+            SetupStep("Firebase Hosting Setup", self.setup_firebase_hosting, after=("Build Test",)),
+            # With --ai-proxy, .env.local points at the gateway only if Ollama Setup got it running
+            SetupStep("Environment Configuration", self.setup_environment_file,
+                      after=("Firebase Project Creation",) + (("Ollama Setup",) if self.ai_proxy else ())),
+            # Auto-configuration rewrites .env.local, so it must not race the initial write
+            SetupStep("Firebase Auto-Configuration", self.auto_populate_firebase_config,
+                      needs=("Environment Configuration",)),
+            SetupStep("Dependencies Installation", self.install_dependencies,
+                      needs=("Prerequisites Check",),
+                      inputs=("package.json", "package-lock.json"), outputs=("node_modules",)),
+            SetupStep("Ollama Setup", self.setup_ollama),
+            SetupStep("Ollama Warm-up", self.warm_up_ollama, needs=("Ollama Setup",), optional=True),
+            # The build bakes VITE_* values in, so wait for the final .env.local
+            SetupStep("Build Test", self.test_build,
+                      needs=("Dependencies Installation",),
+                      after=("Environment Configuration", "Firebase Auto-Configuration"),
+                      inputs=BUILD_INPUTS + (str(self.env_file),),
+                      outputs=(str(self.dist_dir / "index.html"),)),
+            SetupStep("Google Authentication Setup", self.setup_google_auth,
+                      after=("Firebase Project Creation",)),
+            SetupStep("Firestore Index Check", self.check_firestore_indexes, optional=True,
+                      inputs=QUERY_SOURCES + (str(INDEXES_FILE),)),
+            SetupStep("Firestore Rules Benchmark", self.benchmark_firestore_rules, optional=True),
+            # Ships the indexes file, so it waits for the check (and a --fix-indexes rewrite);
+            # a rules regression holds it back
+            SetupStep("Firestore Rules Deployment", self.deploy_firestore_rules,
+                      needs=("Firestore Rules Benchmark",),
+                      after=("Firebase Project Creation", "Firestore Index Check"), optional=True,
+                      inputs=("firestore.rules", "firestore.indexes.json"), per_project=True),
+            # Writes the cache headers into the hosting config; a regression holds back the deploy
+            SetupStep("Bundle Size Check", self.check_bundle_size,
+                      needs=("Build Test",), after=("Firebase Hosting Setup",), optional=True),
+            SetupStep("Hosting Deployment", self.deploy_to_hosting,
+                      needs=("Build Test", "Firebase Hosting Setup", "Bundle Size Check"), optional=True,
+                      inputs=(f"{self.dist_dir.as_posix()}/**/*", "firebase.json"), per_project=True),
+        ]
+        
+    def _validate_step_graph(self, steps: List[SetupStep]):
+        """Reject unknown dependencies and cycles before anything runs"""
+        by_name = {step.name: step for step in steps}
+        if len(by_name) != len(steps):
+            raise ValueError("Duplicate step names in setup graph")
+        for step in steps:
+            for dep in step.depends_on:
+                if dep not in by_name:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+                    
+        visiting, visited = set(), set()
+        
+        def visit(name: str, path: List[str]):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle in setup graph: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in by_name[name].depends_on:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+            
+        for step in steps:
+            visit(step.name, [])
+            
+    async def _run_step(self, step: SetupStep) -> bool:
+        """Run a single step, logging and timing its outcome"""
+        record = self.trace.begin_step(step.name)
+        try:
+            ok = await self._execute_step(step)
+        finally:
+            self.trace.end_step(record, self.step_status.get(step.name, "failed"))
+        return ok
+        
+    async def _execute_step(self, step: SetupStep) -> bool:
+        # Fingerprinting hashes whole trees (src/, dist/); keep it off the event loop
+        if await _to_thread(self.is_step_cached, step):
+            self.log(f"⚡ {step.name} cached (inputs unchanged)")
+            self.step_status[step.name] = "cached"
+            return True
+            
+        self.log(f"Step: {step.name}")
+        try:
+            ok = bool(await step.func())
+        except Exception as e:
+            self.log(f"❌ {step.name} failed with error: {e}", "ERROR" if not step.optional else "WARNING")
+            ok = False
+        else:
+            if ok:
+                self.log(f"✅ {step.name} completed successfully")
+            elif step.optional:
+                self.log(f"⚠️ {step.name} skipped")
+            else:
+                self.log(f"❌ {step.name} failed")
+                
+        self.step_status[step.name] = "success" if ok else ("skipped" if step.optional else "failed")
+        await _to_thread(self.record_step_fingerprint, step, ok)
+        return ok
+        
+    async def run_step_graph(self, steps: List[SetupStep]) -> Dict[str, bool]:
+        """Run steps as soon as their dependencies finish, up to self.jobs at a time
+        
+        Every step is a task waiting on the tasks of its dependencies; a
+        semaphore bounds how many run at once and hands slots out in
+        declaration order, so with ``jobs=1`` the run is identical to the old
+        serial sequence. Cancelling the run cancels every step (and kills the
+        commands they are running).
+        """
+        self._validate_step_graph(steps)
+        results: Dict[str, bool] = {}
+        slots = asyncio.Semaphore(self.jobs)
+        tasks: Dict[str, asyncio.Future] = {}
+        
+        async def schedule(step: SetupStep) -> bool:
+            if step.name in self.shared_results:
+                results[step.name] = self.shared_results[step.name]
+                self.step_status[step.name] = "shared"
+                return results[step.name]
+            await asyncio.gather(*(tasks[dep] for dep in step.depends_on))
+            failed = [dep for dep in step.needs if not results[dep]]
+            if failed:
+                self.log(f"⏭️ {step.name} skipped: requires {', '.join(failed)}", "WARNING")
+                self.step_status[step.name] = "skipped"
+                results[step.name] = False
+                return False
+            async with slots:
+                results[step.name] = await self._run_step(step)
+            return results[step.name]
+            
+        for step in steps:
+            tasks[step.name] = asyncio.ensure_future(schedule(step))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return {step.name: results[step.name] for step in steps}
 
-    def deploy_to_hosting(self) -> bool:
+    def hosting_manifest(self) -> Dict[str, List]:
+        """Map every file hosting would upload from dist/ to its [sha256, size]"""
+        manifest = {}
+        for path in sorted(self.dist_dir.rglob("*")):
+            relative = path.relative_to(self.dist_dir)
+            # firebase.json ignores "**/.*" and the precompressed siblings
+            if (not path.is_file() or any(part.startswith(".") for part in relative.parts)
+                    or path.suffix in PRECOMPRESSED_SUFFIXES):
+                continue
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            manifest[relative.as_posix()] = [digest.hexdigest(), path.stat().st_size]
+        return manifest
+        
+    @staticmethod
+    def diff_hosting_manifest(previous: Dict[str, List], current: Dict[str, List]):
+        """Return (changed files, removed files, bytes to upload) between two manifests"""
+        changed = [name for name, entry in current.items() if previous.get(name, [None])[0] != entry[0]]
+        removed = [name for name in previous if name not in current]
+        return changed, removed, sum(current[name][1] for name in changed)
+        
+    def write_hosting_config(self) -> None:
+        """Write a copy of firebase.json that serves this project's own build, with its headers"""
+        with open("firebase.json", "r") as f:
+            config = json.load(f)
+        merge_hosting_config(config, hosting_headers(self.dist_dir))["hosting"]["public"] = self.dist_dir.as_posix()
+        with open(self.hosting_config, "w") as f:
+            json.dump(config, f, indent=2)
+            
+    async def deploy_to_hosting(self) -> bool:
         """Deploy the built game to Firebase hosting"""
         try:
             self.log("Deploying to Firebase hosting...")
             
-            # Check if dist directory exists
-            dist_dir = Path("dist")
+            # Only ship the build of the current sources; restore or rebuild it otherwise
+            dist_dir = self.dist_dir
+            key = await _to_thread(self.build_cache_key)
             if not dist_dir.exists():
-                self.log("⚠️ dist/ directory not found. Building project first...")
-                if not self.test_build():
+                self.log(f"⚠️ {dist_dir}/ directory not found. Building project first...")
+            elif BuildCache.stamp_of(dist_dir) != key:
+                self.log(f"⚠️ {dist_dir}/ does not match the current sources. Building project first...")
+            if BuildCache.stamp_of(dist_dir) != key:
+                if not await self.test_build():
                     self.log("❌ Build failed, cannot deploy", "ERROR")
                     return False
+                if BuildCache.stamp_of(dist_dir) != key:
+                    self.log("❌ Sources changed during the build, cannot deploy", "ERROR")
+                    return False
                     
             # Check if Firebase CLI is available
-            try:
-                import subprocess
-                result = subprocess.run(
-                    ["firebase", "--version"], 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=10
-                )
-                if result.returncode != 0:
-                    raise Exception("Firebase CLI not found")
-            except Exception:
+            if not await self.firebase.available():
                 self.log("⚠️ Firebase CLI not found. Please install it first:", "WARNING")
                 self.log("npm install -g firebase-tools", "INFO")
                 self.log("Then run: firebase login", "INFO")
                 return False
                 
+            command = [self.firebase.executable, "deploy", "--only", "hosting", "--project", self.project_id]
+            # The preload headers name the chunks of the build being shipped
+            if self.hosting_config != Path("firebase.json"):
+                await _to_thread(self.write_hosting_config)
+                command += ["--config", str(self.hosting_config)]
+            elif await _to_thread(lambda: update_hosting_config(hosting_headers(dist_dir))):
+                self.log("📝 Hosting headers updated for this build")
+                
+            # Compare dist/ and the hosting config with what the last successful deploy shipped
+            manifest = await _to_thread(self.hosting_manifest)
+            with open(self.hosting_config, 'rb') as f:
+                config_hash = hashlib.sha256(f.read()).hexdigest()
+            previous = self._cache_entry(self._read_cache()).get('hosting', {})
+            if previous.get('project_id') != self.project_id or previous.get('config') != config_hash:
+                previous = {}
+            changed, removed, upload_bytes = self.diff_hosting_manifest(previous.get('manifest', {}), manifest)
+            if previous and not changed and not removed and self.use_cache:
+                self.log(f"✅ Hosting is up to date ({len(manifest)} files unchanged since "
+                         f"{previous.get('deployed_at', 'the last deploy')}), skipping deploy")
+                return True
+            self.log(f"📦 {len(changed)} of {len(manifest)} files changed, {len(removed)} removed: "
+                     f"{upload_bytes / 1024:.0f} KiB to upload")
+            timeout = HOSTING_DEPLOY_BASE_TIMEOUT + upload_bytes / HOSTING_MIN_UPLOAD_RATE
+            
             # Deploy to hosting
-            try:
-                result = subprocess.run(
-                    ["firebase", "deploy", "--only", "hosting", "--project", self.project_id],
-                    capture_output=True,
-                    text=True,
-                    timeout=120
-                )
-                
-                if result.returncode == 0:
-                    self.log("✅ Successfully deployed to Firebase hosting!")
-                    self.log("🌐 Your game is now live!")
+            result = await self.run_streaming(
+                command,
+                "hosting deploy",
+                timeout=timeout
+            )
+            
+            if result.ok:
+                deployed_at = time.strftime('%Y-%m-%d %H:%M:%S')
+                
+                def update(cache: Dict):
+                    cache['hosting'] = {'project_id': self.project_id, 'config': config_hash,
+                                        'deployed_at': deployed_at, 'manifest': manifest}
                     
-                    # Extract hosting URL from output
-                    if "Hosting URL:" in result.stdout:
-                        hosting_url = result.stdout.split("Hosting URL:")[1].split("\n")[0].strip()
+                try:
+                    self._update_cache(update)
+                except Exception as e:
+                    self.log(f"Failed to save hosting manifest: {e}", "WARNING")
+                self.log("✅ Successfully deployed to Firebase hosting!")
+                self.log("🌐 Your game is now live!")
+                
+                # Extract hosting URL from output
+                for line in result.tail:
+                    if "Hosting URL:" in line:
+                        hosting_url = line.split("Hosting URL:")[1].strip()
                         self.log(f"🔗 Hosting URL: {hosting_url}")
+                        break
                         
-                    return True
-                else:
-                    self.log(f"❌ Deployment failed: {result.stderr}", "ERROR")
-                    return False
-                    
-            except subprocess.TimeoutExpired:
-                self.log("❌ Deployment timed out", "ERROR")
+                return True
+            elif result.timed_out:
+                self.log_failure_tail(f"❌ Deployment timed out after {timeout:.0f}s", result)
+                return False
+            else:
+                self.log_failure_tail("❌ Deployment failed", result)
                 return False
                 
         except Exception as e:
             self.log(f"Failed to deploy to hosting: {e}", "ERROR")
             return False
 
+def load_manifest(path: str) -> Dict:
+    """Load a fleet manifest (JSON, or YAML if PyYAML is installed)
+    
+    Either a list of projects or ``{"max_parallel": N, "projects": [...]}``,
+    where each project is ``{"project_id": ..., "project_name": ...}``.
+    """
+    with open(path, 'r') as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML manifests need PyYAML: pip install pyyaml")
+        manifest = yaml.safe_load(text)
+    else:
+        manifest = json.loads(text)
+        
+    if isinstance(manifest, list):
+        manifest = {"projects": manifest}
+    projects = manifest.get("projects") if isinstance(manifest, dict) else None
+    if not projects:
+        raise ValueError(f"{path}: no projects listed")
+    seen = set()
+    for project in projects:
+        project_id = project.get("project_id") if isinstance(project, dict) else None
+        if not project_id:
+            raise ValueError(f"{path}: every project needs a project_id")
+        if not re.fullmatch(r"[a-z0-9-]+", project_id):
+            raise ValueError(f"{path}: invalid project_id '{project_id}'")
+        if project_id in seen:
+            raise ValueError(f"{path}: duplicate project_id '{project_id}'")
+        seen.add(project_id)
+    return manifest
+
+async def run_fleet(manifest: Dict, jobs: int = DEFAULT_JOBS, max_parallel: Optional[int] = None,
+                    use_cache: bool = True, trace_file: Optional[str] = "setup_trace.json",
+                    trace_format: str = "json", fleet_dir: Path = Path("fleet"),
+                    settings: Optional[Dict] = None) -> bool:
+    """Set up every project in a manifest, at most ``max_parallel`` at a time
+    
+    Project-independent steps (prerequisites, npm install, Ollama, hosting
+    config) run once up front and count for every project. Each project then
+    gets its own env file, build output, cache entry, report and trace. The
+    build itself stays per project because Vite inlines the project's
+    VITE_FIREBASE_* values into the bundle; reruns still skip it via the
+    step cache. ``settings`` (attribute -> value, see ``setup_settings``)
+    is applied to the shared run and to every project.
+    """
+    projects = manifest["projects"]
+    max_parallel = max(1, max_parallel or manifest.get("max_parallel") or DEFAULT_FLEET_PARALLEL)
+    progress = LiveProgress()
+    
+    shared = ChauparSetupAutomation(project_name="shared", jobs=jobs, use_cache=use_cache,
+                                    trace_file=trace_file, trace_format=trace_format)
+    shared.apply_settings(settings or {})
+    shared.progress = progress
+    shared.log_prefix = "[shared] "
+    fleet_dir.mkdir(parents=True, exist_ok=True)
+    if shared.trace_file:
+        shared.trace_file = fleet_dir / f"shared_{shared.trace_file.name}"
+    shared_results = await shared.run_shared_steps()
+    slots = asyncio.Semaphore(max_parallel)
+    
+    async def setup_project(project: Dict) -> bool:
+        async with slots:
+            automation = ChauparSetupAutomation(
+                project_id=project["project_id"],
+                project_name=project.get("project_name", project["project_id"]),
+                jobs=jobs, use_cache=use_cache, trace_file=trace_file, trace_format=trace_format
+            )
+            automation.apply_settings(settings or {})
+            automation.use_fleet_layout(fleet_dir, shared_results, progress)
+            # The shared run started the AI gateway (or didn't) for everyone
+            automation.ai_proxy_running = shared.ai_proxy_running
+            try:
+                return await automation.run_complete_setup()
+            except Exception as e:
+                print(f"💥 [{project['project_id']}] setup failed with error: {e}")
+                return False
+                
+    print(f"🚢 Setting up {len(projects)} projects ({max_parallel} at a time)")
+    results = await asyncio.gather(*(setup_project(project) for project in projects))
+    outcomes = {project["project_id"]: ok for project, ok in zip(projects, results)}
+    
+    print("\n🚢 Fleet summary")
+    for project_id, ok in outcomes.items():
+        print(f"  {'✅' if ok else '⚠️'} {project_id}: {fleet_dir / project_id / 'setup_report.txt'}")
+    return all(outcomes.values())
+
+class RateLimiter:
+    """Token bucket: ``acquire(n)`` waits until ``n`` more operations fit in ``rate`` per second"""
+    
+    def __init__(self, rate: Optional[float]):
+        self.rate = rate
+        self._tokens = rate or 0.0
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        
+    async def acquire(self, n: int = 1) -> None:
+        if not self.rate:
+            return
+        if self._lock is None:
+            # Created on first use so it binds to the running loop
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(max(self.rate, n), self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                await asyncio.sleep((n - self._tokens) / self.rate)
+
+def firestore_client(project_id: str, emulator_host: Optional[str] = None):
+    """Return a Firestore client (and the firestore module) for a project, or for the local emulator"""
+    firebase_admin, _, credentials, firestore = _load_firebase_admin()
+    if emulator_host:
+        # google-cloud-firestore talks to the emulator over plain gRPC when this is set
+        os.environ["FIRESTORE_EMULATOR_HOST"] = emulator_host
+        from google.auth.credentials import AnonymousCredentials
+        
+        class EmulatorCredential(credentials.Base):
+            def get_credential(self):
+                return AnonymousCredentials()
+                
+        cred = EmulatorCredential()
+    else:
+        cred = credentials.ApplicationDefault()
+    app_name = f"chaupar-{project_id}"
+    try:
+        app = firebase_admin.get_app(app_name)
+    except ValueError:
+        app = firebase_admin.initialize_app(cred, {"projectId": project_id}, name=app_name)
+    return firestore.client(app), firestore
+
+async def stream_pages(query, page_size: int):
+    """Yield pages of a query, following a cursor from the last document of each page"""
+    def page(after):
+        paged = query.limit(page_size)
+        if after is not None:
+            paged = paged.start_after(after)
+        return list(paged.stream())
+        
+    after = None
+    while True:
+        documents = await _to_thread(page, after)
+        if documents:
+            yield documents
+        if len(documents) < page_size:
+            return
+        after = documents[-1]
+
+class FirestorePruner:
+    """Deletes stale games from Firestore together with their move logs
+    
+    A game is stale when it finished more than ``finished_days`` ago, when it
+    has been waiting or playing without an update for ``abandoned_days``, or
+    when ``deleteGame`` soft-deleted it. Games are streamed page by page with
+    cursor queries that need no composite index; ``concurrency`` games at a
+    time have their ``gameMoves`` entries and subcollections (moves, chat)
+    collected, and all deletes go out in batched writes of up to 500, throttled
+    to ``rate`` writes per second. A game document is deleted after its moves,
+    so an interrupted run picks the rest up next time. With ``dry_run`` only
+    counts are reported.
+    """
+    
+    BATCH_SIZE = 500  # Firestore's limit on writes per batch
+    ACTIVE_STATUSES = ("waiting", "playing")
+    
+    def __init__(self, db, firestore_module, finished_days: float = 30, abandoned_days: float = 7,
+                 page_size: int = 300, concurrency: int = 4, rate: Optional[float] = None,
+                 dry_run: bool = False, log=print):
+        self.db = db
+        self.document_id = firestore_module.FieldPath.document_id()
+        now = datetime.now(timezone.utc)
+        self.finished_cutoff = now - timedelta(days=finished_days)
+        self.abandoned_cutoff = now - timedelta(days=abandoned_days)
+        self.page_size = max(1, min(page_size, self.BATCH_SIZE))
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(rate)
+        self.dry_run = dry_run
+        self.log = log
+        self.stats = {"games_scanned": 0, "finished": 0, "abandoned": 0, "soft_deleted": 0,
+                      "moves": 0, "subcollection_docs": 0, "writes": 0, "batches": 0}
+        self._pending = []
+        self._commit_lock: Optional[asyncio.Lock] = None
+        self._failed = False
+        
+    def _stream(self, query):
+        return stream_pages(query, self.page_size)
+        
+    def classify(self, game: Dict) -> Optional[str]:
+        """Why a game should be pruned ("finished", "abandoned", "soft_deleted"), or None"""
+        if game.get("deleted"):
+            return "soft_deleted"
+        updated = game.get("updatedAt") or game.get("createdAt")
+        if not isinstance(updated, datetime):
+            return None
+        if game.get("status") in self.ACTIVE_STATUSES:
+            return "abandoned" if updated < self.abandoned_cutoff else None
+        return "finished" if updated < self.finished_cutoff else None
+        
+    async def _delete(self, refs: List) -> None:
+        """Queue deletes; full batches are committed one at a time, in the order they were queued"""
+        self._pending.extend(refs)
+        while len(self._pending) >= self.BATCH_SIZE:
+            await self._commit()
+            
+    async def _commit(self, flush: bool = False) -> None:
+        """Commit the batch at the front of the queue; a partial one only when ``flush`` is set
+        
+        The batch is taken off the queue while holding the lock, so a game
+        document (queued after its moves) never commits before them, and
+        nothing more is committed once a batch has failed.
+        """
+        if self._commit_lock is None:
+            self._commit_lock = asyncio.Lock()
+        async with self._commit_lock:
+            if self._failed:
+                raise RuntimeError("Not committing deletes after an earlier batch failed")
+            if len(self._pending) < (1 if flush else self.BATCH_SIZE):
+                return
+            refs, self._pending = self._pending[:self.BATCH_SIZE], self._pending[self.BATCH_SIZE:]
+            await self.limiter.acquire(len(refs))
+            if not self.dry_run:
+                batch = self.db.batch()
+                for ref in refs:
+                    batch.delete(ref)
+                try:
+                    await _to_thread(batch.commit)
+                except BaseException:
+                    self._failed = True
+                    raise
+            self.stats["writes"] += len(refs)
+            self.stats["batches"] += 1
+            
+    async def _prune_game(self, snapshot, reason: str) -> None:
+        refs = []
+        moves = self.db.collection("gameMoves").where("gameId", "==", snapshot.id)
+        async for page in self._stream(moves.order_by(self.document_id).select([])):
+            refs.extend(doc.reference for doc in page)
+            self.stats["moves"] += len(page)
+        for subcollection in await _to_thread(lambda: list(snapshot.reference.collections())):
+            async for page in self._stream(subcollection.order_by(self.document_id).select([])):
+                refs.extend(doc.reference for doc in page)
+                self.stats["subcollection_docs"] += len(page)
+        refs.append(snapshot.reference)
+        self.stats[reason] += 1
+        await self._delete(refs)
+        
+    async def run(self) -> Dict[str, int]:
+        games = self.db.collection("games")
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        
+        async def prune(snapshot, reason):
+            async with slots:
+                await self._prune_game(snapshot, reason)
+                
+        seen = set()
+        # Single-field range and equality filters: served by Firestore's automatic indexes
+        queries = [
+            games.where("updatedAt", "<", max(self.finished_cutoff, self.abandoned_cutoff)).order_by("updatedAt"),
+            games.where("deleted", "==", True).order_by(self.document_id),
+        ]
+        try:
+            for query in queries:
+                async for page in self._stream(query):
+                    for snapshot in page:
+                        if snapshot.id in seen:
+                            continue
+                        seen.add(snapshot.id)
+                        self.stats["games_scanned"] += 1
+                        reason = self.classify(snapshot.to_dict() or {})
+                        if reason:
+                            tasks.append(asyncio.ensure_future(prune(snapshot, reason)))
+                    # Don't let scanning run arbitrarily far ahead of the deletes
+                    while sum(not task.done() for task in tasks) > self.concurrency * 4:
+                        await asyncio.sleep(0.05)
+            await asyncio.gather(*tasks)
+            while self._pending:
+                await self._commit(flush=True)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return self.stats
+
+class GameExporter:
+    """Streams ``games`` and ``gameMoves`` into a columnar move log (``chaupar_sim.replay.MoveLog``)
+    
+    Both collections are read in full-page cursor scans, running side by
+    side, instead of one query per game: games by document ID, moves by
+    ``gameId`` then ``timestamp`` (the composite index in
+    firestore.indexes.json), so each game's moves arrive together and in play
+    order. Only the fields the replay needs are fetched, and move pages go
+    straight into typed column buffers rather than one dict per move.
+    """
+    
+    GAME_FIELDS = ["id", "status", "mode", "skillLevel", "players", "createdAt"]
+    MOVE_FIELDS = ["gameId", "playerId", "diceValue", "fromPosition", "toPosition", "timestamp"]
+    
+    def __init__(self, db, firestore_module, page_size: int = 1000, log=print):
+        self.db = db
+        self.document_id = firestore_module.FieldPath.document_id()
+        self.page_size = max(1, page_size)
+        self.log = log
+        self.stats = {"games": 0, "moves": 0, "pages": 0}
+        
+    async def _games(self) -> List[Dict]:
+        games = []
+        query = self.db.collection("games").order_by(self.document_id).select(self.GAME_FIELDS)
+        async for page in stream_pages(query, self.page_size):
+            self.stats["pages"] += 1
+            games.extend(dict(snapshot.to_dict() or {}, id=snapshot.id) for snapshot in page)
+            self.stats["games"] = len(games)
+        return games
+        
+    async def _moves(self, moves) -> None:
+        """Append each page of moves to ``moves`` (a ``MoveColumns``) as it arrives"""
+        query = self.db.collection("gameMoves").order_by("gameId").order_by("timestamp").select(self.MOVE_FIELDS)
+        async for page in stream_pages(query, self.page_size):
+            self.stats["pages"] += 1
+            moves.append(snapshot.to_dict() or {} for snapshot in page)
+            self.stats["moves"] += len(page)
+            if self.stats["moves"] % (self.page_size * 20) < len(page):
+                self.log(f"  📥 {self.stats['moves']} moves read...")
+        
+    async def run(self):
+        """Read both collections and return the ``MoveLog``"""
+        from chaupar_sim.replay import MoveColumns, MoveLog
+        
+        moves = MoveColumns()
+        games, _ = await asyncio.gather(self._games(), self._moves(moves))
+        return MoveLog.from_columns(games, moves)
+
+def maintain_main(argv: List[str]) -> int:
+    """``setup_automation.py maintain ...``: database maintenance subcommands"""
+    parser = argparse.ArgumentParser(
+        prog="setup_automation.py maintain",
+        description="🧹 Chaupar Firestore maintenance",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Count what would be deleted
+  python setup_automation.py maintain prune --dry-run
+  
+  # Prune games finished 90+ days ago or idle for 14+ days, at most 200 deletes/s
+  python setup_automation.py maintain prune --finished-days 90 --abandoned-days 14 --rate 200
+  
+  # Against the local emulator (firebase emulators:start --only firestore)
+  python setup_automation.py maintain prune --emulator localhost:8080 --project-id demo-chaupar
+  
+  # Export every game and move for offline analytics, then replay it
+  python setup_automation.py maintain export --out chaupar-moves.npz
+  python -m chaupar_sim replay chaupar-moves.npz
+        """
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    prune = commands.add_parser("prune", help="Delete stale games together with their moves")
+    prune.add_argument("--project-id", help="Firebase project ID (default: the cached project)")
+    prune.add_argument("--finished-days", type=float, default=30,
+                       help="Delete finished games last updated this many days ago (default: 30)")
+    prune.add_argument("--abandoned-days", type=float, default=7,
+                       help="Delete waiting/playing games idle this many days (default: 7)")
+    prune.add_argument("--dry-run", action="store_true", help="Only count what would be deleted")
+    prune.add_argument("--concurrency", type=int, default=4, help="Games processed at once (default: 4)")
+    prune.add_argument("--rate", type=float, default=500, help="Max deletes per second, 0 for no limit (default: 500)")
+    prune.add_argument("--page-size", type=int, default=300, help="Documents per query page (default: 300)")
+    prune.add_argument("--emulator", nargs="?", const="localhost:8080",
+                       default=os.environ.get("FIRESTORE_EMULATOR_HOST"), metavar="HOST:PORT",
+                       help="Use the Firestore emulator (default: $FIRESTORE_EMULATOR_HOST)")
+    export = commands.add_parser("export", help="Export games and moves to a columnar file for offline analytics")
+    export.add_argument("--project-id", help="Firebase project ID (default: the cached project)")
+    export.add_argument("--out", default="chaupar-moves.npz", help="Output file (default: chaupar-moves.npz)")
+    export.add_argument("--page-size", type=int, default=1000, help="Documents per query page (default: 1000)")
+    export.add_argument("--emulator", nargs="?", const="localhost:8080",
+                        default=os.environ.get("FIRESTORE_EMULATOR_HOST"), metavar="HOST:PORT",
+                        help="Use the Firestore emulator (default: $FIRESTORE_EMULATOR_HOST)")
+    args = parser.parse_args(argv)
+    
+    if not firebase_available():
+        return 1
+    project_id = args.project_id
+    if not project_id:
+        cache = ChauparSetupAutomation(trace_file=None)
+        project_id = cache.project_id if cache.load_cached_project() else None
+    if not project_id:
+        print("❌ No project ID: pass --project-id or run the setup first")
+        return 1
+        
+    target = f"emulator {args.emulator}" if args.emulator else f"project {project_id}"
+    if args.command == "export":
+        return export_moves(args, project_id, target)
+    print(f"🧹 Pruning stale games in {target}{' (dry run)' if args.dry_run else ''}")
+    try:
+        db, firestore = firestore_client(project_id, args.emulator)
+        pruner = FirestorePruner(db, firestore, finished_days=args.finished_days,
+                                 abandoned_days=args.abandoned_days, page_size=args.page_size,
+                                 concurrency=args.concurrency, rate=args.rate or None,
+                                 dry_run=args.dry_run)
+        start = time.perf_counter()
+        stats = asyncio.run(pruner.run())
+    except KeyboardInterrupt:
+        print("\n❌ Pruning interrupted; rerun to continue")
+        return 1
+    except Exception as e:
+        print(f"\n💥 Pruning failed: {e}")
+        return 1
+        
+    elapsed = time.perf_counter() - start
+    games = stats["finished"] + stats["abandoned"] + stats["soft_deleted"]
+    verb = "Would delete" if args.dry_run else "Deleted"
+    print(f"🔍 Scanned {stats['games_scanned']} candidate games in {elapsed:.1f}s")
+    print(f"🗑️ {verb} {games} games ({stats['finished']} finished, {stats['abandoned']} abandoned, "
+          f"{stats['soft_deleted']} soft-deleted), {stats['moves']} moves and "
+          f"{stats['subcollection_docs']} subcollection documents")
+    print(f"✍️ {stats['writes']} deletes in {stats['batches']} batches")
+    return 0
+
+def export_moves(args, project_id: str, target: str) -> int:
+    """``maintain export``: write every game and its moves to a ``MoveLog`` file"""
+    from chaupar_sim import NUMPY_AVAILABLE
+    if not NUMPY_AVAILABLE:
+        print("⚠️ NumPy not available. Install with: pip install numpy")
+        return 1
+        
+    print(f"📦 Exporting games and moves from {target}")
+    try:
+        db, firestore = firestore_client(project_id, args.emulator)
+        exporter = GameExporter(db, firestore, page_size=args.page_size)
+        start = time.perf_counter()
+        move_log = asyncio.run(exporter.run())
+        path = move_log.save(args.out)
+    except KeyboardInterrupt:
+        print("\n❌ Export interrupted")
+        return 1
+    except Exception as e:
+        print(f"\n💥 Export failed: {e}")
+        return 1
+        
+    elapsed = time.perf_counter() - start
+    stats = exporter.stats
+    print(f"✅ {len(move_log)} games and {stats['moves']} moves in {stats['pages']} pages, {elapsed:.1f}s "
+          f"({stats['moves'] / elapsed if elapsed else 0:.0f} moves/s)")
+    print(f"📄 Written to {path} ({path.stat().st_size / 1024:.0f} KB)")
+    print(f"   Analyze with: python -m chaupar_sim replay {path}")
+    return 0
+
+def _percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))]
+
+def _firestore_value(value) -> Dict:
+    """Encode a Python value as a Firestore REST ``Value``"""
+    if value is None:
+        return {"nullValue": None}
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"integerValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, datetime):
+        return {"timestampValue": value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")}
+    if isinstance(value, dict):
+        return {"mapValue": {"fields": {k: _firestore_value(v) for k, v in value.items()}}}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_firestore_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+class FirestoreRESTError(Exception):
+    """Error response from the Firestore REST API"""
+    
+    def __init__(self, code: int, status: str, message: str = ""):
+        super().__init__(f"{code} {status}: {message}".strip())
+        self.code = code
+        self.status = status
+
+class FirestoreEmulatorClient:
+    """Firestore REST client for the local emulator, acting as app users
+    
+    Requests carry unsigned ID tokens, which the emulator accepts, so
+    ``firestore.rules`` is evaluated exactly as for the web client; the special
+    ``owner`` token bypasses the rules like the Admin SDK does.
+    """
+    
+    def __init__(self, host: str, project_id: str, timeout: float = 30.0, max_connections: int = 256):
+        self.base_url = f"http://{host}"
+        self.project_id = project_id
+        self.root = f"projects/{project_id}/databases/(default)/documents"
+        self.timeout = timeout
+        self._max_connections = max_connections
+        self._slots: Optional[asyncio.Semaphore] = None
+        
+    def token(self, uid: Optional[str]) -> str:
+        """Unsigned Firebase ID token for ``uid``; None means the rules-bypassing owner"""
+        if uid is None:
+            return "owner"
+        now = int(time.time())
+        
+        def encode(part: Dict) -> str:
+            return base64.urlsafe_b64encode(json.dumps(part).encode()).decode().rstrip("=")
+            
+        claims = {
+            "iss": f"https://securetoken.google.com/{self.project_id}", "aud": self.project_id,
+            "iat": now, "exp": now + 3600, "auth_time": now, "sub": uid, "user_id": uid,
+            "firebase": {"sign_in_provider": "custom", "identities": {}},
+        }
+        return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}."
+        
+    async def request(self, method: str, path: str, token: str, body: Optional[Dict] = None) -> Dict:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_connections)
+        async with self._slots:
+            response = await http_request(
+                f"{self.base_url}/{path}", method=method,
+                body=json.dumps(body).encode() if body is not None else None,
+                headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+                timeout=self.timeout
+            )
+        try:
+            payload = response.json() if response.body else {}
+        except ValueError:
+            payload = {}
+        if response.status >= 400:
+            error = payload.get("error", {}) if isinstance(payload, dict) else {}
+            raise FirestoreRESTError(response.status, error.get("status", "UNKNOWN"), error.get("message", ""))
+        return payload
+        
+    def name(self, path: str) -> str:
+        return f"{self.root}/{path}"
+        
+    async def clear(self) -> None:
+        """Delete every document in the emulator's database"""
+        await self.request("DELETE", f"emulator/v1/{self.root}", "owner")
+        
+    async def begin(self, token: str) -> str:
+        return (await self.request("POST", f"v1/{self.root}:beginTransaction", token, {}))["transaction"]
+        
+    async def get(self, path: str, token: str, transaction: Optional[str] = None) -> Dict:
+        query = f"?transaction={quote(transaction, safe='')}" if transaction else ""
+        return await self.request("GET", f"v1/{self.name(path)}{query}", token)
+        
+    async def commit(self, token: str, writes: List[Dict], transaction: Optional[str] = None) -> Dict:
+        body = {"writes": writes}
+        if transaction:
+            body["transaction"] = transaction
+        return await self.request("POST", f"v1/{self.root}:commit", token, body)
+
+class LoadTestStats:
+    """Latencies, outcomes and transaction retries per operation"""
+    
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.attempts: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.writes = 0
+        
+    def record(self, op: str, latency: float, error: Optional[str] = None, writes: int = 0) -> None:
+        if error:
+            counts = self.errors.setdefault(op, {})
+            counts[error] = counts.get(error, 0) + 1
+        else:
+            self.latencies.setdefault(op, []).append(latency)
+            self.writes += writes
+            
+    def summary(self, elapsed: float) -> Dict:
+        ops = {}
+        for op in sorted(set(self.latencies) | set(self.errors)):
+            samples = self.latencies.get(op, [])
+            errors = self.errors.get(op, {})
+            attempts = self.attempts.get(op, 0)
+            ops[op] = {
+                "ok": len(samples), "errors": errors,
+                "p50_ms": _percentile(samples, 50) * 1000, "p95_ms": _percentile(samples, 95) * 1000,
+                "p99_ms": _percentile(samples, 99) * 1000, "max_ms": max(samples, default=0.0) * 1000,
+                "retry_rate": self.retries.get(op, 0) / attempts if attempts else 0.0,
+            }
+        return {"elapsed": elapsed, "writes": self.writes,
+                "writes_per_second": self.writes / elapsed if elapsed else 0.0, "operations": ops}
+
+class FirestoreLoadTest:
+    """Simulates concurrent Chaupar games against the Firestore emulator
+    
+    Each game follows ``gameService.js``: the host creates the game, the other
+    players join, then players take turns writing moves (``makeMove``) after a
+    randomized think time while every player keeps reading the game document
+    as ``subscribeToGame`` listeners would (the REST API has no listen
+    stream, so each listener polls). Joins and moves run as transactions and
+    are retried when the emulator aborts them for contention.
+    """
+    
+    MAX_ATTEMPTS = 5
+    
+    def __init__(self, client: FirestoreEmulatorClient, games: int = 50, players: int = 4, moves: int = 40,
+                 think_time: float = 1.0, poll_interval: float = 1.0, ramp_up: float = 5.0,
+                 bypass_rules: bool = False):
+        self.client = client
+        self.games = games
+        self.players = max(2, min(players, 4))
+        self.moves = moves
+        self.think_time = think_time
+        self.poll_interval = poll_interval
+        self.ramp_up = ramp_up
+        self.bypass_rules = bypass_rules
+        self.run_id = f"{int(time.time()):x}"
+        self.stats = LoadTestStats()
+        
+    async def _timed(self, op: str, call, writes: int = 0):
+        start = time.perf_counter()
+        try:
+            result = await call
+        except FirestoreRESTError as e:
+            self.stats.record(op, time.perf_counter() - start, e.status)
+            return None
+        except (OSError, asyncio.TimeoutError) as e:
+            self.stats.record(op, time.perf_counter() - start, type(e).__name__)
+            return None
+        self.stats.record(op, time.perf_counter() - start, writes=writes)
+        return result
+        
+    async def _transaction(self, op: str, token: str, path: str, build_writes) -> bool:
+        """Read a document and commit ``build_writes(document)`` in a transaction, retrying aborts"""
+        start = time.perf_counter()
+        delay = 0.05
+        for attempt in range(self.MAX_ATTEMPTS):
+            self.stats.attempts[op] = self.stats.attempts.get(op, 0) + 1
+            try:
+                transaction = await self.client.begin(token)
+                document = await self.client.get(path, token, transaction)
+                writes = build_writes(document)
+                await self.client.commit(token, writes, transaction)
+            except FirestoreRESTError as e:
+                if e.status == "ABORTED" and attempt + 1 < self.MAX_ATTEMPTS:
+                    self.stats.retries[op] = self.stats.retries.get(op, 0) + 1
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                    delay *= 2
+                    continue
+                self.stats.record(op, time.perf_counter() - start, e.status)
+                return False
+            except (OSError, asyncio.TimeoutError) as e:
+                self.stats.record(op, time.perf_counter() - start, type(e).__name__)
+                return False
+            self.stats.record(op, time.perf_counter() - start, writes=len(writes))
+            return True
+        return False
+        
+    async def _listen(self, token: str, path: str, done: asyncio.Event) -> None:
+        while not done.is_set():
+            await self._timed("read", self.client.get(path, token))
+            try:
+                await asyncio.wait_for(done.wait(), self.poll_interval * random.uniform(0.8, 1.2))
+            except asyncio.TimeoutError:
+                pass
+                
+    async def play(self, index: int) -> None:
+        await asyncio.sleep(self.ramp_up * index / max(1, self.games))
+        game_id = f"load-{self.run_id}-{index}"
+        game_path = f"games/{game_id}"
+        game_name = self.client.name(game_path)
+        uids = [f"load-{self.run_id}-{index}-p{n}" for n in range(self.players)]
+        tokens = [self.client.token(None if self.bypass_rules else uid) for uid in uids]
+        
+        # The rules key players by uid, so the host lists the invited players up front
+        players = {uid: {"name": f"Player {n + 1}", "color": n, "joined": n == 0} for n, uid in enumerate(uids)}
+        created = await self._timed("create", self.client.commit(tokens[0], [{
+            "update": {"name": game_name, "fields": {
+                "id": _firestore_value(game_id), "mode": _firestore_value("multiplayer"),
+                "status": _firestore_value("waiting"), "players": _firestore_value(players),
+                "currentPlayer": _firestore_value(0),
+            }},
+            "currentDocument": {"exists": False},
+            "updateTransforms": [{"fieldPath": "createdAt", "setToServerValue": "REQUEST_TIME"},
+                                 {"fieldPath": "updatedAt", "setToServerValue": "REQUEST_TIME"}],
+        }]), writes=1)
+        if created is None:
+            return
+            
+        def join(n: int):
+            def writes(document: Dict) -> List[Dict]:
+                status = "playing" if n == self.players - 1 else "waiting"
+                return [{
+                    "update": {"name": game_name, "fields": {
+                        "players": {"mapValue": {"fields": {uids[n]: _firestore_value(dict(players[uids[n]], joined=True))}}},
+                        "status": _firestore_value(status),
+                    }},
+                    "updateMask": {"fieldPaths": [f"players.`{uids[n]}`", "status"]},
+                    "updateTransforms": [{"fieldPath": "updatedAt", "setToServerValue": "REQUEST_TIME"}],
+                }]
+            return writes
+            
+        # Everyone joins at once: contention on the game document
+        await asyncio.gather(*(self._transaction("join", tokens[n], game_path, join(n))
+                               for n in range(1, self.players)))
+        
+        done = asyncio.Event()
+        listeners = [asyncio.ensure_future(self._listen(token, game_path, done)) for token in tokens]
+        try:
+            for move in range(self.moves):
+                await asyncio.sleep(self.think_time * random.uniform(0.5, 1.5))
+                player = move % self.players
+                move_path = (f"gameMoves/{game_id}-{move}" if self.bypass_rules
+                             else f"{game_path}/moves/{move:04d}")
+                dice = random.randint(1, 6)
+                
+                def writes(document: Dict, move=move, player=player, move_path=move_path, dice=dice) -> List[Dict]:
+                    last_move = {"playerId": uids[player], "diceValue": dice,
+                                 "fromPosition": move, "toPosition": move + dice}
+                    return [{
+                        "update": {"name": game_name, "fields": {
+                            "currentPlayer": _firestore_value((player + 1) % self.players),
+                            "lastMove": _firestore_value(last_move),
+                        }},
+                        "updateMask": {"fieldPaths": ["currentPlayer", "lastMove"]},
+                        "updateTransforms": [{"fieldPath": "updatedAt", "setToServerValue": "REQUEST_TIME"},
+                                             {"fieldPath": "lastMove.timestamp", "setToServerValue": "REQUEST_TIME"}],
+                    }, {
+                        "update": {"name": self.client.name(move_path), "fields": {
+                            k: _firestore_value(v) for k, v in dict(last_move, gameId=game_id, move=move).items()
+                        }},
+                        "currentDocument": {"exists": False},
+                        "updateTransforms": [{"fieldPath": "timestamp", "setToServerValue": "REQUEST_TIME"}],
+                    }]
+                    
+                await self._transaction("move", tokens[player], game_path, writes)
+        finally:
+            done.set()
+            await asyncio.gather(*listeners, return_exceptions=True)
+            
+    async def run(self) -> Dict:
+        start = time.perf_counter()
+        await asyncio.gather(*(self.play(index) for index in range(self.games)))
+        return self.stats.summary(time.perf_counter() - start)
+
+async def start_firestore_emulator(host: str, project_id: str, log=print):
+    """Start ``firebase emulators:start --only firestore`` on ``host`` with this repo's rules
+    
+    Returns the emulator process once it accepts connections, or None if the
+    CLI is missing or the emulator didn't come up within 60 seconds.
+    """
+    hostname, _, port = host.rpartition(":")
+    config_file = Path("firebase.loadtest.json")
+    with open(config_file, "w") as f:
+        json.dump({"firestore": {"rules": "firestore.rules", "indexes": "firestore.indexes.json"},
+                   "emulators": {"firestore": {"host": hostname, "port": int(port)}, "ui": {"enabled": False}}},
+                  f, indent=2)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "firebase", "emulators:start", "--only", "firestore", "--project", project_id,
+            "--config", str(config_file),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=(os.name == "posix")
+        )
+    except FileNotFoundError:
+        config_file.unlink()
+        log("❌ Firebase CLI not found. Install with: npm install -g firebase-tools")
+        return None
+    log(f"🔥 Starting Firestore emulator on {host} (PID: {process.pid})...")
+    ready = await wait_until(tcp_probe(hostname, int(port)), timeout=60, max_delay=1.0,
+                             abort=lambda: process.returncode is not None)
+    if not ready:
+        await stop_process(process)
+        config_file.unlink()
+        log("❌ Firestore emulator did not start (needs Java 11+)")
+        return None
+    return process
+
+async def stop_process(process, grace: float = 10.0) -> None:
+    """SIGTERM a child started in its own session, then SIGKILL it after ``grace`` seconds"""
+    if process.returncode is not None:
+        return
+    _kill_process_tree(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), grace)
+    except asyncio.TimeoutError:
+        _kill_process_tree(process)
+        await process.wait()
+
+def loadtest_main(argv: List[str]) -> int:
+    """``setup_automation.py loadtest``: simulate concurrent games against the Firestore emulator"""
+    parser = argparse.ArgumentParser(
+        prog="setup_automation.py loadtest",
+        description="🔥 Load-test Firestore rules and data model with simulated games on the local emulator",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 50 four-player games, 40 moves each
+  python setup_automation.py loadtest
+  
+  # 500 games with fast turns against an emulator that is already running
+  python setup_automation.py loadtest --games 500 --think-time 0.2 --emulator localhost:8080
+        """
+    )
+    parser.add_argument("--games", type=int, default=50, help="Concurrent games (default: 50)")
+    parser.add_argument("--players", type=int, default=4, help="Players per game, 2-4 (default: 4)")
+    parser.add_argument("--moves", type=int, default=40, help="Moves per game (default: 40)")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between moves (default: 1.0)")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="Seconds between listener reads per player (default: 1.0)")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which games start (default: 5)")
+    parser.add_argument("--emulator", metavar="HOST:PORT",
+                        help="Use a running emulator instead of starting one (default: $FIRESTORE_EMULATOR_HOST)")
+    parser.add_argument("--port", type=int, default=8085, help="Port for the emulator started by this command")
+    parser.add_argument("--project-id", default="demo-chaupar",
+                        help="Emulator project; demo-* IDs never touch real resources (default: demo-chaupar)")
+    parser.add_argument("--bypass-rules", action="store_true",
+                        help="Write as the Admin SDK (no rules) and log moves to gameMoves")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+    
+    async def run() -> Optional[Dict]:
+        host = args.emulator or os.environ.get("FIRESTORE_EMULATOR_HOST")
+        process = None
+        if not host:
+            host = f"127.0.0.1:{args.port}"
+            process = await start_firestore_emulator(host, args.project_id)
+            if process is None:
+                return None
+        try:
+            client = FirestoreEmulatorClient(host, args.project_id)
+            await client.clear()
+            test = FirestoreLoadTest(client, games=args.games, players=args.players, moves=args.moves,
+                                     think_time=args.think_time, poll_interval=args.poll_interval,
+                                     ramp_up=args.ramp_up, bypass_rules=args.bypass_rules)
+            print(f"🎲 Simulating {args.games} games x {test.players} players x {args.moves} moves "
+                  f"against {host}{' (rules bypassed)' if args.bypass_rules else ''}...")
+            return await test.run()
+        finally:
+            if process is not None:
+                await stop_process(process)
+                Path("firebase.loadtest.json").unlink()
+                
+    try:
+        results = asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n❌ Load test interrupted")
+        return 1
+    except (OSError, FirestoreRESTError) as e:
+        print(f"\n💥 Load test failed: {e}")
+        return 1
+    if results is None:
+        return 1
+        
+    print(f"\n⏱️ {results['elapsed']:.1f}s, {results['writes']} documents written: "
+          f"{results['writes_per_second']:.1f} writes/s")
+    print(f"{'operation':<10}{'ok':>8}{'errors':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'retries':>9}")
+    for op, row in results["operations"].items():
+        print(f"{op:<10}{row['ok']:>8}{sum(row['errors'].values()):>8}"
+              f"{row['p50_ms']:>8.1f}ms{row['p95_ms']:>8.1f}ms{row['p99_ms']:>8.1f}ms{row['max_ms']:>8.1f}ms"
+              f"{row['retry_rate']:>8.1%}")
+    for op, row in results["operations"].items():
+        for status, count in row["errors"].items():
+            print(f"⚠️ {op}: {count} x {status}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(dict(results, config=vars(args)), f, indent=2)
+        print(f"📄 Results written to {args.json}")
+    return 0
+
+# Index advisor: the queries the app and tooling run vs the composite indexes declared
+INDEXES_FILE = Path("firestore.indexes.json")
+QUERY_SOURCES = ("src/firebase/*.js",)
+_EQUALITY_OPS = ("==", "in", "array-contains", "array-contains-any")
+_REST_OPERATORS = {"==": "EQUAL", "!=": "NOT_EQUAL", "<": "LESS_THAN", "<=": "LESS_THAN_OR_EQUAL",
+                   ">": "GREATER_THAN", ">=": "GREATER_THAN_OR_EQUAL", "in": "IN", "not-in": "NOT_IN",
+                   "array-contains": "ARRAY_CONTAINS", "array-contains-any": "ARRAY_CONTAINS_ANY"}
+_JS_COLLECTION = re.compile(r"""(?:const|let|var)\s+(\w+)\s*=\s*(collection|collectionGroup)\(\s*\w+\s*,\s*['"]([^'"]+)['"]\s*\)""")
+_JS_INLINE_COLLECTION = re.compile(r"""^(collection|collectionGroup)\(\s*\w+\s*,\s*['"]([^'"]+)['"]\s*\)$""")
+_JS_QUERY = re.compile(r"(?<![\w.])query\(")
+_JS_FUNCTION = re.compile(r"(?:export\s+)?(?:const\s+(\w+)\s*=\s*(?:async\s*)?(?:\([^)]*\)|\w+)\s*=>|(?:async\s+)?function\s+(\w+))")
+_JS_CONSTRAINT = re.compile(r"^(where|orderBy|limit|limitToLast)\((.*)\)$", re.S)
+# Placeholder filter values for replaying queries whose values are variables, matching the seeded data
+_SAMPLE_VALUES = {"status": "playing", "mode": "ai", "gameId": "index-game-0", "deleted": True,
+                  "players": {"id": "index-player-0"}}
+_TIMESTAMP_FIELDS = ("createdAt", "updatedAt", "timestamp", "deletedAt")
+
+class QuerySpec:
+    """One Firestore query: collection, filters ``(field, op, value)`` and orderings ``(field, direction)``"""
+    
+    def __init__(self, collection: str, filters: List[tuple] = (), orders: List[tuple] = (),
+                 source: str = "", limit: Optional[int] = None, scope: str = "COLLECTION"):
+        self.collection = collection
+        self.filters = list(filters)
+        self.orders = list(orders)
+        self.source = source
+        self.limit = limit
+        self.scope = scope
+        
+    def describe(self) -> str:
+        parts = [f"{field} {op} …" for field, op, _ in self.filters]
+        parts += [f"order by {field} {direction.lower()[:-6] or 'asc'}" for field, direction in self.orders]
+        return f"{self.collection}: " + (", ".join(parts) or "all documents")
+        
+    def composite_index(self) -> Optional[Dict]:
+        """The ``firestore.indexes.json`` entry this query needs, or None if single-field indexes serve it
+        
+        Equality filters come first, then the inequality field (which
+        Firestore orders by first), then the orderings. Equality-only queries
+        are served by merging single-field indexes, and so is anything on a
+        single field.
+        """
+        equality = [(field, op) for field, op, _ in self.filters if op in _EQUALITY_OPS]
+        inequality = [field for field, op, _ in self.filters if op not in _EQUALITY_OPS]
+        orders = [(field, direction) for field, direction in self.orders if field != "__name__"]
+        if inequality and (not orders or orders[0][0] != inequality[0]):
+            orders.insert(0, (inequality[0], "ASCENDING"))
+        ordered = {field for field, _ in orders}
+        fields = [{"fieldPath": field, "arrayConfig": "CONTAINS"} if op.startswith("array-contains")
+                  else {"fieldPath": field, "order": "ASCENDING"}
+                  for field, op in dict(equality).items() if field not in ordered]
+        fields += [{"fieldPath": field, "order": direction} for field, direction in dict(orders).items()]
+        if not orders or len(fields) < 2:
+            return None
+        return {"collectionGroup": self.collection, "queryScope": self.scope, "fields": fields}
+        
+    def structured_query(self) -> Dict:
+        """REST ``runQuery`` body, with sample values where the source passes variables"""
+        def value(field, op, literal):
+            if literal is not None:
+                sample = literal
+            elif field in _TIMESTAMP_FIELDS:
+                sample = datetime.now(timezone.utc)
+            else:
+                sample = _SAMPLE_VALUES.get(field, "x")
+            return _firestore_value([sample] if op in ("in", "not-in", "array-contains-any") else sample)
+            
+        filters = [{"fieldFilter": {"field": {"fieldPath": field}, "op": _REST_OPERATORS[op],
+                                    "value": value(field, op, literal)}} for field, op, literal in self.filters]
+        query = {"from": [{"collectionId": self.collection, "allDescendants": self.scope == "COLLECTION_GROUP"}]}
+        if len(filters) == 1:
+            query["where"] = filters[0]
+        elif filters:
+            query["where"] = {"compositeFilter": {"op": "AND", "filters": filters}}
+        if self.orders:
+            query["orderBy"] = [{"field": {"fieldPath": field}, "direction": direction} for field, direction in self.orders]
+        query["limit"] = self.limit or 100
+        return {"structuredQuery": query}
+
+# Queries the Python tooling runs (maintain prune/export), which need indexes as much as the app's
+TOOLING_QUERIES = (
+    QuerySpec("gameMoves", orders=[("gameId", "ASCENDING"), ("timestamp", "ASCENDING")],
+              source="setup_automation.py GameExporter._moves"),
+    QuerySpec("gameMoves", [("gameId", "==", None)], [("__name__", "ASCENDING")],
+              source="setup_automation.py FirestorePruner._prune_game"),
+    QuerySpec("games", [("updatedAt", "<", None)], [("updatedAt", "ASCENDING")],
+              source="setup_automation.py FirestorePruner.run"),
+    QuerySpec("games", [("deleted", "==", True)], [("__name__", "ASCENDING")],
+              source="setup_automation.py FirestorePruner.run"),
+)
+
+def _split_js_args(text: str) -> List[str]:
+    """Split a JavaScript argument list on top-level commas"""
+    args, depth, quote_char, current = [], 0, None, []
+    for char in text:
+        if quote_char:
+            quote_char = None if char == quote_char else quote_char
+        elif char in "'\"`":
+            quote_char = char
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif char == "," and depth == 0:
+            args.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if "".join(current).strip():
+        args.append("".join(current).strip())
+    return args
+
+def _js_literal(text: str):
+    """Value of a JavaScript string/number/boolean literal, else None (a variable or expression)"""
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    if text in ("true", "false"):
+        return text == "true"
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+def parse_js_queries(paths: List[Path]) -> List[QuerySpec]:
+    """Find the ``query(...)`` calls in Firebase modular-SDK code
+    
+    Collections are resolved from ``const x = collection(db, 'name')``
+    declarations or inline ``collection(...)``/``collectionGroup(...)``
+    calls; ``where``, ``orderBy`` and ``limit`` constraints with literal
+    field names are picked up, anything else is ignored.
+    """
+    specs = []
+    for path in paths:
+        source = path.read_text()
+        collections = {name: (kind, collection) for name, kind, collection in _JS_COLLECTION.findall(source)}
+        for match in _JS_QUERY.finditer(source):
+            depth, end = 1, match.end()
+            while end < len(source) and depth:
+                depth += {"(": 1, ")": -1}.get(source[end], 0)
+                end += 1
+            args = _split_js_args(source[match.end():end - 1])
+            if not args:
+                continue
+            inline = _JS_INLINE_COLLECTION.match(args[0])
+            kind, collection = (inline.groups() if inline else collections.get(args[0], (None, None)))
+            if collection is None:
+                continue
+            functions = [name_a or name_b for name_a, name_b in _JS_FUNCTION.findall(source[:match.start()])]
+            line = source.count("\n", 0, match.start()) + 1
+            spec = QuerySpec(collection, source=f"{path.as_posix()}:{line} {functions[-1] if functions else ''}".strip(),
+                             scope="COLLECTION_GROUP" if kind == "collectionGroup" else "COLLECTION")
+            for arg in args[1:]:
+                constraint = _JS_CONSTRAINT.match(arg)
+                if not constraint:
+                    continue
+                name, params = constraint.group(1), _split_js_args(constraint.group(2))
+                field = _js_literal(params[0]) if params else None
+                if name == "where" and len(params) == 3 and isinstance(field, str) and _js_literal(params[1]) in _REST_OPERATORS:
+                    spec.filters.append((field, _js_literal(params[1]), _js_literal(params[2])))
+                elif name == "orderBy" and isinstance(field, str):
+                    direction = _js_literal(params[1]) if len(params) > 1 else "asc"
+                    spec.orders.append((field, "DESCENDING" if direction == "desc" else "ASCENDING"))
+                elif name in ("limit", "limitToLast") and isinstance(field, int):
+                    spec.limit = field
+            specs.append(spec)
+    return specs
+
+def _index_fields(index: Dict) -> List[tuple]:
+    return [(field["fieldPath"], field.get("order") or field.get("arrayConfig")) for field in index.get("fields", [])]
+
+def index_serves(declared: Dict, needed: Dict) -> bool:
+    """Whether a declared index serves a needed one: same fields, equality fields in any order"""
+    if (declared.get("collectionGroup"), declared.get("queryScope", "COLLECTION")) != \
+            (needed["collectionGroup"], needed["queryScope"]):
+        return False
+    have, want = _index_fields(declared), _index_fields(needed)
+    if len(have) != len(want):
+        return False
+    # The leading ASCENDING/CONTAINS run can be reordered; what follows must match exactly
+    prefix = 0
+    while prefix < len(want) - 1 and want[prefix][1] in ("ASCENDING", "CONTAINS"):
+        prefix += 1
+    return sorted(have[:prefix]) == sorted(want[:prefix]) and have[prefix:] == want[prefix:]
+
+class IndexAdvisor:
+    """Compares the composite indexes queries need with the ones ``firestore.indexes.json`` declares"""
+    
+    def __init__(self, queries: List[QuerySpec], indexes_file: Path = INDEXES_FILE):
+        self.queries = queries
+        self.indexes_file = indexes_file
+        with open(indexes_file) as f:
+            self.config = json.load(f)
+        self.declared = self.config.get("indexes", [])
+        self.timings: Dict[int, Dict] = {}
+        
+    @classmethod
+    def from_sources(cls, patterns=QUERY_SOURCES, indexes_file: Path = INDEXES_FILE) -> "IndexAdvisor":
+        paths = sorted({path for pattern in patterns for path in Path(".").glob(pattern) if path.is_file()})
+        return cls(parse_js_queries(paths) + list(TOOLING_QUERIES), indexes_file)
+        
+    def analyze(self) -> Dict:
+        """Per query: the index it needs and whether it is declared; plus missing and unused indexes"""
+        queries, missing, used = [], [], set()
+        for number, spec in enumerate(self.queries):
+            needed = spec.composite_index()
+            matches = [i for i, declared in enumerate(self.declared) if needed and index_serves(declared, needed)]
+            used.update(matches)
+            if needed and not matches and not any(index_serves(index, needed) for index in missing):
+                missing.append(needed)
+            queries.append(dict({"source": spec.source, "query": spec.describe(), "index": needed,
+                                 "status": "declared" if matches else "missing" if needed else "not needed"},
+                                **self.timings.get(number, {})))
+        return {"queries": queries, "missing": missing,
+                "unused": [index for i, index in enumerate(self.declared) if i not in used]}
+        
+    def write(self, drop_unused: bool = False) -> Dict:
+        """Rewrite the indexes file: add missing indexes, and drop unused ones only if asked"""
+        report = self.analyze()
+        kept = [index for index in self.declared if not drop_unused or index not in report["unused"]]
+        self.config["indexes"] = kept + report["missing"]
+        self.config.setdefault("fieldOverrides", [])
+        with open(self.indexes_file, "w") as f:
+            json.dump(self.config, f, indent=2)
+            f.write("\n")
+        self.declared = self.config["indexes"]
+        return report
+        
+    async def replay(self, client: FirestoreEmulatorClient, repeat: int = 20) -> None:
+        """Time every query against the emulator (``runQuery`` as the rules-bypassing owner)"""
+        for number, spec in enumerate(self.queries):
+            samples, documents, error = [], 0, None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                try:
+                    rows = await client.request("POST", f"v1/{client.root}:runQuery", "owner", spec.structured_query())
+                except FirestoreRESTError as e:
+                    error = e.status
+                    break
+                samples.append(time.perf_counter() - start)
+                documents = sum(1 for row in rows if "document" in row)
+            self.timings[number] = {"p50_ms": _percentile(samples, 50) * 1000,
+                                    "p95_ms": _percentile(samples, 95) * 1000,
+                                    "documents": documents, "error": error}
+
+async def seed_index_data(client: FirestoreEmulatorClient, games: int = 200, moves_per_game: int = 20) -> int:
+    """Write sample games and gameMoves shaped like gameService.js data, so replayed queries return rows"""
+    statuses = ("waiting", "playing", "finished")
+    writes = []
+    for index in range(games):
+        game_id = f"index-game-{index}"
+        writes.append({
+            "update": {"name": client.name(f"games/{game_id}"), "fields": {
+                k: _firestore_value(v) for k, v in {
+                    "id": game_id, "mode": "ai" if index % 2 else "multiplayer", "status": statuses[index % 3],
+                    "players": [{"id": f"index-player-{index % 25}"}, {"id": f"index-player-{(index + 1) % 25}"}],
+                }.items()}},
+            "updateTransforms": [{"fieldPath": "createdAt", "setToServerValue": "REQUEST_TIME"},
+                                 {"fieldPath": "updatedAt", "setToServerValue": "REQUEST_TIME"}],
+        })
+        for move in range(moves_per_game):
+            writes.append({
+                "update": {"name": client.name(f"gameMoves/{game_id}-{move}"), "fields": {
+                    k: _firestore_value(v) for k, v in {
+                        "gameId": game_id, "playerId": f"index-player-{(index + move) % 25}", "move": move,
+                        "diceValue": 2 + move % 5, "fromPosition": move, "toPosition": move + 2,
+                    }.items()}},
+                "updateTransforms": [{"fieldPath": "timestamp", "setToServerValue": "REQUEST_TIME"}],
+            })
+    await asyncio.gather(*(client.commit("owner", writes[i:i + FirestorePruner.BATCH_SIZE])
+                           for i in range(0, len(writes), FirestorePruner.BATCH_SIZE)))
+    return len(writes)
+
+def print_index_report(report: Dict, log=print) -> None:
+    for query in report["queries"]:
+        icon = {"declared": "✅", "missing": "❌", "not needed": "➖"}[query["status"]]
+        timing = ""
+        if query.get("error"):
+            timing = f" — emulator: {query['error']}"
+        elif "p50_ms" in query:
+            timing = f" — {query['p50_ms']:.1f}ms p50, {query['p95_ms']:.1f}ms p95, {query['documents']} docs"
+        log(f"{icon} {query['query']} ({query['source']}){timing}")
+        if query["status"] != "not needed":
+            log("     index: " + ", ".join(f"{field} {kind.lower()}" for field, kind in _index_fields(query["index"])))
+    for index in report["missing"]:
+        log(f"❌ Missing: {index['collectionGroup']} (" +
+            ", ".join(f"{field} {kind.lower()}" for field, kind in _index_fields(index)) + ")")
+    for index in report["unused"]:
+        log(f"⚠️ Unused: {index.get('collectionGroup')} (" +
+            ", ".join(f"{field} {kind.lower()}" for field, kind in _index_fields(index)) +
+            ") is maintained on every write but no query needs it")
+
+def indexes_main(argv: List[str]) -> int:
+    """``setup_automation.py indexes``: check firestore.indexes.json against the queries in the code"""
+    parser = argparse.ArgumentParser(
+        prog="setup_automation.py indexes",
+        description="🗂️ Compare the composite indexes Chaupar's queries need with firestore.indexes.json",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Needed vs declared indexes, from the query builders in src/firebase/*.js
+  python setup_automation.py indexes
+  
+  # Also time every query on the emulator, with 500 seeded games
+  python setup_automation.py indexes --replay --seed-games 500
+  
+  # Add missing indexes; also drop unused ones
+  python setup_automation.py indexes --write
+  python setup_automation.py indexes --write --drop-unused
+        """
+    )
+    parser.add_argument("--write", action="store_true", help=f"Rewrite {INDEXES_FILE} with the indexes the queries need")
+    parser.add_argument("--drop-unused", action="store_true",
+                        help="With --write, also remove composite indexes no query needs")
+    parser.add_argument("--replay", action="store_true", help="Time each query against the Firestore emulator")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query when replaying (default: 20)")
+    parser.add_argument("--seed-games", type=int, default=200,
+                        help="Sample games (20 moves each) written before replaying, 0 for none (default: 200)")
+    parser.add_argument("--emulator", metavar="HOST:PORT",
+                        help="Use a running emulator instead of starting one (default: $FIRESTORE_EMULATOR_HOST)")
+    parser.add_argument("--port", type=int, default=8086, help="Port for the emulator started by this command")
+    parser.add_argument("--project-id", default="demo-chaupar",
+                        help="Emulator project; demo-* IDs never touch real resources (default: demo-chaupar)")
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+    
+    try:
+        advisor = IndexAdvisor.from_sources()
+    except (OSError, ValueError) as e:
+        print(f"❌ Can't read {INDEXES_FILE}: {e}")
+        return 1
+    print(f"🗂️ {len(advisor.queries)} queries, {len(advisor.declared)} declared composite indexes")
+    
+    async def replay() -> bool:
+        host = args.emulator or os.environ.get("FIRESTORE_EMULATOR_HOST")
+        process = None
+        if not host:
+            host = f"127.0.0.1:{args.port}"
+            process = await start_firestore_emulator(host, args.project_id)
+            if process is None:
+                return False
+        try:
+            client = FirestoreEmulatorClient(host, args.project_id)
+            if args.seed_games:
+                print(f"🌱 Seeded {await seed_index_data(client, args.seed_games)} documents")
+            await advisor.replay(client, args.repeat)
+            return True
+        finally:
+            if process is not None:
+                await stop_process(process)
+                Path("firebase.loadtest.json").unlink()
+                
+    if args.replay:
+        try:
+            if not asyncio.run(replay()):
+                return 1
+        except KeyboardInterrupt:
+            print("\n❌ Replay interrupted")
+            return 1
+        except (OSError, FirestoreRESTError) as e:
+            print(f"\n💥 Replay failed: {e}")
+            return 1
+            
+    report = advisor.write(drop_unused=args.drop_unused) if args.write else advisor.analyze()
+    print_index_report(report)
+    if args.write:
+        print(f"📝 {INDEXES_FILE} rewritten: {len(report['missing'])} added, "
+              f"{len(report['unused']) if args.drop_unused else 0} removed")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+    return 1 if report["missing"] and not args.write else 0
+
+# Rules benchmark: per-rule evaluation cost of firestore.rules on the emulator
+RULES_FILE = Path("firestore.rules")
+RULES_BASELINE = Path(".chaupar_rules_bench.json")
+# Regression thresholds: rules overhead (p50 with rules minus p50 without) may grow by this
+# fraction, and must also grow by more than the noise floor, before the deploy is blocked
+RULES_MAX_REGRESSION = 0.5
+RULES_NOISE_MS = 2.0
+# Emulator the benchmark starts when none is running: a demo-* project never touches real
+# resources, and its own port keeps it clear of the load test's and index replay's emulators
+RULES_BENCH_PROJECT = "demo-chaupar"
+RULES_BENCH_PORT = 8087
+RULES_BENCH_ITERATIONS = 30
+_RULES_MATCH = re.compile(r"match\s+(\S+)\s*\{")
+_RULES_ALLOW = re.compile(r"allow\s+([\w\s,]+?)\s*(?::\s*if\s+|;)")
+_RULES_LOOKUP = re.compile(r"\b(get|exists)\(")
+# REST method of an operation -> the rule methods that cover it
+_RULE_METHODS = {"get": ("read", "get"), "list": ("read", "list"), "create": ("write", "create"),
+                 "update": ("write", "update"), "delete": ("write", "delete")}
+
+class RuleSpec:
+    """One ``allow`` statement: the full match path, its methods, condition and document lookups"""
+    
+    def __init__(self, path: str, methods: List[str], condition: str, line: int):
+        self.path = path
+        self.methods = methods
+        self.condition = condition
+        self.line = line
+        self.lookups = self._lookups(condition)
+        
+    @staticmethod
+    def _lookups(condition: str) -> List[tuple]:
+        """``(function, document path)`` for every ``get()``/``exists()`` call in a condition"""
+        lookups = []
+        for match in _RULES_LOOKUP.finditer(condition):
+            depth, end = 1, match.end()
+            while end < len(condition) and depth:
+                depth += {"(": 1, ")": -1}.get(condition[end], 0)
+                end += 1
+            lookups.append((match.group(1), condition[match.end():end - 1].strip()))
+        return lookups
+        
+    @property
+    def label(self) -> str:
+        return f"{self.path} allow {', '.join(self.methods)} (line {self.line})"
+        
+    def matches(self, document: str) -> bool:
+        """Whether this rule's path matches a document path like ``games/g1/moves/0001``"""
+        pattern = [segment for segment in self.path.split("/") if segment]
+        segments = document.split("/")
+        for index, segment in enumerate(pattern):
+            if segment.endswith("=**}"):
+                return True
+            if index >= len(segments) or not (segment.startswith("{") or segment == segments[index]):
+                return False
+        return len(pattern) == len(segments)
+
+def parse_rules(text: str) -> List[RuleSpec]:
+    """The ``allow`` statements of a rules file, with nested ``match`` paths joined"""
+    text = re.sub(r"//[^\n]*", lambda m: " " * len(m.group(0)), text)
+    rules, stack, depth, position = [], [], 0, 0
+    tokens = re.compile(r"match\s+\S+\s*\{|allow\s|[{}]")
+    while True:
+        token = tokens.search(text, position)
+        if not token:
+            return rules
+        value = token.group(0)
+        if value.startswith("match"):
+            depth += 1
+            stack.append((depth, _RULES_MATCH.match(value).group(1)))
+            position = token.end()
+        elif value == "{":
+            depth += 1
+            position = token.end()
+        elif value == "}":
+            if stack and stack[-1][0] == depth:
+                stack.pop()
+            depth -= 1
+            position = token.end()
+        else:
+            end = text.index(";", token.end())
+            allow = _RULES_ALLOW.match(text, token.start())
+            methods = [method.strip() for method in allow.group(1).split(",")] if allow else []
+            condition = text[allow.end():end].strip() if allow and allow.group(0).rstrip().endswith("if") else "true"
+            # Paths below /databases/{database}/documents are what clients address
+            path = "/".join(segment.strip("/") for _, segment in stack)
+            path = re.sub(r"^databases/\{\w+\}/documents/?", "", path)
+            rules.append(RuleSpec("/" + path, methods, " ".join(condition.split()),
+                                  text.count("\n", 0, token.start()) + 1))
+            position = end + 1
+
+class RulesOperation:
+    """One request in the benchmark corpus, made as ``uid`` and expected to be allowed or denied"""
+    
+    def __init__(self, name: str, method: str, path: str, uid: Optional[str], allowed: bool, fields: Optional[Dict] = None,
+                 transforms: tuple = (), mask: Optional[List[str]] = None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.uid = uid
+        self.allowed = allowed
+        self.fields = fields or {}
+        self.transforms = transforms
+        # Field paths an update touches (default: the top-level fields)
+        self.mask = mask or list(self.fields)
+        
+    def document(self, iteration: int) -> str:
+        return self.path.format(n=f"{iteration:05d}")
+        
+    async def send(self, client: FirestoreEmulatorClient, token: str, iteration: int) -> None:
+        name = client.name(self.document(iteration))
+        if self.method == "get":
+            await client.get(self.document(iteration), token)
+            return
+        write = {"update": {"name": name, "fields": {k: _firestore_value(v) for k, v in self.fields.items()}},
+                 "updateTransforms": [{"fieldPath": field, "setToServerValue": "REQUEST_TIME"} for field in self.transforms]}
+        if self.method == "create":
+            write["currentDocument"] = {"exists": False}
+        else:
+            write["currentDocument"] = {"exists": True}
+            write["updateMask"] = {"fieldPaths": self.mask}
+        await client.commit(token, [write])
+
+class RulesBenchmark:
+    """Times a corpus of allowed and denied operations against firestore.rules on the emulator
+    
+    The corpus follows ``gameService.js``: ``createGame``, ``getGame``,
+    ``joinGame`` and ``makeMove`` (the game update plus its entry in the
+    ``moves`` subcollection), each once as a player and once as a stranger.
+    Every operation runs ``iterations`` times with the user's token and again
+    as the rules-bypassing owner; the difference in p50 latency is the rules
+    overhead. The ``get()``/``exists()`` lookups each rule performs come from
+    the rules source: every distinct document costs a billed read.
+    """
+    
+    HOST, GUEST, STRANGER = "bench-host", "bench-guest", "bench-stranger"
+    GAME = "games/bench-game"
+    
+    def __init__(self, client: FirestoreEmulatorClient, rules_file: Path = RULES_FILE, iterations: int = 30):
+        self.client = client
+        self.rules = parse_rules(rules_file.read_text())
+        self.iterations = iterations
+        
+    def corpus(self) -> List[RulesOperation]:
+        players = {self.HOST: {"name": "Host", "color": 0}, self.GUEST: {"name": "Guest", "color": 1}}
+        move = {"playerId": self.HOST, "diceValue": 10, "fromPosition": 0, "toPosition": 10, "gameId": "bench-game"}
+        return [
+            RulesOperation("createGame", "create", "games/bench-create-{n}", self.HOST, True,
+                           {"status": "waiting", "mode": "multiplayer", "players": {self.HOST: {"name": "Host"}}},
+                           ("createdAt", "updatedAt")),
+            RulesOperation("createGame for someone else", "create", "games/bench-create-other-{n}", self.STRANGER, False,
+                           {"status": "waiting", "players": {self.HOST: {"name": "Host"}}}, ("createdAt", "updatedAt")),
+            RulesOperation("getGame", "get", self.GAME, self.GUEST, True),
+            RulesOperation("getGame as a stranger", "get", self.GAME, self.STRANGER, False),
+            RulesOperation("joinGame", "update", self.GAME, self.GUEST, True,
+                           {"players": {self.GUEST: dict(players[self.GUEST], joined=True)}, "status": "playing"},
+                           ("updatedAt",), mask=[f"players.`{self.GUEST}`", "status"]),
+            RulesOperation("joinGame as a stranger", "update", self.GAME, self.STRANGER, False,
+                           {"players": {self.STRANGER: {"name": "Stranger", "joined": True}}},
+                           ("updatedAt",), mask=[f"players.`{self.STRANGER}`"]),
+            RulesOperation("makeMove", "update", self.GAME, self.HOST, True,
+                           {"currentPlayer": 1, "lastMove": move}, ("updatedAt",)),
+            RulesOperation("makeMove: log the move", "create", self.GAME + "/moves/{n}", self.HOST, True, move,
+                           ("timestamp",)),
+            RulesOperation("makeMove: log as a stranger", "create", self.GAME + "/moves/stranger-{n}", self.STRANGER,
+                           False, dict(move, playerId=self.STRANGER), ("timestamp",)),
+            RulesOperation("read the move log", "get", self.GAME + "/moves/00000", self.GUEST, True),
+        ]
+        
+    def rules_for(self, operation: RulesOperation) -> List[RuleSpec]:
+        methods = _RULE_METHODS[operation.method]
+        return [rule for rule in self.rules
+                if rule.matches(operation.document(0)) and any(method in rule.methods for method in methods)]
+        
+    async def _setup(self) -> None:
+        players = {self.HOST: {"name": "Host", "color": 0}, self.GUEST: {"name": "Guest", "color": 1}}
+        for path, fields, transforms in (
+            (self.GAME, {"status": "waiting", "mode": "multiplayer", "players": players}, ("createdAt", "updatedAt")),
+            (self.GAME + "/moves/00000", {"playerId": self.HOST, "diceValue": 2}, ("timestamp",)),
+        ):
+            await self.client.commit("owner", [{
+                "update": {"name": self.client.name(path), "fields": {k: _firestore_value(v) for k, v in fields.items()}},
+                "updateTransforms": [{"fieldPath": field, "setToServerValue": "REQUEST_TIME"} for field in transforms],
+            }])
+            
+    async def _time(self, operation: RulesOperation, token: str, offset: int):
+        samples, outcomes = [], {}
+        for iteration in range(self.iterations):
+            start = time.perf_counter()
+            try:
+                await operation.send(self.client, token, offset + iteration)
+                outcome = "allowed"
+            except FirestoreRESTError as e:
+                outcome = "denied" if e.status == "PERMISSION_DENIED" else e.status
+            samples.append(time.perf_counter() - start)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        return samples, outcomes
+        
+    async def run(self) -> Dict:
+        await self._setup()
+        results = {}
+        for operation in self.corpus():
+            rules = self.rules_for(operation)
+            lookups = [lookup for rule in rules for lookup in rule.lookups]
+            samples, outcomes = await self._time(operation, self.client.token(operation.uid), 0)
+            # The owner writes its own documents so creates don't collide
+            owner_samples, _ = await self._time(operation, "owner", self.iterations)
+            expected = "allowed" if operation.allowed else "denied"
+            results[operation.name] = {
+                "method": operation.method, "path": operation.path, "expected": expected, "outcomes": outcomes,
+                "rules": [rule.label for rule in rules],
+                "lookups": len(lookups), "lookup_documents": len({" ".join(target.split()) for _, target in lookups}),
+                "p50_ms": _percentile(samples, 50) * 1000, "p95_ms": _percentile(samples, 95) * 1000,
+                "owner_p50_ms": _percentile(owner_samples, 50) * 1000,
+                "overhead_ms": (_percentile(samples, 50) - _percentile(owner_samples, 50)) * 1000,
+            }
+        return results
+
+def rules_digest(rules_file: Path = RULES_FILE) -> str:
+    return hashlib.sha256(rules_file.read_bytes()).hexdigest()
+
+def load_rules_baseline(path: Path = RULES_BASELINE) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_rules_baseline(results: Dict, rules_file: Path = RULES_FILE, path: Path = RULES_BASELINE) -> None:
+    with open(path, "w") as f:
+        json.dump({"rules_sha256": rules_digest(rules_file), "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                   "operations": results}, f, indent=2)
+
+def rules_regressions(results: Dict, baseline: Optional[Dict], max_regression: float = RULES_MAX_REGRESSION,
+                      noise_ms: float = RULES_NOISE_MS) -> List[str]:
+    """Why this run should block the deploy: wrong outcomes, more lookups, or slower rules than the baseline"""
+    problems = []
+    previous = (baseline or {}).get("operations", {})
+    for name, row in results.items():
+        if row["outcomes"] != {row["expected"]: sum(row["outcomes"].values())}:
+            problems.append(f"{name}: expected {row['expected']}, got {row['outcomes']}")
+        before = previous.get(name)
+        if not before:
+            continue
+        if row["lookup_documents"] > before["lookup_documents"]:
+            problems.append(f"{name}: {row['lookup_documents']} documents looked up per request "
+                            f"(was {before['lookup_documents']}), each a billed read")
+        overhead, base = row["overhead_ms"], max(0.0, before["overhead_ms"])
+        if overhead - base > noise_ms and overhead > base * (1 + max_regression):
+            problems.append(f"{name}: rules overhead {overhead:.1f}ms (was {base:.1f}ms)")
+    return problems
+
+def print_rules_results(results: Dict, log=print) -> None:
+    log(f"{'operation':<30}{'expect':>8}{'p50':>10}{'p95':>10}{'no rules':>10}{'overhead':>10}{'lookups':>9}")
+    for name, row in results.items():
+        log(f"{name:<30}{row['expected']:>8}{row['p50_ms']:>8.1f}ms{row['p95_ms']:>8.1f}ms"
+            f"{row['owner_p50_ms']:>8.1f}ms{row['overhead_ms']:>8.1f}ms{row['lookup_documents']:>9}")
+
+async def run_rules_benchmark(host: Optional[str], project_id: str, iterations: int, port: int, log=print) -> Optional[Dict]:
+    """Benchmark firestore.rules on ``host``, or on an emulator started for the run; None if none could start"""
+    process = None
+    if not host:
+        host = f"127.0.0.1:{port}"
+        process = await start_firestore_emulator(host, project_id, log=log)
+        if process is None:
+            return None
+    try:
+        client = FirestoreEmulatorClient(host, project_id)
+        return await RulesBenchmark(client, iterations=iterations).run()
+    finally:
+        if process is not None:
+            await stop_process(process)
+            Path("firebase.loadtest.json").unlink()
+
+def rules_bench_main(argv: List[str]) -> int:
+    """``setup_automation.py rules-bench``: benchmark firestore.rules on the emulator"""
+    parser = argparse.ArgumentParser(
+        prog="setup_automation.py rules-bench",
+        description="🛡️ Measure what firestore.rules costs per request and catch regressions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  # Benchmark and compare with the last accepted run ({RULES_BASELINE})
+  python setup_automation.py rules-bench
+  
+  # Accept the current rules as the new baseline
+  python setup_automation.py rules-bench --update-baseline
+  
+  # Against an emulator that is already running, with more samples
+  python setup_automation.py rules-bench --emulator localhost:8080 --iterations 100
+        """
+    )
+    parser.add_argument("--iterations", type=int, default=RULES_BENCH_ITERATIONS,
+                        help=f"Requests per operation and token (default: {RULES_BENCH_ITERATIONS})")
+    parser.add_argument("--baseline", default=str(RULES_BASELINE), help=f"Baseline file (default: {RULES_BASELINE})")
+    parser.add_argument("--update-baseline", action="store_true", help="Save this run as the baseline even if it regressed")
+    parser.add_argument("--max-regression", type=float, default=RULES_MAX_REGRESSION,
+                        help=f"Allowed growth of the rules overhead, as a fraction (default: {RULES_MAX_REGRESSION})")
+    parser.add_argument("--emulator", metavar="HOST:PORT",
+                        help="Use a running emulator instead of starting one (default: $FIRESTORE_EMULATOR_HOST)")
+    parser.add_argument("--port", type=int, default=RULES_BENCH_PORT,
+                        help=f"Port for the emulator started by this command (default: {RULES_BENCH_PORT})")
+    parser.add_argument("--project-id", default=RULES_BENCH_PROJECT,
+                        help=f"Emulator project; demo-* IDs never touch real resources (default: {RULES_BENCH_PROJECT})")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+    
+    try:
+        results = asyncio.run(run_rules_benchmark(args.emulator or os.environ.get("FIRESTORE_EMULATOR_HOST"),
+                                                  args.project_id, args.iterations, args.port))
+    except KeyboardInterrupt:
+        print("\n❌ Rules benchmark interrupted")
+        return 1
+    except (OSError, FirestoreRESTError) as e:
+        print(f"\n💥 Rules benchmark failed: {e}")
+        return 1
+    if results is None:
+        return 1
+        
+    print_rules_results(results)
+    baseline_path = Path(args.baseline)
+    problems = rules_regressions(results, load_rules_baseline(baseline_path), args.max_regression)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"operations": results, "problems": problems}, f, indent=2)
+        print(f"📄 Results written to {args.json}")
+    if not problems or args.update_baseline:
+        save_rules_baseline(results, path=baseline_path)
+        print(f"📝 Baseline saved to {baseline_path}")
+    if problems:
+        return 1
+    print("✅ No rules regressions")
+    return 0
+
+class BundleAnalyzer:
+    """Sizes of the files Vite wrote to dist/: raw, gzip and brotli, per chunk
+    
+    Chunks are keyed by their path without the content hash
+    (``assets/vendor-B1x9aQ2c.js`` -> ``assets/vendor.js``) so builds can be
+    compared. Compressible files get ``.gz`` and ``.br`` siblings at the
+    highest compression levels, since that happens once per build; a sibling
+    newer than its file is reused. Brotli needs ``pip install brotli``;
+    without it only gzip is measured.
+    """
+    
+    def __init__(self, dist_dir: Path, compress: bool = True):
+        self.dist_dir = Path(dist_dir)
+        self.compress = compress
+        self.brotli = _installed(("brotli",))
+        
+    @staticmethod
+    def chunk_name(relative: str) -> str:
+        return _HASHED_ASSET.sub("", relative)
+        
+    @staticmethod
+    def is_hashed(relative: str) -> bool:
+        return relative.startswith(VITE_ASSETS_DIR + "/") and bool(_HASHED_ASSET.search(relative))
+        
+    def files(self) -> List[Path]:
+        """What hosting serves: no dotfiles (the build stamp) and no precompressed siblings"""
+        return [path for path in sorted(self.dist_dir.rglob("*"))
+                if path.is_file() and path.suffix not in PRECOMPRESSED_SUFFIXES
+                and not any(part.startswith(".") for part in path.relative_to(self.dist_dir).parts)]
+        
+    def _compressed_size(self, path: Path, suffix: str, compress) -> int:
+        sibling = path.with_name(path.name + suffix)
+        try:
+            if sibling.stat().st_mtime >= path.stat().st_mtime:
+                return sibling.stat().st_size
+        except OSError:
+            pass
+        data = path.read_bytes()
+        packed = compress(data)
+        if self.compress and len(packed) < len(data):
+            # A new file, never an edit: dist/ may be hardlinked into the build cache
+            staging = sibling.with_name(f".{sibling.name}.tmp-{os.getpid()}")
+            staging.write_bytes(packed)
+            os.replace(staging, sibling)
+        return len(packed)
+        
+    def measure(self) -> Dict[str, Dict]:
+        """Chunk name -> files, whether they are fingerprinted, and raw/gzip/brotli bytes
+        
+        gzip and brotli are None for files that aren't compressible (they are
+        sent as is) and brotli is None without the brotli module.
+        """
+        if self.brotli:
+            import brotli
+        chunks: Dict[str, Dict] = {}
+        for path in self.files():
+            relative = path.relative_to(self.dist_dir).as_posix()
+            row = chunks.setdefault(self.chunk_name(relative), {"files": [], "hashed": self.is_hashed(relative),
+                                                                 "raw": 0, "gzip": None, "brotli": None})
+            row["files"].append(relative)
+            row["raw"] += path.stat().st_size
+            if path.suffix not in COMPRESSIBLE_SUFFIXES:
+                continue
+            row["gzip"] = (row["gzip"] or 0) + self._compressed_size(
+                path, ".gz", lambda data: gzip.compress(data, 9, mtime=0))
+            if self.brotli:
+                row["brotli"] = (row["brotli"] or 0) + self._compressed_size(
+                    path, ".br", lambda data: brotli.compress(data, quality=11))
+        return chunks
+
+def _transfer_size(row: Dict, measure: str) -> Optional[int]:
+    """Bytes sent for ``row`` with the given encoding; files that aren't compressed go as is"""
+    if measure == "raw" or row.get(measure) is not None:
+        return row.get(measure)
+    return None if measure == "brotli" and row.get("gzip") is not None else row["raw"]
+
+def bundle_totals(chunks: Dict[str, Dict]) -> Dict[str, Optional[int]]:
+    totals = {}
+    for measure in ("raw", "gzip", "brotli"):
+        sizes = [_transfer_size(row, measure) for row in chunks.values()]
+        totals[measure] = None if None in sizes else sum(sizes)
+    return totals
+
+def load_bundle_budget(path: Path = BUNDLE_BUDGET_FILE) -> Dict:
+    """The budget file, or no limits when there is none"""
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def load_bundle_baseline(path: Path = BUNDLE_BASELINE) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_bundle_baseline(chunks: Dict[str, Dict], path: Path = BUNDLE_BASELINE) -> None:
+    # Fleet runs check every project's build at once
+    staging = path.with_name(f"{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    with open(staging, "w") as f:
+        json.dump({"recorded_at": datetime.now().isoformat(timespec="seconds"), "totals": bundle_totals(chunks),
+                   "chunks": chunks}, f, indent=2)
+    os.replace(staging, path)
+
+def bundle_regressions(chunks: Dict[str, Dict], budget: Dict, baseline: Optional[Dict],
+                       noise_bytes: int = BUNDLE_NOISE_BYTES) -> List[str]:
+    """Why this build should fail: a chunk or the total over budget, or grown since the baseline
+    
+    Budgets map chunk names or glob patterns (every match applies) to
+    ``raw_kib``/``gzip_kib``/``brotli_kib`` limits; ``total`` limits the whole
+    of dist/. Growth is measured on gzip sizes and allowed up to
+    ``max_growth`` (a fraction) or ``noise_bytes``, whichever is larger.
+    """
+    problems = []
+    
+    def check(name: str, row: Dict, limits: Dict):
+        for key, limit in limits.items():
+            measure = key[:-len("_kib")]
+            size = _transfer_size(row, measure)
+            if size is not None and size > limit * 1024:
+                problems.append(f"{name}: {size / 1024:.1f} KiB {measure}, budget {limit} KiB")
+                
+    for name, row in chunks.items():
+        for pattern, limits in budget.get("chunks", {}).items():
+            if fnmatch.fnmatchcase(name, pattern):
+                check(name, row, limits)
+    totals = bundle_totals(chunks)
+    check("total", totals, budget.get("total", {}))
+    
+    if baseline:
+        max_growth = budget.get("max_growth", BUNDLE_MAX_GROWTH)
+        before = dict(baseline.get("chunks", {}), total=baseline.get("totals", {}))
+        for name, row in dict(chunks, total=totals).items():
+            if name not in before:
+                continue
+            now, was = _transfer_size(row, "gzip"), _transfer_size(before[name], "gzip")
+            if now is not None and was is not None and now - was > noise_bytes and now > was * (1 + max_growth):
+                problems.append(f"{name}: {now / 1024:.1f} KiB gzip, was {was / 1024:.1f} KiB "
+                                f"(+{(now - was) / max(was, 1):.0%})")
+    return problems
+
+def print_bundle_sizes(chunks: Dict[str, Dict], log=print) -> None:
+    def kib(size: Optional[int]) -> str:
+        return "-" if size is None else f"{size / 1024:.1f}"
+    log(f"{'chunk':<36}{'raw KiB':>10}{'gzip KiB':>10}{'brotli KiB':>12}")
+    for name, row in sorted(chunks.items(), key=lambda item: -item[1]["raw"]):
+        log(f"{name:<36}{kib(row['raw']):>10}{kib(row['gzip']):>10}{kib(row['brotli']):>12}")
+    totals = bundle_totals(chunks)
+    log(f"{'total':<36}{kib(totals['raw']):>10}{kib(totals['gzip']):>10}{kib(totals['brotli']):>12}")
+
+def load_vite_manifest(dist_dir: Path) -> Optional[Dict]:
+    """Vite's build manifest (``build.manifest`` in vite.config.js), or None for builds without one"""
+    try:
+        with open(Path(dist_dir) / VITE_MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def entry_preloads(manifest: Dict) -> List[str]:
+    """``Link`` values for what index.html loads before the game starts
+    
+    That is the entry chunks, the chunks they import statically (vendor,
+    firebase, ...) and their CSS; dynamic imports load later and aren't
+    preloaded. ``crossorigin`` matches the attribute Vite puts on its script
+    and stylesheet tags, otherwise the browser fetches everything twice.
+    """
+    scripts: List[str] = []
+    styles: List[str] = []
+    seen = set()
+    
+    def visit(key: str):
+        if key in seen or key not in manifest:
+            return
+        seen.add(key)
+        chunk = manifest[key]
+        if chunk["file"].endswith((".js", ".mjs")):
+            scripts.append(chunk["file"])
+        styles.extend(style for style in chunk.get("css", []) if style not in styles)
+        for imported in chunk.get("imports", []):
+            visit(imported)
+            
+    for key, chunk in manifest.items():
+        if chunk.get("isEntry"):
+            visit(key)
+    return ([f"</{file}>; rel=modulepreload; crossorigin" for file in scripts]
+            + [f"</{file}>; rel=preload; as=style; crossorigin" for file in styles])
+
+def hosting_headers(dist_dir: Path) -> List[Dict]:
+    """firebase.json header rules for the build in ``dist_dir``
+    
+    Fingerprinted files (those listed in Vite's manifest, or named like them
+    in ``assets/`` for builds without one) are cached for a year as
+    immutable: one rule per directory that holds nothing else, one per file
+    elsewhere. HTML, including the routes rewritten to index.html, is
+    revalidated so a deploy reaches players on their next visit, and carries
+    ``Link`` preload hints for the entry chunks so the browser fetches them
+    while the page is still downloading. Without a build only the default
+    ``assets/`` rule is written.
+    """
+    manifest = load_vite_manifest(dist_dir)
+    files = [path.relative_to(dist_dir).as_posix() for path in BundleAnalyzer(dist_dir).files()] \
+        if Path(dist_dir).is_dir() else []
+    if manifest:
+        fingerprinted = {file for chunk in manifest.values()
+                         for file in [chunk["file"]] + chunk.get("css", []) + chunk.get("assets", [])}
+    else:
+        fingerprinted = {file for file in files if BundleAnalyzer.is_hashed(file)}
+        
+    by_directory: Dict[str, List[str]] = {}
+    for file in files:
+        by_directory.setdefault(file.rpartition("/")[0], []).append(file)
+    immutable = []
+    for directory, names in sorted(by_directory.items()):
+        if directory and all(name in fingerprinted for name in names):
+            immutable.append(f"/{directory}/**")
+        else:
+            immutable += [f"/{name}" for name in names if name in fingerprinted]
+    if not files:
+        immutable = [f"/{VITE_ASSETS_DIR}/**"]
+        
+    html_headers = [{"key": "Cache-Control", "value": REVALIDATE_CACHE}]
+    preloads = entry_preloads(manifest) if manifest else []
+    if preloads:
+        html_headers.append({"key": "Link", "value": ", ".join(preloads)})
+    return ([{"source": source, "headers": [{"key": "Cache-Control", "value": IMMUTABLE_CACHE}]}
+             for source in immutable]
+            + [{"source": source, "headers": html_headers} for source in HTML_ROUTES])
+
+def _generated_header_rule(rule: Dict) -> bool:
+    """Whether a firebase.json header rule is one this tool wrote (or the old one-year rule)"""
+    if rule.get("source") in _LEGACY_HEADER_SOURCES:
+        return True
+    values = {header.get("key"): header.get("value") for header in rule.get("headers", [])}
+    return values.get("Cache-Control") in (IMMUTABLE_CACHE, REVALIDATE_CACHE) and set(values) <= {"Cache-Control", "Link"}
+
+def merge_hosting_config(config: Dict, rules: List[Dict]) -> Dict:
+    """Add the hosting defaults and replace the generated header rules, keeping everything else"""
+    hosting = config.setdefault("hosting", {})
+    if not isinstance(hosting, dict):
+        raise ValueError("firebase.json configures several hosting sites; add the headers by hand")
+    for key, value in HOSTING_DEFAULTS.items():
+        hosting.setdefault(key, json.loads(json.dumps(value)))
+    # Firebase Hosting compresses responses itself; the .gz/.br siblings are for other static servers
+    hosting["ignore"] += [pattern for pattern in HOSTING_DEFAULTS["ignore"] if pattern not in hosting["ignore"]]
+    hosting["headers"] = [rule for rule in hosting.get("headers", []) if not _generated_header_rule(rule)] + rules
+    return config
+
+def update_hosting_config(rules: List[Dict], config_path: Path = Path("firebase.json")) -> bool:
+    """Merge the header rules into ``config_path``, creating it if needed; True if it changed"""
+    config = {}
+    if config_path.exists():
+        with open(config_path) as f:
+            config = json.load(f)
+    before = json.dumps(config, sort_keys=True) if config_path.exists() else None
+    merge_hosting_config(config, rules)
+    if json.dumps(config, sort_keys=True) == before:
+        return False
+    staging = config_path.with_name(f".{config_path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    with open(staging, "w") as f:
+        json.dump(config, f, indent=2)
+        f.write("\n")
+    os.replace(staging, config_path)
+    return True
+
+def bundle_main(argv: List[str]) -> int:
+    """``setup_automation.py bundle``: check the size of the build against the budget"""
+    parser = argparse.ArgumentParser(
+        prog="setup_automation.py bundle",
+        description="📦 Report raw, gzip and brotli sizes of the build and enforce the bundle budget",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  # After npm run build: sizes, budget ({BUNDLE_BUDGET_FILE}) and growth since the last accepted build
+  python setup_automation.py bundle
+  
+  # Accept the current sizes as the new baseline
+  python setup_automation.py bundle --update-baseline
+  
+  # Also write the cache and preload headers for the build into firebase.json
+  python setup_automation.py bundle --headers
+        """
+    )
+    parser.add_argument("--dist", default="dist", help="Build output directory (default: dist)")
+    parser.add_argument("--budget", default=str(BUNDLE_BUDGET_FILE), help=f"Budget file (default: {BUNDLE_BUDGET_FILE})")
+    parser.add_argument("--baseline", default=str(BUNDLE_BASELINE), help=f"Baseline file (default: {BUNDLE_BASELINE})")
+    parser.add_argument("--update-baseline", action="store_true", help="Save these sizes as the baseline even if they regressed")
+    parser.add_argument("--no-compress", action="store_true", help="Measure only; don't write .gz/.br siblings")
+    parser.add_argument("--headers", action="store_true", help="Merge the cache header rules into firebase.json")
+    parser.add_argument("--json", metavar="PATH", help="Write the sizes as JSON")
+    args = parser.parse_args(argv)
+    
+    dist_dir = Path(args.dist)
+    if not (dist_dir / "index.html").is_file():
+        print(f"❌ No build in {dist_dir}/; run: npm run build")
+        return 1
+    try:
+        budget = load_bundle_budget(Path(args.budget))
+        analyzer = BundleAnalyzer(dist_dir, compress=not args.no_compress)
+        chunks = analyzer.measure()
+    except (OSError, ValueError) as e:
+        print(f"💥 Bundle check failed: {e}")
+        return 1
+    if not analyzer.brotli:
+        print("⚠️  brotli not available, measuring gzip only. Install with: pip install brotli")
+        
+    print_bundle_sizes(chunks)
+    baseline_path = Path(args.baseline)
+    problems = bundle_regressions(chunks, budget, load_bundle_baseline(baseline_path))
+    for problem in problems:
+        print(f"❌ {problem}")
+    if args.headers and update_hosting_config(hosting_headers(dist_dir)):
+        print("📝 Cache and preload headers merged into firebase.json")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"chunks": chunks, "totals": bundle_totals(chunks), "problems": problems}, f, indent=2)
+        print(f"📄 Results written to {args.json}")
+    if not problems or args.update_baseline:
+        save_bundle_baseline(chunks, baseline_path)
+        print(f"📝 Baseline saved to {baseline_path}")
+    if problems:
+        return 1
+    print("✅ Bundle within budget")
+    return 0
+
+def ai_proxy_main(argv: List[str]) -> int:
+    """``setup_automation.py ai-proxy``: serve the caching AI gateway in front of Ollama"""
+    parser = argparse.ArgumentParser(
+        prog="setup_automation.py ai-proxy",
+        description="🧠 Cache, merge and queue AI move requests between the frontend and Ollama",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  # Proxy on :{AI_PROXY_PORT} with a persistent cache; point VITE_OLLAMA_URL at it
+  python setup_automation.py ai-proxy
+  
+  # In-memory cache of 2000 positions for an hour
+  python setup_automation.py ai-proxy --cache memory --max-entries 2000 --ttl 3600
+  
+  # A bigger inference box: 4 model calls at once, shed load beyond 200 waiting requests
+  python setup_automation.py ai-proxy --concurrency 4 --max-queue 200
+  
+  # Hit rate, latency saved, queue depth and queue wait
+  curl http://localhost:{AI_PROXY_PORT}/_proxy/stats
+        """
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=AI_PROXY_PORT, help=f"Port to listen on (default: {AI_PROXY_PORT})")
+    parser.add_argument("--upstream", default=ChauparSetupAutomation.OLLAMA_URL,
+                        help=f"Ollama URL (default: {ChauparSetupAutomation.OLLAMA_URL})")
+    parser.add_argument("--cache", choices=["memory", "sqlite"], default="sqlite",
+                        help="Where cached responses live (default: sqlite)")
+    parser.add_argument("--cache-path", help=f"SQLite file (default: {AI_CACHE_DB})")
+    parser.add_argument("--max-entries", type=int, default=AI_CACHE_MAX_ENTRIES,
+                        help=f"Cached positions before the least recently used are evicted (default: {AI_CACHE_MAX_ENTRIES})")
+    parser.add_argument("--ttl", type=float, default=AI_CACHE_TTL,
+                        help=f"Seconds a cached response stays valid (default: {AI_CACHE_TTL})")
+    parser.add_argument("--allow-origin", default="*", help="Access-Control-Allow-Origin for the browser (default: *)")
+    parser.add_argument("--concurrency", type=int, default=AI_GATEWAY_CONCURRENCY,
+                        help=f"Model calls sent to Ollama at once (default: {AI_GATEWAY_CONCURRENCY}; "
+                             "match OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--max-queue", type=int, default=AI_GATEWAY_MAX_QUEUE,
+                        help=f"Requests allowed to wait before new ones get a 503 (default: {AI_GATEWAY_MAX_QUEUE})")
+    parser.add_argument("--max-queue-per-game", type=int, default=AI_GATEWAY_MAX_QUEUE_PER_GAME,
+                        help=f"Waiting requests per game before it gets a 429 (default: {AI_GATEWAY_MAX_QUEUE_PER_GAME})")
+    parser.add_argument("--queue-timeout", type=float, default=AI_GATEWAY_QUEUE_TIMEOUT,
+                        help=f"Seconds a request may wait for a model slot (default: {AI_GATEWAY_QUEUE_TIMEOUT:g})")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    
+    from ai_gateway import AIProxy, FairQueue, make_response_cache
+    cache = make_response_cache(args.cache, args.cache_path, args.max_entries, args.ttl)
+    queue = FairQueue(args.concurrency, args.max_queue, args.max_queue_per_game, args.queue_timeout)
+    proxy = AIProxy(args.upstream, cache, args.allow_origin, queue)
+    
+    async def run():
+        server = await proxy.serve(args.host, args.port)
+        print(f"🧠 AI gateway on http://{args.host}:{args.port} -> {args.upstream} ({cache.kind} cache, "
+              f"{args.max_entries} entries, TTL {args.ttl:.0f}s; {args.concurrency} model calls at once, "
+              f"up to {args.max_queue} queued)", flush=True)
+        async with server:
+            await server.serve_forever()
+            
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"❌ AI gateway failed to start: {e}")
+        return 1
+    finally:
+        summary, gateway = proxy.stats.summary(), queue.summary()
+        print(f"\n🧠 {summary['hits']} hits, {summary['misses']} misses ({summary['hit_rate']:.0%} hit rate), "
+              f"{summary['coalesced']} merged, {summary['latency_saved_seconds']:.1f}s of model time saved")
+        print(f"🚦 Queue depth peaked at {gateway['max_queue_depth']}, p95 wait "
+              f"{gateway['queue_wait']['p95_ms']:.0f}ms; {gateway['rejected']} refused, {gateway['timed_out']} timed out")
+        cache.close()
+    return 0
+
+# Subcommands with their own argument parsers; plain flags run the setup
+SUBCOMMANDS = {"maintain": maintain_main, "loadtest": loadtest_main, "indexes": indexes_main,
+               "rules-bench": rules_bench_main, "bundle": bundle_main, "ai-proxy": ai_proxy_main}
+
+def setup_settings(args) -> Dict:
+    """ChauparSetupAutomation attributes set from the command line, for single and fleet runs alike"""
+    return {
+        "OLLAMA_MODEL": args.ollama_model,
+        "ollama_prompts_file": Path(args.ollama_prompts) if args.ollama_prompts else None,
+        "ai_proxy": args.ai_proxy,
+        "ai_cache": args.ai_cache,
+        "ai_concurrency": args.ai_concurrency,
+        "fix_indexes": args.fix_indexes,
+        "drop_unused_indexes": args.drop_unused_indexes,
+        "skip_rules_benchmark": args.skip_rules_benchmark,
+    }
+
 def main():
+    if sys.argv[1:2] and sys.argv[1] in SUBCOMMANDS:
+        sys.exit(SUBCOMMANDS[sys.argv[1]](sys.argv[2:]))
+        
     parser = argparse.ArgumentParser(
         description="🎲 Chaupar Game Setup Automation",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -931,6 +4414,28 @@ Examples:
   
   # Update existing project
   python setup_automation.py --project-id chaupar-game-123 --project-name "Updated Name"
+  
+  # Set up staging and tenant projects from a manifest, 3 at a time
+  python setup_automation.py --manifest projects.json --max-parallel 3
+  
+  # Database maintenance (see: python setup_automation.py maintain --help)
+  python setup_automation.py maintain prune --dry-run
+  
+  # Load-test rules and data model on the Firestore emulator
+  python setup_automation.py loadtest --games 100
+  
+  # Check firestore.indexes.json against the queries (see: python setup_automation.py indexes --help)
+  python setup_automation.py --fix-indexes
+  
+  # Bundle sizes against bundle-budget.json (see: python setup_automation.py bundle --help)
+  python setup_automation.py bundle
+  
+  # Benchmark firestore.rules before they are deployed (see: python setup_automation.py rules-bench --help)
+  python setup_automation.py rules-bench
+  
+  # AI gateway in front of Ollama (see: python setup_automation.py ai-proxy --help)
+  python setup_automation.py --ai-proxy
+  python setup_automation.py --ai-proxy --ai-concurrency 4
         """
     )
     
@@ -943,6 +4448,83 @@ Examples:
         default="Chaupar",
         help="Project display name (default: 'Chaupar')"
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=DEFAULT_JOBS,
+        metavar="N",
+        help=f"Number of independent setup steps to run in parallel (default: {DEFAULT_JOBS})"
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="PATH",
+        help="Set up every project listed in a JSON/YAML manifest concurrently (fleet mode)"
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        metavar="N",
+        help=f"Projects set up at the same time in fleet mode (default: manifest or {DEFAULT_FLEET_PARALLEL})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore step fingerprints in .chaupar_cache.json and rerun every step"
+    )
+    parser.add_argument(
+        "--trace",
+        default="setup_trace.json",
+        metavar="PATH",
+        help="Where to write per-step and per-command timings (default: setup_trace.json)"
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=["json", "chrome"],
+        default="json",
+        help="Trace file format; 'chrome' opens in chrome://tracing, Perfetto or speedscope"
+    )
+    parser.add_argument(
+        "--ollama-model",
+        default=ChauparSetupAutomation.OLLAMA_MODEL,
+        help=f"Model to preload and time in the Ollama warm-up (default: {ChauparSetupAutomation.OLLAMA_MODEL})"
+    )
+    parser.add_argument(
+        "--ollama-prompts",
+        metavar="PATH",
+        help="JSON list of prompts (or {\"prompt\", \"skill\"} objects) for the Ollama warm-up"
+    )
+    parser.add_argument(
+        "--fix-indexes",
+        action="store_true",
+        help="Add the indexes the queries need to firestore.indexes.json before it is deployed"
+    )
+    parser.add_argument(
+        "--drop-unused-indexes",
+        action="store_true",
+        help="With --fix-indexes, also remove composite indexes no query needs (they are only reported otherwise)"
+    )
+    parser.add_argument(
+        "--skip-rules-benchmark",
+        action="store_true",
+        help="Deploy firestore.rules without benchmarking them on the emulator first"
+    )
+    parser.add_argument(
+        "--ai-proxy",
+        action="store_true",
+        help=f"Start the AI gateway on port {AI_PROXY_PORT} after Ollama and point VITE_OLLAMA_URL at it"
+    )
+    parser.add_argument(
+        "--ai-cache",
+        choices=["memory", "sqlite"],
+        default="sqlite",
+        help="Where the AI gateway keeps cached responses (default: sqlite)"
+    )
+    parser.add_argument(
+        "--ai-concurrency",
+        type=int,
+        default=AI_GATEWAY_CONCURRENCY,
+        help=f"Model calls the AI gateway sends to Ollama at once (default: {AI_GATEWAY_CONCURRENCY})"
+    )
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -958,6 +4540,25 @@ Examples:
     print("🎲 Chaupar Game Setup Automation")
     print("=" * 50)
     
+    settings = setup_settings(args)
+    if args.manifest:
+        try:
+            manifest = load_manifest(args.manifest)
+            success = asyncio.run(run_fleet(manifest, jobs=args.jobs, max_parallel=args.max_parallel,
+                                            use_cache=not args.no_cache, trace_file=args.trace,
+                                            trace_format=args.trace_format, settings=settings))
+        except KeyboardInterrupt:
+            print("\n❌ Setup interrupted by user")
+            sys.exit(1)
+        except (OSError, ValueError) as e:
+            print(f"\n💥 Fleet setup failed: {e}")
+            sys.exit(1)
+        if not success:
+            print("\n⚠️ Some projects completed with issues; check their setup reports")
+            sys.exit(1)
+        print("\n🎉 All projects set up successfully!")
+        return
+    
     if not args.project_id:
         print("🆔 No project ID provided - will create new Firebase project automatically")
         print(f"📝 Project Name: {args.project_name}")
@@ -967,10 +4568,15 @@ Examples:
     try:
         automation = ChauparSetupAutomation(
             project_id=args.project_id,
-            project_name=args.project_name
+            project_name=args.project_name,
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            trace_file=args.trace,
+            trace_format=args.trace_format
         )
+        automation.apply_settings(settings)
         
-        success = automation.run_complete_setup()
+        success = asyncio.run(automation.run_complete_setup())
         
         if success:
             print("\n🎉 Setup completed successfully!")
@@ -31,8 +31,10 @@ class AIService {
 
   async generateOllamaMove(gameState, playerId, skillLevel) {
     const prompt = this.buildGamePrompt(gameState, playerId, skillLevel);
+    // Lets the AI gateway queue requests fairly per game (Ollama itself ignores it)
+    const gameQuery = gameState.id ? `?game=${encodeURIComponent(gameState.id)}` : '';
     
-    const response = await fetch(`${this.config.ollamaUrl}/api/generate`, {
+    const response = await fetch(`${this.config.ollamaUrl}/api/generate${gameQuery}`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -1,6 +1,8 @@
 // Traditional Chaupar Rules Implementation
 // Based on: https://en.wikipedia.org/wiki/Chaupar
 
+import { MOVE_FLAGS, lookupMove } from './moveTables.js';
+
 export const CHAUPAR_RULES = {
   // Game constants
   BOARD_SIZE: 68,
@@ -101,15 +103,8 @@ export class ChauparGameState {
     const player = this.players[playerId];
     const piece = player.pieces[pieceIndex];
     
-    if (piece.status === 'finished') return false;
-    
-    if (piece.status === 'home') {
-      return CHAUPAR_RULES.HIGH_THROWS.includes(throwScore);
-    }
-    
-    // Check if move would exceed board
-    const newPosition = piece.position + throwScore;
-    return newPosition <= CHAUPAR_RULES.BOARD_SIZE;
+    // Precomputed: home pieces need a high throw, finished pieces and overshooting moves are out
+    return (lookupMove(piece.position, throwScore).flags & MOVE_FLAGS.LEGAL) !== 0;
   }
 
   // Move a piece
@@ -219,12 +214,13 @@ export class ChauparGameState {
     const player = this.players[playerId];
     
     player.pieces.forEach((piece, pieceIndex) => {
-      if (this.canMovePiece(playerId, pieceIndex, throwScore)) {
+      const { destination, flags } = lookupMove(piece.position, throwScore);
+      if (flags & MOVE_FLAGS.LEGAL) {
         moves.push({
           pieceIndex,
           currentPosition: piece.position,
-          newPosition: piece.status === 'home' ? 1 : piece.position + throwScore,
-          type: piece.status === 'home' ? 'start' : 'move'
+          newPosition: destination,
+          type: flags & MOVE_FLAGS.ENTERS ? 'start' : 'move'
         });
       }
     });
@@ -0,0 +1,19 @@
+// Generated by `python -m chaupar_sim tables` from chaupar_sim/rules.py - do not edit.
+// Dense move tables for every (position, throw) pair; index = position * throws.length + column.
+
+export const MOVE_TABLES = {"version":1,"boardSize":68,"positions":69,"throws":[7,10,2,3,4,25,30,14],"flags":{"LEGAL":1,"SAFE":2,"FINISHES":4,"PASSES_HOME":8,"CAPTURES":16,"ENTERS":32},"variants":{"standard":{"destination":[-1,1,-1,-1,-1,1,1,-1,8,11,3,4,5,26,31,15,9,12,4,5,6,27,32,16,10,13,5,6,7,28,33,17,11,14,6,7,8,29,34,18,12,15,7,8,9,30,35,19,13,16,8,9,10,31,36,20,14,17,9,10,11,32,37,21,15,18,10,11,12,33,38,22,16,19,11,12,13,34,39,23,17,20,12,13,14,35,40,24,18,21,13,14,15,36,41,25,19,22,14,15,16,37,42,26,20,23,15,16,17,38,43,27,21,24,16,17,18,39,44,28,22,25,17,18,19,40,45,29,23,26,18,19,20,41,46,30,24,27,19,20,21,42,47,31,25,28,20,21,22,43,48,32,26,29,21,22,23,44,49,33,27,30,22,23,24,45,50,34,28,31,23,24,25,46,51,35,29,32,24,25,26,47,52,36,30,33,25,26,27,48,53,37,31,34,26,27,28,49,54,38,32,35,27,28,29,50,55,39,33,36,28,29,30,51,56,40,34,37,29,30,31,52,57,41,35,38,30,31,32,53,58,42,36,39,31,32,33,54,59,43,37,40,32,33,34,55,60,44,38,41,33,34,35,56,61,45,39,42,34,35,36,57,62,46,40,43,35,36,37,58,63,47,41,44,36,37,38,59,64,48,42,45,37,38,39,60,65,49,43,46,38,39,40,61,66,50,44,47,39,40,41,62,67,51,45,48,40,41,42,63,68,52,46,49,41,42,43,64,-1,53,47,50,42,43,44,65,-1,54,48,51,43,44,45,66,-1,55,49,52,44,45,46,67,-1,56,50,53,45,46,47,68,-1,57,51,54,46,47,48,-1,-1,58,52,55,47,48,49,-1,-1,59,53,56,48,49,50,-1,-1,60,54,57,49,50,51,-1,-1,61,55,58,50,51,52,-1,-1,62,56,59,51,52,53,-1,-1,63,57,60,52,53,54,-1,-1,64,58,61,53,54,55,-1,-1,65,59,62,54,55,56,-1,-1,66,60,63,55,56,57,-1,-1,67,61,64,56,57,58,-1,-1,68,62,65,57,58,59,-1,-1,-1,63,66,58,59,60,-1,-1,-1,64,67,59,60,61,-1,-1,-1,65,68,60,61,62,-1,-1,-1,66,-1,61,62,63,-1,-1,-1,67,-1,62,63,64,-1,-1,-1,68,-1,63,64,65,-1,-1,-1,-1,-1,64,65,66,-1,-1,-1,-1,-1,65,66,67,-1,-1,-1,-1,-1,66,67,68,-1,-1,-1,-1,-1,67,68,-1,-1,-1,-1,-1,-1,68,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1],"flags":[0,49,0,0,0,49,49,0,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,3,3,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,3,17,17,17,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,3,3,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,3,17,17,17,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,3,3,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,3,17,17,17,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,3,3,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,3,17,17,17,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,3,3,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,3,17,17,17,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,17,5,17,17,17,17,17,3,3,8,17,17,3,17,3,17,17,8,17,17,17,3,17,17,17,8,17,17,17,17,17,17,17,8,17,3,17,17,17,17,5,8,3,17,17,17,17,17,8,8,17,17,17,17,17,17,8,8,17,17,17,17,17,3,8,8,17,17,3,17,3,17,8,8,17,17,17,3,17,17,8,8,17,17,17,17,17,17,8,8,17,3,17,17,17,17,8,8,3,17,17,17,17,17,8,8,17,17,17,17,17,17,8,8,17,17,17,17,17,3,8,8,17,17,3,17,3,17,8,8,5,17,17,3,17,17,8,8,8,17,17,17,17,17,8,8,8,3,17,17,17,17,8,8,8,17,5,17,17,17,8,8,8,17,8,17,17,17,8,8,8,17,8,17,17,3,8,8,8,5,8,17,3,17,8,8,8,8,8,3,17,17,8,8,8,8,8,17,17,17,8,8,8,8,8,17,17,5,8,8,8,8,8,17,5,8,8,8,8,8,8,5,8,8,8,8,8,8,8,8,8,8,8,8,8,0,0,0,0,0,0,0,0]},"special":{"destination":[-1,1,-1,-1,-1,1,1,-1,8,11,3,4,5,9,14,15,9,12,4,5,6,10,15,16,10,13,5,6,7,11,16,17,11,14,6,7,8,12,17,18,12,15,7,8,9,13,18,19,13,16,8,9,10,14,19,20,14,17,9,10,11,15,20,21,15,18,10,11,12,16,21,22,16,19,11,12,13,17,22,23,17,20,12,13,14,18,23,24,18,21,13,14,15,19,24,25,19,22,14,15,16,20,25,26,20,23,15,16,17,21,26,27,21,24,16,17,18,22,27,28,22,25,17,18,19,23,28,29,23,26,18,19,20,24,29,30,24,27,19,20,21,25,30,31,25,28,20,21,22,26,31,32,26,29,21,22,23,27,32,33,27,30,22,23,24,28,33,34,28,31,23,24,25,29,34,35,29,32,24,25,26,30,35,36,30,33,25,26,27,31,36,37,31,34,26,27,28,32,37,38,32,35,27,28,29,33,38,39,33,36,28,29,30,34,39,40,34,37,29,30,31,35,40,41,35,38,30,31,32,36,41,42,36,39,31,32,33,37,42,43,37,40,32,33,34,38,43,44,38,41,33,34,35,39,44,45,39,42,34,35,36,40,45,46,40,43,35,36,37,41,46,47,41,44,36,37,38,42,47,48,42,45,37,38,39,43,48,49,43,46,38,39,40,44,49,50,44,47,39,40,41,45,50,51,45,48,40,41,42,46,51,52,46,49,41,42,43,47,52,53,47,50,42,43,44,48,53,54,48,51,43,44,45,49,54,55,49,52,44,45,46,50,55,56,50,53,45,46,47,51,56,57,51,54,46,47,48,52,57,58,52,55,47,48,49,53,58,59,53,56,48,49,50,54,59,60,54,57,49,50,51,55,60,61,55,58,50,51,52,56,61,62,56,59,51,52,53,57,62,63,57,60,52,53,54,58,63,64,58,61,53,54,55,59,64,65,59,62,54,55,56,60,65,66,60,63,55,56,57,61,66,67,61,64,56,57,58,62,67,68,62,65,57,58,59,63,68,-1,63,66,58,59,60,64,-1,-1,64,67,59,60,61,65,-1,-1,65,68,60,61,62,66,-1,-1,66,-1,61,62,63,67,-1,-1,67,-1,62,63,64,68,-1,-1,68,-1,63,64,65,-1,-1,-1,-1,-1,64,65,66,-1,-1,-1,-1,-1,65,66,67,-1,-1,-1,-1,-1,66,67,68,-1,-1,-1,-1,-1,67,68,-1,-1,-1,-1,-1,-1,68,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1],"flags":[0,49,0,0,0,49,49,0,3,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,3,17,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,3,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,3,17,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,3,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,3,17,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,3,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,3,17,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,3,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,3,17,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,3,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,3,17,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,3,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,3,17,17,17,17,3,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,3,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,3,17,17,17,17,17,17,17,17,17,17,17,17,17,3,17,17,17,17,3,17,3,17,17,17,5,17,17,3,17,17,17,5,8,17,17,17,17,17,3,8,8,3,17,17,17,17,17,8,8,17,5,17,17,17,17,8,8,17,8,17,17,17,17,8,8,17,8,17,17,3,5,8,8,5,8,17,3,17,8,8,8,8,8,3,17,17,8,8,8,8,8,17,17,17,8,8,8,8,8,17,17,5,8,8,8,8,8,17,5,8,8,8,8,8,8,5,8,8,8,8,8,8,8,8,8,8,8,8,8,0,0,0,0,0,0,0,0]}}};
+
+export const MOVE_FLAGS = MOVE_TABLES.flags;
+
+const THROW_COLUMNS = Object.fromEntries(MOVE_TABLES.throws.map((score, column) => [score, column]));
+
+// Destination (-1 if the piece can't move) and flag bits for a piece at `position` and a throw score
+export const lookupMove = (position, throwScore, variant = 'standard') => {
+  const column = THROW_COLUMNS[throwScore];
+  const { destination, flags } = MOVE_TABLES.variants[variant];
+  if (column === undefined || position < 0 || position >= MOVE_TABLES.positions) {
+    return { destination: -1, flags: 0 };
+  }
+  const index = position * MOVE_TABLES.throws.length + column;
+  return { destination: destination[index], flags: flags[index] };
+};
@@ -0,0 +1,135 @@
+"""In-memory stand-in for the parts of the Firestore client the maintenance code uses
+
+Queries support equality and ``<`` filters, ``order_by`` on one or more
+fields, ``limit`` and ``start_after`` cursors. Batched deletes take
+``commit_latency`` seconds, so concurrent callers interleave, and every
+delete is counted in ``FakeDB.deleted``.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+DOCUMENT_ID = "__name__"
+
+
+class FakeFirestoreModule:
+    class FieldPath:
+        @staticmethod
+        def document_id():
+            return DOCUMENT_ID
+
+
+class FakeReference:
+    def __init__(self, db: "FakeDB", path: str):
+        self.db = db
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collections(self) -> List["FakeQuery"]:
+        depth = self.path.count("/") + 2
+        names = {path.split("/")[depth - 1] for path in self.db.docs
+                 if path.startswith(self.path + "/") and path.count("/") == depth}
+        return [FakeQuery(self.db, f"{self.path}/{name}") for name in sorted(names)]
+
+
+class FakeSnapshot:
+    def __init__(self, db: "FakeDB", path: str):
+        self.reference = FakeReference(db, path)
+        self.id = self.reference.id
+        self._data = dict(db.docs[path])
+
+    def get(self, field: str):
+        return self.id if field == DOCUMENT_ID else self._data.get(field)
+
+    def to_dict(self) -> Dict:
+        return dict(self._data)
+
+
+class FakeQuery:
+    """The query surface the pruner uses: where, order_by, select, limit, start_after, stream"""
+
+    OPERATORS = {"==": lambda a, b: a == b, "<": lambda a, b: a is not None and a < b}
+
+    def __init__(self, db: "FakeDB", collection: str, filters: tuple = (), order: tuple = (),
+                 count: Optional[int] = None, after: Optional[FakeSnapshot] = None):
+        self.db = db
+        self.collection = collection
+        self.filters = filters
+        self.order = order
+        self.count = count
+        self.after = after
+
+    def _with(self, **changes) -> "FakeQuery":
+        fields = dict(filters=self.filters, order=self.order, count=self.count, after=self.after)
+        fields.update(changes)
+        return FakeQuery(self.db, self.collection, **fields)
+
+    def where(self, field: str, op: str, value) -> "FakeQuery":
+        return self._with(filters=self.filters + ((field, op, value),))
+
+    def order_by(self, field: str) -> "FakeQuery":
+        return self._with(order=self.order + (field,))
+
+    def select(self, fields) -> "FakeQuery":
+        return self
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._with(count=count)
+
+    def start_after(self, snapshot: FakeSnapshot) -> "FakeQuery":
+        return self._with(after=snapshot)
+
+    def _key(self, snapshot: FakeSnapshot):
+        return tuple(snapshot.get(field) for field in self.order) + (snapshot.id,)
+
+    def stream(self) -> List[FakeSnapshot]:
+        depth = self.collection.count("/") + 1
+        with self.db.lock:
+            snapshots = [FakeSnapshot(self.db, path) for path in self.db.docs
+                         if path.startswith(self.collection + "/") and path.count("/") == depth]
+        snapshots = [snapshot for snapshot in snapshots
+                     if all(self.OPERATORS[op](snapshot.get(field), value) for field, op, value in self.filters)]
+        snapshots.sort(key=self._key)
+        if self.after is not None:
+            snapshots = [snapshot for snapshot in snapshots if self._key(snapshot) > self._key(self.after)]
+        return snapshots[:self.count] if self.count is not None else snapshots
+
+
+class FakeBatch:
+    def __init__(self, db: "FakeDB"):
+        self.db = db
+        self.refs: List[FakeReference] = []
+
+    def delete(self, ref: FakeReference) -> None:
+        self.refs.append(ref)
+
+    def commit(self) -> None:
+        with self.db.lock:
+            self.db.commits += 1
+            if self.db.commits == self.db.fail_on_commit:
+                raise RuntimeError("commit failed")
+        if len(self.refs) > 500:
+            raise ValueError(f"batch of {len(self.refs)} writes, Firestore allows 500")
+        time.sleep(self.db.commit_latency)
+        with self.db.lock:
+            for ref in self.refs:
+                self.db.deleted[ref.path] += 1
+                self.db.docs.pop(ref.path, None)
+
+
+class FakeDB:
+    def __init__(self, commit_latency: float, fail_on_commit: Optional[int] = None):
+        self.docs: Dict[str, Dict] = {}
+        self.deleted: Counter = Counter()
+        self.commit_latency = commit_latency
+        self.fail_on_commit = fail_on_commit
+        self.commits = 0
+        self.lock = threading.Lock()
+
+    def collection(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
@@ -0,0 +1,186 @@
+"""AI gateway: fair queueing, load shedding and request merging against a stub Ollama"""
+
+import asyncio
+import json
+from typing import Dict, List
+
+import pytest
+
+from ai_gateway import AIProxy, FairQueue, GatewayBusy, MemoryResponseCache
+
+
+def move_prompt(pieces: List[str], dice: int = 10, skill: str = "advanced") -> str:
+    """A prompt shaped like aiService.js's buildGamePrompt"""
+    listed = ", ".join(f"Piece {number}: {state}" for number, state in enumerate(pieces, 1))
+    return f"Game State:\n- Dice Roll: {dice}\n- Your Pieces: {listed}\nSkill Level: {skill}\n"
+
+
+class StubOllama:
+    """Answers /api/generate on an asyncio server, holding every reply until ``gate`` is set"""
+
+    def __init__(self, reply: str = "Move piece 1"):
+        self.reply = reply
+        self.requests: List[Dict] = []
+        self.gate = asyncio.Event()
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        headers = {}
+        await reader.readline()
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        request = json.loads(await reader.readexactly(int(headers.get("content-length", 0))) or b"{}")
+        self.requests.append(request)
+        await self.gate.wait()
+        body = json.dumps({"model": request.get("model"), "response": self.reply, "done": True}).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n"
+                     b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+        await writer.drain()
+        writer.close()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def settle():
+    """Let queued callbacks and tasks run"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def generate(proxy: AIProxy, game: str, prompt: str, **fields):
+    body = json.dumps(dict({"model": "qwen2.5:latest", "prompt": prompt, "stream": False}, **fields)).encode()
+    return asyncio.ensure_future(proxy.dispatch("POST", f"/api/generate?game={game}",
+                                                {"content-type": "application/json", "x-game-id": "peer"}, body))
+
+
+def test_slots_are_handed_to_games_in_turn():
+    async def scenario():
+        queue = FairQueue(limit=1, max_queue=10, max_per_game=10)
+        order = []
+
+        async def call(name: str, game: str):
+            async with queue.slot(game):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await queue.acquire("busy")
+        tasks = [asyncio.ensure_future(call(name, name[0])) for name in ("a1", "a2", "a3", "b1", "c1", "b2")]
+        await settle()
+        assert queue.queued == 6 and queue.summary()["games_waiting"] == 3
+        queue.release()
+        await asyncio.gather(*tasks)
+        return order, queue
+
+    order, queue = asyncio.run(scenario())
+    assert order == ["a1", "b1", "c1", "a2", "b2", "a3"]
+    assert queue.active == 0 and queue.queued == 0 and queue.admitted == 7
+
+
+def test_full_queues_are_refused_with_retry_after():
+    async def scenario():
+        stub = StubOllama()
+        upstream = await stub.start()
+        proxy = AIProxy(upstream, MemoryResponseCache(), queue=FairQueue(limit=1, max_queue=2, max_per_game=1))
+        running = generate(proxy, "a", "first")
+        await asyncio.sleep(0.2)
+        queued = [generate(proxy, "a", "second")]
+        await settle()
+        per_game = await generate(proxy, "a", "third")
+        queued.append(generate(proxy, "b", "fourth"))
+        await settle()
+        overloaded = await generate(proxy, "c", "fifth")
+        stub.gate.set()
+        served = await asyncio.gather(running, *queued)
+        await stub.close()
+        return per_game, overloaded, served, proxy
+
+    per_game, overloaded, served, proxy = asyncio.run(scenario())
+    for response, status in ((per_game, 429), (overloaded, 503)):
+        assert response[0] == status
+        assert "error" in json.loads(response[1])
+        assert int(response[3]["Retry-After"]) >= 1
+    assert [response[0] for response in served] == [200, 200, 200]
+    assert proxy.queue.rejected == 2
+
+
+def test_queue_timeout_is_a_503():
+    async def scenario():
+        queue = FairQueue(limit=1, timeout=0.05)
+        await queue.acquire("a")
+        with pytest.raises(GatewayBusy) as refused:
+            await queue.acquire("b")
+        return refused.value, queue
+
+    refused, queue = asyncio.run(scenario())
+    assert refused.status == 503 and refused.retry_after >= 1
+    assert queue.timed_out == 1 and queue.queued == 0 and queue.active == 1
+
+
+def test_identical_positions_share_one_model_call():
+    async def scenario():
+        stub = StubOllama(reply="Move piece 1")
+        upstream = await stub.start()
+        proxy = AIProxy(upstream, MemoryResponseCache(), queue=FairQueue(limit=4))
+        first = generate(proxy, "a", move_prompt(["Position 12", "Not started", "Position 30", "Finished"]))
+        await asyncio.sleep(0.2)
+        # The same position with the pieces numbered differently
+        merged = generate(proxy, "b", move_prompt(["Not started", "Position 30", "Finished", "Position 12"]))
+        await settle()
+        stub.gate.set()
+        replies = await asyncio.gather(first, merged)
+        cached = await generate(proxy, "c", move_prompt(["Finished", "Position 12", "Not started", "Position 30"]))
+        await stub.close()
+        return stub, replies + [cached], proxy
+
+    stub, replies, proxy = asyncio.run(scenario())
+    assert len(stub.requests) == 1
+    assert [reply[3]["X-Cache"] for reply in replies] == ["MISS", "MERGED", "HIT"]
+    # Each caller hears about the piece at square 12 by its own number
+    assert [json.loads(reply[1])["response"] for reply in replies] == \
+        ["Move piece 1", "Move piece 4", "Move piece 2"]
+    assert proxy.stats.coalesced == 1 and proxy.stats.hits == 1 and proxy.stats.misses == 1
+    assert not proxy._inflight
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        queue = FairQueue(limit=1)
+        await queue.acquire("a")
+        waiter = asyncio.ensure_future(queue.acquire("b"))
+        await settle()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert queue.queued == 0 and not queue._waiting
+    queue.release()
+    assert queue.active == 0
+
+
+def test_slot_handed_to_a_cancelled_waiter_passes_on():
+    async def scenario():
+        queue = FairQueue(limit=1)
+        await queue.acquire("a")
+        gives_up = asyncio.ensure_future(queue.acquire("b"))
+        next_in_line = asyncio.ensure_future(queue.acquire("c"))
+        await settle()
+        # The slot goes to "b", which is cancelled before it can take it
+        queue.release()
+        gives_up.cancel()
+        await asyncio.gather(gives_up, return_exceptions=True)
+        await asyncio.wait_for(next_in_line, 1)
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert queue.active == 1 and queue.queued == 0 and not queue._waiting
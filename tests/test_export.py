@@ -0,0 +1,115 @@
+"""maintain export: games and moves streamed into a MoveLog, then replayed"""
+
+import asyncio
+import shutil
+import socket
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chaupar_sim.replay import analyze, replay  # noqa: E402
+from fake_firestore import FakeDB, FakeFirestoreModule  # noqa: E402
+from setup_automation import FIREBASE_MODULES, GameExporter, _installed  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+EMULATOR_PROJECT = "demo-chaupar-export"
+
+
+def game_documents() -> Dict[str, Dict]:
+    """Documents by path: two decided games, one without moves and moves of a deleted game
+
+    u1 brings all four pieces home in g1 while u2 trails; in g2 the AI
+    finishes after one move by u3.
+    """
+    start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    docs = {
+        "games/g1": {"status": "finished", "mode": "local", "createdAt": start,
+                     "players": [{"id": "u1"}, {"id": "u2"}]},
+        "games/g2": {"status": "finished", "mode": "ai", "skillLevel": "advanced", "createdAt": start,
+                     "players": [{"id": "u3"}, {"id": "ai", "isAI": True}]},
+        "games/g3": {"status": "waiting", "mode": "local", "createdAt": start, "players": [{"id": "u4"}]},
+    }
+    moves = {
+        "g1": [("u1", 0, 68), ("u2", 0, 5), ("u1", 0, 68), ("u2", 5, 9), ("u1", 0, 68), ("u1", 0, 68)],
+        "g2": [("u3", 0, 3), ("ai", 0, 68), ("ai", 0, 68), ("ai", 0, 68), ("ai", 0, 68)],
+        "gone": [("u5", 0, 4), ("u5", 4, 10)],
+    }
+    for game_id, game_moves in moves.items():
+        for index, (player, source, target) in enumerate(game_moves):
+            docs[f"gameMoves/{game_id}-{index}"] = {
+                "gameId": game_id, "playerId": player, "diceValue": target - source,
+                "fromPosition": source, "toPosition": target, "timestamp": start + timedelta(seconds=index)}
+    return docs
+
+
+def check_export(log) -> None:
+    assert list(log.games["game_id"]) == ["g1", "g2", "g3", "gone"]
+    assert list(log.games["status"]) == ["finished", "finished", "waiting", "missing"]
+    assert list(log.lengths) == [6, 5, 0, 2]
+    assert list(log.games["ai_seat"]) == [-1, 1, -1, -1]
+    assert list(log.moves_of("g1")["seat"]) == [0, 1, 0, 1, 0, 0]
+    assert list(log.moves_of("g2")["dice"]) == [3, 68, 68, 68, 68]
+
+    result = replay(log)
+    assert list(result.winner) == [0, 1, -1, -1]
+    assert list(result.finish_move) == [6, 5, -1, -1]
+    assert result.inconsistent.sum() == 0
+
+    summary = analyze(log, result)
+    assert summary["games"] == 4 and summary["moves"] == 13 and summary["decided"] == 2
+    assert summary["ai_win_rates"] == {"advanced": {"games": 1, "win_rate": 1.0}}
+
+
+def export(db, firestore_module, page_size: int):
+    exporter = GameExporter(db, firestore_module, page_size=page_size, log=lambda message: None)
+    return asyncio.run(exporter.run()), exporter.stats
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 1000])
+def test_export_in_memory(page_size):
+    db = FakeDB(commit_latency=0)
+    db.docs.update(game_documents())
+
+    log, stats = export(db, FakeFirestoreModule, page_size)
+
+    check_export(log)
+    assert stats["games"] == 3 and stats["moves"] == 13
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.skipif(not (_installed(FIREBASE_MODULES) and shutil.which("firebase") and shutil.which("java")),
+                    reason="needs the Firebase Admin SDK, the firebase CLI and Java for the Firestore emulator")
+def test_export_from_emulator(monkeypatch):
+    from setup_automation import firestore_client, start_firestore_emulator, stop_process
+
+    # The emulator config refers to firestore.rules and firestore.indexes.json by relative path
+    monkeypatch.chdir(REPO_ROOT)
+    # firestore_client points the process at the emulator; undo that afterwards
+    monkeypatch.delenv("FIRESTORE_EMULATOR_HOST", raising=False)
+    host = f"127.0.0.1:{_free_port()}"
+
+    async def scenario():
+        process = await start_firestore_emulator(host, EMULATOR_PROJECT, log=lambda *args: None)
+        if process is None:
+            pytest.skip("the Firestore emulator did not start")
+        try:
+            db, firestore = firestore_client(EMULATOR_PROJECT, host)
+            batch = db.batch()
+            for path, doc in game_documents().items():
+                batch.set(db.document(path), doc)
+            batch.commit()
+            exporter = GameExporter(db, firestore, page_size=2, log=lambda message: None)
+            return await exporter.run()
+        finally:
+            await stop_process(process)
+
+    check_export(asyncio.run(scenario()))
@@ -0,0 +1,111 @@
+"""Ollama warm-up against a local stand-in that streams /api/generate like Ollama does"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import pytest
+
+from setup_automation import OLLAMA_BENCH_POSITIONS, OLLAMA_KEEP_ALIVE, ChauparSetupAutomation
+
+MODEL = ChauparSetupAutomation.OLLAMA_MODEL
+LOAD_LATENCY = 0.2
+FIRST_TOKEN_LATENCY = 0.1
+TOKEN_LATENCY = 0.02
+REPLY = ["Piece", " ", "2", " ", "moves"]
+# What the final chunk reports, as Ollama does: tokens generated and generation time in ns
+EVAL_COUNT = 40
+EVAL_DURATION_NS = 500_000_000
+
+
+class OllamaStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: List[Dict] = []
+
+    def send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_json(200 if self.path == "/api/tags" else 404, {"models": [{"name": MODEL}]})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self.requests.append(request)
+        if not request.get("prompt"):
+            time.sleep(LOAD_LATENCY)
+            self.send_json(200, {"model": request.get("model"), "response": "", "done": True})
+            return
+        # NDJSON over chunked encoding, one token per chunk
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(FIRST_TOKEN_LATENCY)
+        for index, token in enumerate(REPLY):
+            if index:
+                time.sleep(TOKEN_LATENCY)
+            self.send_chunk({"response": token, "done": False})
+        self.send_chunk({"response": "", "done": True, "eval_count": EVAL_COUNT,
+                         "eval_duration": EVAL_DURATION_NS})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def send_chunk(self, payload: Dict):
+        line = json.dumps(payload).encode() + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def automation():
+    OllamaStub.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OllamaStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    automation = ChauparSetupAutomation(trace_file=None)
+    automation.OLLAMA_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    automation.log = lambda message, level="INFO": None
+    yield automation
+    server.shutdown()
+    server.server_close()
+
+
+def test_warm_up_loads_model_then_times_moves(automation):
+    assert asyncio.run(automation.warm_up_ollama())
+
+    load, *moves = OllamaStub.requests
+    assert load == {"model": MODEL, "keep_alive": OLLAMA_KEEP_ALIVE}
+    assert len(moves) == len(OLLAMA_BENCH_POSITIONS)
+    assert all(move["stream"] and move["prompt"] and move["model"] == MODEL for move in moves)
+
+    bench = automation.ollama_benchmark
+    assert bench["model"] == MODEL
+    assert bench["prompts"] == len(OLLAMA_BENCH_POSITIONS)
+    assert bench["load_seconds"] >= LOAD_LATENCY
+    # Tokens per second come from Ollama's own counters, not wall time
+    assert bench["tokens_per_second"] == pytest.approx(EVAL_COUNT / (EVAL_DURATION_NS / 1e9))
+    streaming = TOKEN_LATENCY * (len(REPLY) - 1)
+    assert FIRST_TOKEN_LATENCY <= bench["ttft_p50_ms"] / 1000 < FIRST_TOKEN_LATENCY + streaming
+    assert bench["total_p50_ms"] / 1000 >= FIRST_TOKEN_LATENCY + streaming
+    assert bench["ttft_max_ms"] <= bench["total_max_ms"]
+    for move in bench["moves"]:
+        assert move["reply"] == "".join(REPLY)
+        assert move["tokens"] == EVAL_COUNT
+        assert move["total"] - move["ttft"] >= streaming
+
+
+def test_warm_up_skips_missing_model(automation):
+    automation.OLLAMA_MODEL = "not-installed:latest"
+
+    assert not asyncio.run(automation.warm_up_ollama())
+    assert OllamaStub.requests == []
+    assert automation.ollama_benchmark is None
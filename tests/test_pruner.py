@@ -0,0 +1,75 @@
+"""FirestorePruner against an in-memory Firestore"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import pytest
+
+from fake_firestore import FakeDB, FakeFirestoreModule
+from setup_automation import FirestorePruner
+
+
+def seed(db: FakeDB, games: int, moves: int, chat: int, fresh: int) -> List[str]:
+    """Stale finished games with moves and chat, plus fresh ones; returns the stale paths"""
+    now = datetime.now(timezone.utc)
+    stale = []
+    for index in range(games + fresh):
+        game_id = f"g{index}"
+        is_stale = index < games
+        updated = now - timedelta(days=60 if is_stale else 1)
+        paths = [f"games/{game_id}"]
+        db.docs[paths[0]] = {"status": "finished", "createdAt": updated, "updatedAt": updated}
+        for move in range(moves):
+            paths.append(f"gameMoves/{game_id}-m{move}")
+            db.docs[paths[-1]] = {"gameId": game_id, "timestamp": updated}
+        for message in range(chat):
+            paths.append(f"games/{game_id}/chat/c{message}")
+            db.docs[paths[-1]] = {"text": "gg"}
+        if is_stale:
+            stale += paths
+    return stale
+
+
+def prune(db: FakeDB, concurrency: int, **options) -> Dict[str, int]:
+    pruner = FirestorePruner(db, FakeFirestoreModule, concurrency=concurrency, log=lambda message: None, **options)
+    return asyncio.run(pruner.run())
+
+
+@pytest.mark.parametrize("concurrency", [1, 8])
+def test_each_stale_document_deleted_once(concurrency):
+    db = FakeDB(commit_latency=0.005)
+    stale = seed(db, games=12, moves=130, chat=3, fresh=3)
+    fresh = set(db.docs) - set(stale)
+
+    stats = prune(db, concurrency)
+
+    assert [path for path in stale if db.deleted[path] != 1] == []
+    assert [path for path in fresh if db.deleted[path]] == []
+    assert stats["writes"] == len(stale)
+    assert stats["finished"] == 12
+    assert stats["batches"] == -(-len(stale) // FirestorePruner.BATCH_SIZE)
+
+
+def test_failed_batch_leaves_no_orphaned_moves():
+    """Games still deleted after a failed commit have none of their moves left behind"""
+    db = FakeDB(commit_latency=0.005, fail_on_commit=2)
+    seed(db, games=12, moves=130, chat=3, fresh=0)
+
+    with pytest.raises(RuntimeError):
+        prune(db, concurrency=8)
+
+    assert db.commits == 2
+    gone = {path.split("/")[1] for path in db.deleted if path.count("/") == 1 and path.startswith("games/")}
+    orphaned = [path for path in db.docs if path.startswith("gameMoves/") and db.docs[path]["gameId"] in gone]
+    assert orphaned == []
+
+
+def test_dry_run_deletes_nothing():
+    db = FakeDB(commit_latency=0)
+    stale = seed(db, games=3, moves=10, chat=1, fresh=1)
+
+    stats = prune(db, concurrency=4, dry_run=True)
+
+    assert not db.deleted
+    assert stats["writes"] == len(stale)
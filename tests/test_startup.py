@@ -0,0 +1,54 @@
+"""setup_automation must not import the cloud SDKs just by being loaded"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Stand-ins for the SDKs, so the check works whether or not the real ones are installed
+FAKE_PACKAGES = (
+    "firebase_admin",
+    "google/cloud",
+    "google/cloud/firestore",
+    "google/oauth2",
+    "google/protobuf",
+    "grpc",
+    "openai",
+)
+HEAVY_PACKAGES = ("firebase_admin", "google.cloud", "google.oauth2", "google.protobuf", "grpc", "openai")
+
+
+def imported_modules(fake_root: Path):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1",
+               PYTHONPATH=os.pathsep.join([str(fake_root), os.environ.get("PYTHONPATH", "")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import setup_automation"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    # "import time: self [us] | cumulative | imported package"
+    return [line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines()
+            if line.startswith("import time:") and "imported package" not in line]
+
+
+def test_import_skips_heavy_sdks(tmp_path):
+    for package in FAKE_PACKAGES:
+        (tmp_path / package).mkdir(parents=True, exist_ok=True)
+    for package in {"google", *FAKE_PACKAGES}:
+        (tmp_path / package / "__init__.py").write_text("")
+
+    modules = imported_modules(tmp_path)
+    assert "setup_automation" in modules
+    heavy = sorted({m for m in modules
+                    if any(m == pkg or m.startswith(pkg + ".") for pkg in HEAVY_PACKAGES)})
+    assert heavy == [], f"imported at startup: {', '.join(heavy)}"
+
+
+def test_fake_sdks_are_detected(tmp_path):
+    """The fakes shadow the real SDKs, so an eager import would show up in the report"""
+    (tmp_path / "openai").mkdir()
+    (tmp_path / "openai" / "__init__.py").write_text("")
+    (tmp_path / "sitecustomize.py").write_text("import openai\n")
+
+    assert "openai" in imported_modules(tmp_path)
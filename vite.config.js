@@ -15,6 +15,8 @@ export default defineConfig({
         }
       }
     },
-    chunkSizeWarningLimit: 600
+    chunkSizeWarningLimit: 600,
+    // dist/.vite/manifest.json: setup_automation.py writes preload and cache headers from it
+    manifest: true
   }
 })